@@ -0,0 +1,272 @@
+"""
+Streaming anomaly detection over parcel lifecycles.
+
+`AnomalyDetector` is fed one parsed line at a time (log order) and keeps
+only bounded state: the parcels currently in flight, one pending sort
+instruction per parcel and a few numbers per location.  It emits
+anomaly records of three kinds:
+
+  stuck              registered, but neither sorted nor deregistered
+                     within `stuck_after_s` of log time
+  slow_sort          ItemInstruction → VerifiedSortReport took far longer
+                     than usual at the parcel's location (exponentially
+                     weighted mean + `sigma` standard deviations)
+  barcode_err_spike  a location's barcode error rate over one
+                     `window_s` window jumped well above its own
+                     weighted baseline of earlier windows
+
+Only the newest MAX_RECORDS records are kept; `counts` has them all.
+"""
+import math
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+
+from hlc_core import ANY_TYPE, Decoder, iso_millis
+
+# ── Tunables ────────────────────────────────────────────────────────
+STUCK_AFTER_S = 600                 # in flight this long without sort / deregister
+SORT_GAP_SIGMA = 4.0                # slow_sort: this many std devs above the mean …
+SORT_GAP_MIN_EXCESS_S = 5.0         # … and at least this much slower than it
+SORT_GAP_ALPHA = 0.02               # EWMA weight of one new gap (~50‑sort memory)
+WARMUP = 30                         # observations before a location's gaps are judged
+WINDOW_S = 300                      # barcode error rate window (aligned, log time)
+SPIKE_FACTOR = 2.0                  # spike: rate ≥ factor × baseline …
+SPIKE_MIN_DELTA = 0.10              # … and ≥ baseline + this (absolute)
+SPIKE_MIN_SCANS = 20                # windows with fewer scans are not judged
+SPIKE_ALPHA = 0.2                   # EWMA weight of one window's rate
+SPIKE_WARMUP = 3                    # windows before a location's rate is judged
+MAX_RECORDS = 10_000
+
+KINDS = ("stuck", "slow_sort", "barcode_err_spike")
+COLUMNS = ["kind", "ts", "location", "key", "pic", "hostId", "value", "expected", "detail"]
+
+
+class Ewma:
+    """Exponentially weighted mean and variance – constant memory, recent‑biased."""
+    __slots__ = ("alpha", "mean", "var", "n")
+
+    def __init__(self, alpha: float):
+        self.alpha, self.mean, self.var, self.n = alpha, 0.0, 0.0, 0
+
+    def add(self, x: float) -> None:
+        if self.n == 0:
+            self.mean = x
+        else:
+            d = x - self.mean
+            self.mean += self.alpha * d
+            self.var = (1 - self.alpha) * (self.var + self.alpha * d * d)
+        self.n += 1
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+
+# ── Detector ────────────────────────────────────────────────────────
+class AnomalyDetector:
+    """
+    Lines in, anomaly records out.  `key` identifies one parcel (a store
+    row, a record id); `describe(key)`, if given, adds pic / hostId to a
+    record when it is emitted.
+    """
+
+    def __init__(self, stuck_after_s: float = STUCK_AFTER_S, window_s: float = WINDOW_S,
+                 describe=None):
+        self.stuck_ms = int(stuck_after_s * 1000)
+        self.window_ms = int(window_s * 1000)
+        self.describe = describe
+        self.in_flight = OrderedDict()      # key → (registered ms, location), oldest first
+        self.pending = OrderedDict()        # key → last ItemInstruction ms, oldest first
+        self.gaps = {}                      # location → Ewma of sort gaps, seconds
+        self.scans = {}                     # location → [scans, errors] in this window
+        self.rates = {}                     # location → Ewma of per‑window error rates
+        self.window = -1                    # current window index (ts // window_ms)
+        self.due = math.inf                 # no in‑flight / pending entry expires before this
+        self.records = deque(maxlen=MAX_RECORDS)
+        self.counts = Counter()
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def _emit(self, kind, ts, location, key, value, expected, detail) -> None:
+        record = {"kind": kind, "ts": ts, "location": location, "key": key,
+                  "pic": None, "hostId": None, "value": value, "expected": expected,
+                  "detail": detail}
+        if key is not None and self.describe is not None:
+            record.update(self.describe(key))
+        self.records.append(record)
+        self.counts[kind] += 1
+
+    # ── feeding ─────────────────────────────────────────────────────
+    def feed(self, key, msg: str, ts: int, location, scan_ok=None) -> None:
+        """
+        One parsed line: `msg` type at `ts` (epoch ms) for parcel `key`
+        at `location`; `scan_ok` is the scan result of an
+        ItemPropertiesUpdate (None if it carries none).
+        """
+        if ts // self.window_ms > self.window:         # a late line stays in the open window
+            self._close_window(ts // self.window_ms)
+        if ts > self.due:
+            self._expire(ts)
+
+        in_flight = self.in_flight
+        if msg == "ItemRegister":
+            if key not in in_flight:
+                in_flight[key] = (ts, location)
+                self.due = min(self.due, ts + self.stuck_ms)
+        elif msg == "ItemInstruction":
+            self.pending[key] = ts
+            self.pending.move_to_end(key)
+            self.due = min(self.due, ts + self.stuck_ms)
+        elif msg == "VerifiedSortReport":
+            in_flight.pop(key, None)
+            sent = self.pending.pop(key, None)
+            if sent is not None:
+                self._sort_gap(key, ts, location, (ts - sent) / 1000)
+        elif msg == "ItemDeRegister":
+            in_flight.pop(key, None)
+            self.pending.pop(key, None)
+        elif scan_ok is not None:
+            counts = self.scans.get(location)
+            if counts is None:
+                counts = self.scans[location] = [0, 0]
+            counts[0] += 1
+            if not scan_ok:
+                counts[1] += 1
+
+    def advance(self, now: int) -> None:
+        """
+        Log time has reached `now` (epoch ms) without a line: report the
+        parcels that went stuck meanwhile.  `feed` does this per line; a
+        live tail calls it while the log is quiet.
+        """
+        if now > self.due:
+            self._expire(now)
+
+    def _expire(self, now: int) -> None:
+        cutoff = now - self.stuck_ms
+        in_flight = self.in_flight
+        while in_flight:
+            key, (since, location) = next(iter(in_flight.items()))
+            if since >= cutoff:
+                break
+            del in_flight[key]
+            self._emit("stuck", now, location, key, (now - since) / 1000, self.stuck_ms / 1000,
+                       "registered, not sorted or deregistered")
+        pending = self.pending
+        while pending:
+            key, sent = next(iter(pending.items()))
+            if sent >= cutoff:
+                break
+            del pending[key]                    # never sorted; not a gap to learn from
+        heads = [since for since, _ in islice(in_flight.values(), 1)]
+        heads += islice(pending.values(), 1)
+        self.due = min(heads) + self.stuck_ms if heads else math.inf
+
+    def _sort_gap(self, key, ts: int, location, gap: float) -> None:
+        stats = self.gaps.get(location)
+        if stats is None:
+            stats = self.gaps[location] = Ewma(SORT_GAP_ALPHA)
+        if stats.n >= WARMUP:
+            limit = max(stats.mean + SORT_GAP_SIGMA * stats.std,
+                        stats.mean + SORT_GAP_MIN_EXCESS_S)
+            if gap > limit:
+                self._emit("slow_sort", ts, location, key, gap, stats.mean,
+                           f"instruction → sort report {gap:.1f} s, usually {stats.mean:.1f} s")
+                gap = limit                     # an outlier must not drag the baseline up
+        stats.add(gap)
+
+    def _close_window(self, window: int) -> None:
+        closed, self.window = self.window, window
+        if closed < 0:
+            return
+        end = (closed + 1) * self.window_ms
+        for location, (n, errors) in self.scans.items():
+            if not n:
+                continue
+            rate = errors / n
+            stats = self.rates.get(location)
+            if stats is None:
+                stats = self.rates[location] = Ewma(SPIKE_ALPHA)
+            if (stats.n >= SPIKE_WARMUP and n >= SPIKE_MIN_SCANS
+                    and rate >= SPIKE_FACTOR * stats.mean
+                    and rate >= stats.mean + SPIKE_MIN_DELTA):
+                self._emit("barcode_err_spike", end, location, None, rate, stats.mean,
+                           f"{errors} of {n} scans failed in {self.window_ms // 60_000} min, "
+                           f"usually {stats.mean:.0%}")
+            stats.add(rate)
+        self.scans = {}
+
+    def finish(self) -> None:
+        """Judge the last, still open barcode window."""
+        if self.window >= 0:
+            self._close_window(self.window + 1)
+
+    # ── output ──────────────────────────────────────────────────────
+    def frame(self):
+        """Records as a DataFrame (ts as datetime), newest last."""
+        import pandas as pd
+        df = pd.DataFrame(list(self.records), columns=COLUMNS)
+        df["ts"] = pd.to_datetime(df["ts"], unit="ms")
+        df["key"] = df["key"].astype("Int64")
+        df["pic"] = df["pic"].astype("Int64")
+        df["kind"] = pd.Categorical(df["kind"], categories=KINDS)
+        return df
+
+    def since(self, emitted: int) -> "AnomalyDetector":
+        """
+        Copy holding only the records emitted after the first `emitted`
+        (as far as they are still kept), with the full counts – O(new).
+        """
+        new = min(len(self) - emitted, len(self.records))
+        records = list(islice(reversed(self.records), new))[::-1]
+        return AnomalyDetector.from_dict({"records": records, "counts": dict(self.counts)})
+
+    def extend(self, delta: "AnomalyDetector") -> None:
+        """Catch a copy of a detector up with its `since` output."""
+        self.records.extend(delta.records)
+        self.counts = Counter(delta.counts)
+
+    def to_dict(self) -> dict:
+        return {"records": list(self.records), "counts": dict(self.counts)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "AnomalyDetector":
+        det = cls()
+        det.records.extend(d["records"])
+        det.counts.update(d["counts"])
+        return det
+
+
+# ── Parser hook ─────────────────────────────────────────────────────
+class Watch(Decoder):
+    """
+    hlc_core decoder feeding an AnomalyDetector from parcel records (the
+    batch CLI).  Records are keyed by identity, so it needs every record
+    kept until the end of the parse: it is `batched`, never evicting.
+    """
+    types = (ANY_TYPE,)
+    batched = True
+
+    def __init__(self, detector: AnomalyDetector):
+        self.detector = detector
+        detector.describe = self._describe
+
+    def start(self):
+        self.refs = {}                              # id → record
+
+    def _describe(self, key) -> dict:
+        parcel = self.refs[key]
+        return {"pic": parcel["pic"], "hostId": parcel["hostId"]}
+
+    def apply(self, parcel, ts_iso, msg, body, parts):
+        key = id(parcel)
+        self.refs[key] = parcel
+        scan_ok = None
+        if parts[3] == "2" and len(parts) >= 10:
+            scan_ok = parts[9].split(";", 1)[0] == "6"
+        self.detector.feed(key, msg, iso_millis(ts_iso), parcel["location"], scan_ok)
+
+    def finish(self, parcels):
+        self.detector.finish()
+        self.start()
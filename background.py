@@ -0,0 +1,149 @@
+"""
+Parsing an upload on a background thread, with results while it runs.
+
+    job = BackgroundParse(uploaded, parse_cache).start()
+    rows, kpis, anomalies = job.snapshot()      # what changed since the last call
+    job.cancel()                                # e.g. another file was uploaded
+
+The worker checks the parse cache first, then feeds the store in batches
+of BATCH_LINES lines, each under the job's lock, so a snapshot always
+sees whole lines and a parse is never stopped in the middle of one.
+Snapshots follow ParcelStore.changes, so polling one costs the rows
+parsed since the previous poll.  `cancel` only raises a flag: the parse
+stops at the next batch (or after the step it is in) and is not cached.
+The thread runs in a copy of the caller's context, so an active
+profiling.Profile follows it.
+"""
+import contextvars
+import os
+import threading
+
+from hlc_parser import iter_lines
+from lifecycle_json import is_lifecycle_json, load_store
+from parcel_store import ParcelStore
+from parse_cache import content_key
+import profiling
+
+BATCH_LINES = 20_000                # lines fed per lock hold / cancellation check
+
+
+class BackgroundParse:
+    """One upload (path or seekable binary file) → ParcelStore on a daemon thread."""
+
+    def __init__(self, source, cache=None):
+        self.source, self.cache = source, cache
+        self.store = self._live = ParcelStore(source)   # _live: the store being fed
+        self._live.track_changes()
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.phase = "waiting"              # → checking cache → parsing → caching → done
+        self.from_cache = False
+        self.error = None
+        self.lines = 0
+        self.size = _size(source)
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(target=ctx.run, args=(self._run,),
+                                        name="background-parse", daemon=True)
+
+    def start(self) -> "BackgroundParse":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Ask the worker to stop; returns at once (`finished` is set when it has)."""
+        self.cancelled.set()
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    @property
+    def progress(self):
+        """Fraction of the input read while parsing, None if unknown."""
+        if self.done:
+            return 1.0
+        if self.phase != "parsing" or not self.size or not hasattr(self.source, "tell"):
+            return None
+        return min(1.0, self.source.tell() / self.size)
+
+    def snapshot(self):
+        """
+        (changed rows, Kpis copy, new anomalies) since the previous call,
+        consistent under the lock – see ParcelStore.changes.  None once the
+        worker has finished: the whole result is then in `store`.
+        """
+        with self.lock:
+            if self._live.touched is None:
+                return None
+            return self._live.changes()
+
+    # ── worker ──────────────────────────────────────────────────────
+    def _run(self) -> None:
+        try:
+            key = None
+            if self.cache is not None:
+                self.phase = "checking cache"
+                with profiling.stage("cache.lookup"):
+                    key = content_key(self.source)
+                    hit = self.cache.get(key, self.source)
+                if hit is not None:
+                    with self.lock:
+                        self.store, self.from_cache = hit, True
+                    return
+                if self.cancelled.is_set():
+                    return
+
+            self.phase = "parsing"
+            with profiling.stage("parse"):
+                if is_lifecycle_json(self.source):
+                    store = load_store(self.source)     # no partial results for exports
+                    with self.lock:
+                        self.store = store
+                else:
+                    self._parse()
+            if self.cancelled.is_set():
+                return
+            if key is not None:
+                self.phase = "caching"
+                with profiling.stage("cache.store"):
+                    self.cache.put(key, self.store)
+        except Exception as exc:                        # shown by the dashboard
+            self.error = exc
+        finally:
+            self.phase = "done"
+            with self.lock:
+                self._live.track_changes(False)
+            self.finished.set()
+
+    def _parse(self) -> None:
+        store = self._live
+        feed = profiling.instrument(store.feed)
+        batch = []
+
+        def flush():
+            with self.lock:
+                for offset, line in batch:
+                    feed(offset, line)
+                self.lines += len(batch)
+            batch.clear()
+
+        lines = iter_lines(self.source, offsets=True)
+        try:
+            for item in lines:
+                batch.append(item)
+                if len(batch) >= BATCH_LINES:
+                    flush()
+                    if self.cancelled.is_set():
+                        return
+        finally:
+            lines.close()                               # stops a read‑ahead thread too
+        flush()
+        with self.lock:
+            store.anomalies.finish()
+
+
+def _size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    return getattr(source, "size", None)            # Streamlit's UploadedFile
@@ -0,0 +1,207 @@
+"""
+Batch analysis of many raw HLC logs.
+
+    python batch.py logs/2025-05-*/ archive/*.txt -o may.jsonl -j 8
+
+Files (globs or directories) are parsed in parallel, one file per worker,
+then consolidated in log‑time order per PLC: a PIC generation that runs
+past the end of one file is joined with its continuation in the next
+(e.g. a parcel registered before midnight and deregistered after, or a
+late sort report after its ItemDeRegister), so the files give the same
+parcels as one concatenated log.  Output is one JSON object per parcel
+per line, plus a per‑file throughput report.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from anomalies import AnomalyDetector, Watch
+from hlc_parallel import _closed_ms, fold_partial
+from hlc_parser import Parser, _new_parcel, _parse_lines, decoders, iso_millis, iter_lines, tokenize
+from parcel_identity import ParcelIdentity
+
+LOG_PATTERNS = tuple(f"*.{ext}{z}" for ext in ("txt", "log")
+                     for z in ("", ".gz", ".zst", ".bz2", ".xz"))
+
+
+# ── Input discovery ─────────────────────────────────────────────────
+def expand_inputs(specs, patterns=LOG_PATTERNS):
+    """Globs, files and directories → sorted unique file paths."""
+    paths = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            for pat in patterns:
+                paths.update(glob.glob(os.path.join(spec, "**", pat), recursive=True))
+        else:
+            paths.update(p for p in glob.glob(spec) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def first_line_info(path):
+    """(first timestamp, PLC id) of the first parcel line, for ordering."""
+    for line in iter_lines(path):
+        tok = tokenize(line)
+        if tok is not None:
+            parts = tok[3]
+            plc = parts[1] if parts[0].startswith("HOST") else parts[0]
+            return tok[0], plc
+    return "", ""
+
+
+# ── Worker ──────────────────────────────────────────────────────────
+def parse_file(path, anomalies: bool = False):
+    """
+    One log → (stats dict, list of parcel dicts).  With `anomalies` the
+    stats also carry the file's anomaly records (see anomalies.py).
+    """
+    stats = {"file": path, "bytes": os.path.getsize(path), "lines": 0}
+    tic = time.perf_counter()
+
+    def counted(lines):
+        n = 0
+        for n, line in enumerate(lines, 1):
+            yield line
+        stats["lines"] = n
+
+    if anomalies:
+        detector = AnomalyDetector()
+        parser = Parser(decoders() + [Watch(detector)], _new_parcel)
+        parcels = list(parser.parse(counted(iter_lines(path))))
+        # a record id means nothing outside this process
+        stats["anomalies"] = [{**{k: v for k, v in r.items() if k != "key"}, "file": path}
+                              for r in detector.records]
+    else:
+        parcels = list(_parse_lines(counted(iter_lines(path)), evict=False))
+    stats["seconds"] = time.perf_counter() - tic
+    stats["parcels"] = len(parcels)
+    return stats, parcels
+
+
+def in_order(pool, fn, items, window: int):
+    """
+    fn(item) for every item on `pool`, results yielded in item order.
+    At most `window` items are submitted and not yet consumed, so
+    finished results never pile up while the caller is still busy with
+    an earlier one; use the worker count to keep every worker busy.
+    """
+    items = iter(items)
+    pending = deque(pool.submit(fn, item) for item in islice(items, window))
+    while pending:
+        result = pending.popleft().result()
+        pending.extend(pool.submit(fn, item) for item in islice(items, 1))
+        yield result
+
+
+# ── Cross‑file correlation ──────────────────────────────────────────
+def correlate(carry: dict, parcels, file_start: str = ""):
+    """
+    Join one file's parcels onto the generations carried over from
+    earlier files.  `carry` maps PIC → its current generation and is
+    updated in place; returns the generations that are finished.
+    Continuations, replays across the border and PIC reuse follow
+    ParcelIdentity's rules (see hlc_parallel.fold_partial).  Besides the
+    ones a newer generation replaced, deregistered generations whose
+    straggler window closed before `file_start` (ISO time) are finished;
+    open ones wait for their PIC's next line, at most one per PIC.
+    """
+    identity = ParcelIdentity(None)
+    before = {p["pic"]: carry.get(p["pic"]) for p in parcels}
+    added = fold_partial(carry, parcels, identity)
+    done = [p for p in before.values() if p is not None and carry[p["pic"]] is not p]
+    done += [p for p in added if carry[p["pic"]] is not p]
+
+    if file_start:
+        cutoff = iso_millis(file_start) - identity.straggler_ms
+        for pic, parcel in list(carry.items()):
+            closed = _closed_ms(parcel)
+            if closed is not None and closed < cutoff:
+                done.append(carry.pop(pic))
+    return done
+
+
+# ── Report ──────────────────────────────────────────────────────────
+def _report(stats, out=sys.stderr):
+    s = stats["seconds"] or 1e-9
+    print(
+        f"{os.path.basename(stats['file']):<40} {stats['lines']:>12,} lines "
+        f"{stats['bytes'] / 1e6:>9.1f} MB  {stats['lines'] / s:>10,.0f} lines/s "
+        f"{stats['bytes'] / 1e6 / s:>7.1f} MB/s  {stats['parcels']:>9,} parcels",
+        file=out,
+    )
+
+
+# ── Main ────────────────────────────────────────────────────────────
+def run(paths, output, workers=None, events=True, anomalies=None):
+    """
+    Parse `paths` into the JSON Lines file `output`; with `anomalies` (a
+    path) the anomaly records of every file go there, also as JSON Lines.
+    """
+    info = {path: first_line_info(path) for path in paths}
+    order = sorted(paths, key=info.get)
+    carries = {}                                # PLC → {pic: open parcel}
+    totals = {"lines": 0, "bytes": 0, "parcels": 0, "anomalies": 0}
+    tic = time.perf_counter()
+
+    def write(fh, plc, parcels):
+        for p in parcels:
+            if not events:
+                p = {k: v for k, v in p.items() if k != "events"}
+            fh.write(json.dumps({"plc": plc, **p}, separators=(",", ":")) + "\n")
+            totals["parcels"] += 1
+
+    with open(output, "w", encoding="utf-8") as fh, \
+            open(anomalies or os.devnull, "w", encoding="utf-8") as afh, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        work = partial(parse_file, anomalies=bool(anomalies))
+        window = workers or os.cpu_count() or 1
+        for path, (stats, parcels) in zip(order, in_order(pool, work, order, window)):
+            _report(stats)                      # MB are on‑disk (compressed) bytes
+            for record in stats.get("anomalies", ()):
+                afh.write(json.dumps(record, separators=(",", ":")) + "\n")
+                totals["anomalies"] += 1
+            totals["lines"] += stats["lines"]
+            totals["bytes"] += stats["bytes"]
+            start, plc = info[path]
+            write(fh, plc, correlate(carries.setdefault(plc, {}), parcels, start))
+        for plc, carry in carries.items():
+            write(fh, plc, carry.values())
+
+    s = time.perf_counter() - tic
+    print(
+        f"{len(order)} files, {totals['lines']:,} lines, {totals['bytes'] / 1e6:.1f} MB "
+        f"in {s:.1f}s ({totals['lines'] / s:,.0f} lines/s, {totals['bytes'] / 1e6 / s:.1f} MB/s) "
+        f"→ {totals['parcels']:,} parcels in {output}",
+        file=sys.stderr,
+    )
+    if anomalies:
+        print(f"{totals['anomalies']:,} anomalies in {anomalies}", file=sys.stderr)
+    return totals
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("inputs", nargs="+", help="log files, globs or directories")
+    ap.add_argument("-o", "--output", default="parcels.jsonl", help="JSON Lines output file")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                    help="parallel worker processes (default: all cores)")
+    ap.add_argument("--no-events", action="store_true", help="omit per-parcel event lists")
+    ap.add_argument("--anomalies", metavar="FILE",
+                    help="also detect stuck parcels, slow sorts and barcode error spikes "
+                         "and write them to FILE (JSON Lines)")
+    args = ap.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        ap.error("no input files found")
+    run(paths, args.output, args.workers, events=not args.no_events, anomalies=args.anomalies)
+
+
+if __name__ == "__main__":
+    main()
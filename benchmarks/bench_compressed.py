@@ -0,0 +1,67 @@
+"""
+End‑to‑end parse throughput on plain vs compressed copies of one log.
+
+    python benchmarks/bench_compressed.py path/to/log.txt
+
+Writes gzip / bz2 / xz (and zstd, if installed) copies to a temp dir and
+reports MB/s of *uncompressed* log for each, with decompression on the
+read‑ahead thread and inline.
+"""
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hlc_parser import CHUNK_SIZE, _iter_lines, _parse_lines  # noqa: E402
+from log_io import open_log, zstandard  # noqa: E402
+
+
+def compress_copies(src, tmp):
+    out = {"plain": src}
+    writers = {"gzip": (gzip.open, ".gz"), "bz2": (bz2.open, ".bz2"), "xz": (lzma.open, ".xz")}
+    for name, (opener, ext) in writers.items():
+        out[name] = os.path.join(tmp, os.path.basename(src) + ext)
+        with open(src, "rb") as fi, opener(out[name], "wb") as fo:
+            shutil.copyfileobj(fi, fo, CHUNK_SIZE)
+    if zstandard is not None:
+        out["zstd"] = os.path.join(tmp, os.path.basename(src) + ".zst")
+        with open(src, "rb") as fi, open(out["zstd"], "wb") as fo:
+            zstandard.ZstdCompressor().copy_stream(fi, fo)
+    return out
+
+
+def timed_parse(path, threaded):
+    tic = time.perf_counter()
+    with open_log(path, threaded=threaded) as fh:
+        n = sum(1 for _ in _parse_lines(_iter_lines(fh, CHUNK_SIZE, False), evict=True))
+    return time.perf_counter() - tic, n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("log")
+    args = ap.parse_args()
+
+    mb = os.path.getsize(args.log) / 1e6
+    tmp = tempfile.mkdtemp(prefix="bench-compressed-")
+    try:
+        print(f"{'format':<7} {'size MB':>8} {'threaded MB/s':>14} {'inline MB/s':>12}")
+        for name, path in compress_copies(args.log, tmp).items():
+            t_thr, n1 = timed_parse(path, threaded=True)
+            t_inl, n2 = timed_parse(path, threaded=False)
+            assert n1 == n2, (name, n1, n2)
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<7} {size:>8.1f} {mb / t_thr:>14.1f} {mb / t_inl:>12.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
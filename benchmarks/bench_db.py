@@ -0,0 +1,113 @@
+"""
+parcel_db bulk insert throughput and query latency as the database grows.
+
+    python benchmarks/bench_db.py [log.txt] [--mb 50] [--days 1 7 30]
+
+Without a log a synthetic one of `--mb` MB is written first.  It is
+parsed once; each "day" inserts those rows again as another source file,
+shifted by 24 h, into a fresh database.  After every size step the
+dashboard's queries are timed: exact lookups by host ID, barcode and PIC,
+a page of a one‑day range, the day's count and the per‑day destination
+summary over everything.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parcel_db import DAY_MS, ParcelDB, parse_rows  # noqa: E402
+from synth_log import write_log  # noqa: E402
+
+LOOKUPS = 200                       # lookups per kind, averaged
+
+
+def shifted(rows: dict, day: int) -> dict:
+    """A copy of store_rows() output moved `day` days later."""
+    if not day:
+        return rows
+    d = day * DAY_MS
+
+    def move(values):
+        return [None if v is None else v + d for v in values]
+
+    p = dict(rows["parcels"], registered_at=move(rows["parcels"]["registered_at"]),
+             closed_at=move(rows["parcels"]["closed_at"]))
+    e = dict(rows["events"], ts=move(rows["events"]["ts"]))
+    a = [(k, ts + d, *rest) for k, ts, *rest in rows["anomalies"]]
+    return {"parcels": p, "barcodes": rows["barcodes"], "events": e, "anomalies": a}
+
+
+def _mean_ms(fn, args_list) -> float:
+    tic = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - tic) / len(args_list) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("log", nargs="?")
+    ap.add_argument("--mb", type=float, default=50, help="size of the synthetic log")
+    ap.add_argument("--days", type=int, nargs="+", default=[1, 7, 30],
+                    help="database sizes to measure, in copies of the log")
+    args = ap.parse_args()
+
+    path = args.log
+    if path is None:
+        path = tempfile.NamedTemporaryFile(suffix=".txt", delete=False).name
+        write_log(path, mb=args.mb)
+    try:
+        tic = time.perf_counter()
+        rows = parse_rows(path)
+        print(f"parsed in {time.perf_counter() - tic:.1f}s: {len(rows['parcels']['pic']):,} "
+              f"parcels, {len(rows['events']['ts']):,} events per day")
+    finally:
+        if args.log is None:
+            os.unlink(path)
+
+    rnd = random.Random(1)
+    p = rows["parcels"]
+    hosts = [(h,) for h in rnd.sample([h for h in p["host_id"] if h], LOOKUPS)]
+    codes = [(bc,) for _, bc in rnd.sample(rows["barcodes"], LOOKUPS)]
+    pics = [(int(pic),) for pic in rnd.sample(p["pic"], LOOKUPS)]
+    first = min(t for t in p["registered_at"] if t is not None)
+
+    with tempfile.TemporaryDirectory() as tmp, ParcelDB(os.path.join(tmp, "bench.db")) as db:
+        print(f"{'days':>5} {'insert s':>9} {'rows/s':>10} {'skip ms':>8} {'host ms':>8} "
+              f"{'barcode ms':>10} {'pic ms':>7} {'page ms':>8} {'count ms':>9} "
+              f"{'summary ms':>11} {'MB':>7}")
+        done = 0
+        for days in sorted(args.days):
+            insert_s, n_rows = 0.0, 0
+            for day in range(done, days):
+                day_rows = shifted(rows, day)
+                tic = time.perf_counter()
+                db.insert(f"day-{day}.txt", f"key-{day}", day_rows)
+                insert_s += time.perf_counter() - tic
+                n_rows += (len(day_rows["parcels"]["pic"]) + len(day_rows["events"]["ts"])
+                           + len(day_rows["barcodes"]))
+            done = days
+
+            tic = time.perf_counter()
+            assert db.stored_key("day-0.txt") == "key-0"    # the re-ingest check
+            skip_ms = (time.perf_counter() - tic) * 1000
+            mid = first + days // 2 * DAY_MS
+            print(f"{days:>5} {insert_s:>9.2f} {n_rows / (insert_s or 1e-9):>10,.0f} "
+                  f"{skip_ms:>8.2f} "
+                  f"{_mean_ms(lambda h: db.find('hostId', h), hosts):>8.2f} "
+                  f"{_mean_ms(lambda b: db.find('barcode', b), codes):>10.2f} "
+                  f"{_mean_ms(lambda c: db.find('pic', c), pics):>7.2f} "
+                  f"{_mean_ms(lambda: db.parcels(mid, mid + DAY_MS, offset=1000), [()] * 20):>8.2f} "
+                  f"{_mean_ms(lambda: db.count(mid, mid + DAY_MS), [()] * 20):>9.2f} "
+                  f"{_mean_ms(lambda: db.summary(first, first + days * DAY_MS), [()] * 3):>11.1f} "
+                  f"{os.path.getsize(db.path) / 1e6:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Load time and peak RSS of `json.load` vs the streaming lifecycle loader.
+
+    python benchmarks/bench_json_load.py [export.json] [--mb 1024]
+
+Without an input file an export of `--mb` MB is synthesised by repeating
+the parcels of 13-May-2025-800P-1.json with fresh PICs.  Every method
+runs in its own process so peak RSS is not inherited between them.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lifecycle_json import LIFECYCLE_FIELDS, iter_records, load_store  # noqa: E402
+
+SAMPLE = os.path.join(ROOT, "13-May-2025-800P-1.json")
+METHODS = {
+    "json.load":                lambda p: len(json.load(open(p, encoding="utf-8"))),
+    "iter_records":             lambda p: sum(1 for _ in iter_records(p)),
+    "iter_records (lifecycle)": lambda p: sum(1 for _ in iter_records(p, LIFECYCLE_FIELDS)),
+    "load_store":               lambda p: len(load_store(p)),
+    "load_store (no events)":   lambda p: len(load_store(p, events=False)),
+}
+
+
+def synth_export(path, mb):
+    with open(SAMPLE, encoding="utf-8") as fh:
+        base = json.load(fh)
+    step = max(p["pic"] for p in base) + 1
+    target, written, rep = mb * 1e6, 0, 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("[\n")
+        while written < target:
+            for p in base:
+                text = json.dumps(dict(p, pic=p["pic"] + rep * step), indent=4)
+                out.write((",\n" if written else "") + text)
+                written += len(text) + 2
+            rep += 1
+        out.write("\n]\n")
+
+
+def run_one(method, path):
+    tic = time.perf_counter()
+    n = METHODS[method](path)
+    seconds = time.perf_counter() - tic
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024     # KiB on Linux
+    print(json.dumps({"parcels": n, "seconds": seconds, "rss_mb": rss_mb}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("export", nargs="?")
+    ap.add_argument("--mb", type=int, default=1024, help="size of the synthetic export")
+    ap.add_argument("--run", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run:
+        return run_one(args.run, args.export)
+
+    tmp = None
+    path = args.export
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+        synth_export(tmp, args.mb)
+        path = tmp
+    try:
+        mb = os.path.getsize(path) / 1e6
+        print(f"{os.path.basename(path)}: {mb:,.0f} MB")
+        print(f"{'method':<26} {'parcels':>10} {'seconds':>8} {'MB/s':>7} {'peak RSS MB':>12}")
+        for method in METHODS:
+            out = subprocess.run([sys.executable, __file__, path, "--run", method],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out)
+            print(f"{method:<26} {r['parcels']:>10,} {r['seconds']:>8.2f} "
+                  f"{mb / r['seconds']:>7.1f} {r['rss_mb']:>12,.0f}")
+    finally:
+        if tmp:
+            os.unlink(tmp)
+
+
+if __name__ == "__main__":
+    main()
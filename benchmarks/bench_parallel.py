@@ -0,0 +1,58 @@
+"""
+Sequential vs process‑pool parsing of one raw HLC log.
+
+    python benchmarks/bench_parallel.py [path/to/log.txt] [--mb 200] [--workers N]
+
+Without a log a synthetic one of `--mb` MB is written first.  Fails if
+the parallel result differs from the sequential one in anything but the
+position of generations replayed across a range border.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hlc_parser import parse_stream  # noqa: E402
+from hlc_parallel import generation_order, parse_file_parallel  # noqa: E402
+from synth_log import write_log  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("log", nargs="?")
+    ap.add_argument("--mb", type=float, default=200, help="size of the synthetic log")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    path = args.log
+    if path is None:
+        path = tempfile.NamedTemporaryFile(suffix=".txt", delete=False).name
+        write_log(path, mb=args.mb)
+    try:
+        mb = os.path.getsize(path) / 1e6
+
+        tic = time.perf_counter()
+        seq = list(parse_stream(path, evict=False))
+        t_seq = time.perf_counter() - tic
+
+        tic = time.perf_counter()
+        par = parse_file_parallel(path, workers=args.workers)
+        t_par = time.perf_counter() - tic
+    finally:
+        if args.log is None:
+            os.unlink(path)
+
+    if generation_order(par) != generation_order(seq):
+        sys.exit("parallel result differs from sequential parse")
+
+    print(f"parcels:    {len(seq):,}")
+    print(f"sequential: {t_seq:.2f}s  ({mb / t_seq:.1f} MB/s)")
+    print(f"parallel:   {t_par:.2f}s  ({mb / t_par:.1f} MB/s, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
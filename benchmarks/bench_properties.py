@@ -0,0 +1,112 @@
+"""
+Micro‑benchmark: line‑by‑line ItemPropertiesUpdate decoding (the old
+JK.py loop) vs the batched hlc_core.ScannedProperties decoder.
+
+    python benchmarks/bench_properties.py [log.txt] [--mb 200]
+
+Without a log a synthetic one of `--mb` MB is written first.  Only the
+decoding and merging into existing parcels is timed – tokenizing and
+creating the parcels is the same for both.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hlc_parser import iter_lines, tokenize  # noqa: E402
+from hlc_core import ScannedProperties  # noqa: E402
+from synth_log import write_log  # noqa: E402
+
+
+def _parcel():
+    return {"barcodes": [], "barcodeErr": False,
+            "volume_data": dict.fromkeys(["length", "width", "height", "box_volume",
+                                          "real_volume"])}
+
+
+# ── Decoders under test ─────────────────────────────────────────────
+def per_line(updates, parcels):
+    for host_id, parts in updates:
+        parcel = parcels[host_id]
+
+        def add_valid_barcode(barcode_str, parcel_barcodes_list):
+            if barcode_str and barcode_str.startswith("0]C") and barcode_str not in parcel_barcodes_list:
+                parcel_barcodes_list.append(barcode_str)
+
+        def process_barcode_field(field_content, barcode_list):
+            if field_content:
+                for pb in field_content.split('@'):
+                    if not pb.startswith("0]C"):
+                        pb = pb.lstrip("0")
+                    add_valid_barcode(pb, barcode_list)
+
+        if len(parts) >= 9:
+            process_barcode_field(parts[8], parcel["barcodes"])
+        if len(parts) >= 10:
+            semis = parts[9].split(";")
+            if len(semis) >= 3:
+                process_barcode_field(semis[2], parcel["barcodes"])
+            if semis and semis[0] != "6":
+                parcel["barcodeErr"] = True
+        if len(parts) >= 13:
+            volume_semis = parts[12].split(';')
+            if len(volume_semis) >= 7:
+                for name, pos in (("length", 2), ("width", 3), ("height", 4),
+                                  ("box_volume", 5), ("real_volume", 6)):
+                    try:
+                        parcel["volume_data"][name] = float(volume_semis[pos])
+                    except (ValueError, IndexError):
+                        pass
+    return parcels
+
+
+def batched(updates, parcels):
+    decoder = ScannedProperties()
+    decoder.start()
+    for host_id, parts in updates:
+        decoder.apply(parcels[host_id], None, "ItemPropertiesUpdate", None, parts)
+    decoder.finish(parcels)
+    return parcels
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("log", nargs="?")
+    ap.add_argument("--mb", type=float, default=200, help="size of the synthetic log")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    path = args.log
+    if path is None:
+        path = tempfile.NamedTemporaryFile(suffix=".txt", delete=False).name
+        write_log(path, mb=args.mb)
+    try:
+        updates = []
+        for line in iter_lines(path):
+            tok = tokenize(line)
+            if tok and tok[3][3] == "2" and len(tok[3]) > 5 and tok[3][5].strip():
+                updates.append((tok[3][5].strip(), tok[3]))
+    finally:
+        if args.log is None:
+            os.unlink(path)
+
+    print(f"{len(updates):,} ItemPropertiesUpdate lines")
+    results = {}
+    for fn in (per_line, batched):
+        best = float("inf")
+        for _ in range(args.repeat):
+            parcels = {host_id: _parcel() for host_id, _ in updates}    # as built by JK
+            tic = time.perf_counter()
+            results[fn.__name__] = fn(updates, parcels)
+            best = min(best, time.perf_counter() - tic)
+        print(f"{fn.__name__:<10} {best:>8.3f} s  {len(updates) / best:>12,.0f} lines/s")
+    assert results["per_line"] == results["batched"], "decoders disagree"
+
+
+if __name__ == "__main__":
+    main()
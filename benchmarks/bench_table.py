@@ -0,0 +1,51 @@
+"""
+All Parcels table cost as the parcel count grows.
+
+    python benchmarks/bench_table.py path/to/log.txt [--sizes 10000 100000 1000000]
+
+Tiles the parsed log's parcels up to each size and times the one‑off
+ParcelTable build and a filtered page render (what every rerun pays).
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parcel_store import build_store  # noqa: E402
+from views.all_parcels import ParcelTable  # noqa: E402
+
+
+def tiled(df, n):
+    reps = -(-n // len(df))
+    return pd.concat([df] * reps, ignore_index=True).iloc[:n]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("log")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--page", type=int, default=100)
+    args = ap.parse_args()
+
+    base = build_store(args.log).to_dataframe()
+    status = base["status"].mode()[0]
+    print(f"{'parcels':>10} {'build s':>8} {'rerun ms':>9}")
+    for n in args.sizes:
+        df = tiled(base, n)
+        tic = time.perf_counter()
+        table = ParcelTable(df)
+        t_build = time.perf_counter() - tic
+
+        tic = time.perf_counter()
+        rows = table.rows({"status": status, "LOCATION": "All", "DESTINATION": "All"})
+        table.page(rows[len(rows) // 2:len(rows) // 2 + args.page])
+        t_rerun = time.perf_counter() - tic
+        print(f"{n:>10,} {t_build:>8.2f} {t_rerun * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
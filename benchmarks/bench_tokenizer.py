@@ -0,0 +1,107 @@
+"""
+Micro‑benchmark: legacy per‑line regex/strptime loop vs hlc_parser.tokenize.
+
+    python benchmarks/bench_tokenizer.py --lines 10000000
+
+Lines are synthesised in batches from message shapes seen in the bundled
+13-May-2025 sample, so the whole log never has to exist in memory.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hlc_parser import ID_MAP, LOG_TS, RAW_BODY, LOC_PAT, tokenize  # noqa: E402
+
+# ── Synthetic message mix ───────────────────────────────────────────
+TEMPLATES = [
+    "PLC-1001|HOST-0001|{iso}|1|{pic}||1001.0023.0001.B71|INF08|2",
+    "HOST-0001|PLC-1001|{iso}|3|{pic}|{host}||",
+    "PLC-1001|HOST-0001|{iso}|2|{pic}|{host}|1001.0041.0091|1001.41.91|00000000000000000001492|"
+    "6;0101;0]C05900056383516;1100000000000000;000000;1100;1100;0;2;00000000;"
+    "________________________________;124|0000|00000783320250513074918|6;0101;0300;0295;0200;"
+    "0017700;0016745;0000000;-831;+010;mm;0;2;00000000;______________________________00;101||",
+    "HOST-0001|PLC-1001|{iso}|3|{pic}|{host}|1001.0045.0040.B71|999",
+    "PLC-1001|HOST-0001|{iso}|5|{pic}|{host}|1001.0045.0016.SCU|66,16|||16;01|1001.0023.0001.B71|2",
+    "PLC-1001|HOST-0001|{iso}|6|{pic}|{host}|1001.0045.0040.B71|999||16|16;1|1001.0023.0001.B71|2",
+    "PLC-1001|HOST-0001|{iso}|7|{pic}|{host}|1001.0045.0040.B71|999|2||1001.0023.0001.B71|2",
+    "HOST-0001|PLC-1001|{iso}|99|0",
+    "PLC-1001|HOST-0001|{iso}|98|0",
+]
+PREFIX = " INFO  [pool-1-thread-2] c.v.h.HlcTrace (HlcConnection.java:211): "
+
+
+def synth_batch(start: int, n: int, t0: datetime):
+    out = []
+    for i in range(start, start + n):
+        t = t0 + timedelta(milliseconds=i * 7)
+        ts = t.strftime("%Y-%m-%d %H:%M:%S") + f",{t.microsecond // 1000:03d}"
+        body = TEMPLATES[i % len(TEMPLATES)].format(
+            iso=t.isoformat(), pic=(i // len(TEMPLATES)) % 10000, host=2000000 + i // len(TEMPLATES)
+        )
+        out.append(ts + PREFIX + body + " []")
+    return out
+
+
+# ── Loops under test ────────────────────────────────────────────────
+def legacy_loop(lines):
+    kept = 0
+    for line in lines:
+        ts_m, body_m = LOG_TS.search(line), RAW_BODY.search(line)
+        if not (ts_m and body_m):
+            continue
+        ts_iso = datetime.strptime(
+            f"{ts_m.group(1)}.{ts_m.group(2)}", "%Y-%m-%d %H:%M:%S.%f"
+        ).isoformat()
+        parts = body_m.group(1).strip().split("|")
+        if len(parts) < 5 or ID_MAP.get(parts[3], "").startswith("Watchdog"):
+            continue
+        try:
+            int(parts[4])
+        except ValueError:
+            continue
+        LOC_PAT.search("|".join(parts))
+        raw = "|".join(parts)
+        kept += ts_iso is not None and raw is not None
+    return kept
+
+
+def tokenizer_loop(lines):
+    kept = 0
+    for line in lines:
+        tok = tokenize(line)
+        if tok is None:
+            continue
+        LOC_PAT.search(tok[2])
+        kept += 1
+    return kept
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=10_000_000)
+    ap.add_argument("--batch", type=int, default=200_000)
+    args = ap.parse_args()
+
+    t0 = datetime(2025, 5, 13, 6, 0, 0)
+    elapsed = {"legacy": 0.0, "tokenize": 0.0}
+    kept = {"legacy": 0, "tokenize": 0}
+
+    for start in range(0, args.lines, args.batch):
+        lines = synth_batch(start, min(args.batch, args.lines - start), t0)
+        for name, fn in (("legacy", legacy_loop), ("tokenize", tokenizer_loop)):
+            tic = time.perf_counter()
+            kept[name] += fn(lines)
+            elapsed[name] += time.perf_counter() - tic
+
+    assert kept["legacy"] == kept["tokenize"], kept
+    for name in elapsed:
+        print(f"{name:>9}: {args.lines / elapsed[name]:>12,.0f} lines/s  ({elapsed[name]:.2f}s)")
+    print(f"  speed‑up: {elapsed['legacy'] / elapsed['tokenize']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Synthetic raw HLC log built from the bundled sample's parcels.
+
+    python benchmarks/synth_log.py out.txt --mb 500 [--seed 1]
+
+Every parcel in 13-May-2025-800P-1.json is a *shape*: its message bodies
+and the time between them.  New parcels replay a randomly picked shape
+with a fresh PIC (recycled from the PLC's range, never while in flight),
+host ID, barcodes and start time, so the message mix, body layouts and
+per‑parcel timing follow the real log.  Watchdog request / reply pairs
+and unrelated log lines are interleaved; output is in timestamp order.
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "13-May-2025-800P-1.json")
+
+PREFIX = " INFO  [pool-1-thread-2] c.v.h.HlcTrace (HlcConnection.java:211): "
+NOISE = " DEBUG [main] c.v.h.HlcConnection (HlcConnection.java:88): heartbeat ok"
+WATCHDOG = ["HOST-0001|PLC-1001|{iso}|99|0", "PLC-1001|HOST-0001|{iso}|98|0"]
+PIC_RANGE = 9999                    # PLC PICs wrap around after this
+WATCHDOG_MS = 2000                  # one request / reply pair per interval
+NOISE_EVERY = 50                    # one unrelated line per N parcel lines
+
+
+def load_shapes(path=SAMPLE):
+    """Sample parcels → [[(ms after first event, body parts), …], …]."""
+    with open(path, encoding="utf-8") as fh:
+        parcels = json.load(fh)
+    shapes = []
+    for p in parcels:
+        events = [(datetime.fromisoformat(e["ts"]), e["raw"].split("|")) for e in p["events"]]
+        if not events:
+            continue
+        t0 = events[0][0]
+        shapes.append([((t - t0) // timedelta(milliseconds=1), parts) for t, parts in events])
+    return shapes
+
+
+def _stamp(t: datetime) -> str:
+    return t.strftime("%Y-%m-%d %H:%M:%S") + f",{t.microsecond // 1000:03d}"
+
+
+def _body(parts, t: datetime, pic: int, host: str, serial: int) -> str:
+    parts = list(parts)
+    parts[2] = t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}Z"
+    parts[4] = str(pic)
+    if len(parts) > 5 and parts[5]:
+        parts[5] = host
+    if parts[3] == "2":                         # fresh barcodes per parcel
+        if len(parts) > 8 and parts[8].strip("0"):
+            parts[8] = f"{serial % 10**9:023d}"
+        if len(parts) > 9:
+            semis = parts[9].split(";")
+            if len(semis) > 2 and semis[2].startswith("0]C"):
+                semis[2] = f"0]C{59 * 10**12 + serial:014d}"
+                parts[9] = ";".join(semis)
+    return "|".join(parts)
+
+
+def generate(shapes, seed: int = 1, rate: float = None,
+             start: datetime = datetime(2025, 5, 13, 6, 0, 0)):
+    """
+    Endless iterator of log lines.  `rate` is parcels per second; by
+    default the sample's own arrival rate.
+    """
+    rnd = random.Random(seed)
+    if rate is None:
+        span_s = max(s[-1][0] for s in shapes) / 1000 or 1
+        rate = len(shapes) / span_s
+    heap, seq = [], 0                           # (ms, seq, line) not yet written
+    busy = {}                                   # pic → ms of its last event
+    next_pic, serial, host = 1, 0, 3_000_000
+    now_ms, next_dog, emitted = 0, 0, 0
+
+    def push(ms, line):
+        nonlocal seq
+        heapq.heappush(heap, (ms, seq, line))
+        seq += 1
+
+    while True:
+        # start the next parcel
+        now_ms += int(rnd.expovariate(rate) * 1000)
+        while True:
+            pic = next_pic
+            next_pic = next_pic % PIC_RANGE + 1
+            if busy.get(pic, -1) < now_ms:
+                break
+        shape = rnd.choice(shapes)
+        host += 1
+        serial += 1
+        for offset, parts in shape:
+            t = start + timedelta(milliseconds=now_ms + offset)
+            push(now_ms + offset, _stamp(t) + PREFIX + _body(parts, t, pic, str(host), serial) + " []")
+        busy[pic] = now_ms + shape[-1][0]
+
+        while next_dog <= now_ms:
+            t = start + timedelta(milliseconds=next_dog)
+            for tpl in WATCHDOG:
+                push(next_dog, _stamp(t) + PREFIX + tpl.format(iso=t.isoformat()) + " []")
+            next_dog += WATCHDOG_MS
+
+        # everything before the current time can no longer be overtaken
+        while heap and heap[0][0] <= now_ms:
+            ms, _, line = heapq.heappop(heap)
+            yield line
+            emitted += 1
+            if emitted % NOISE_EVERY == 0:
+                yield line[:23] + NOISE
+
+
+def write_log(path, mb: float = None, lines: int = None, seed: int = 1, rate: float = None):
+    """Write a synthetic log of about `mb` MB or exactly `lines` lines → line count."""
+    limit_bytes = mb * 1e6 if mb else float("inf")
+    limit_lines = lines or float("inf")
+    n = size = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for line in generate(load_shapes(), seed, rate):
+            if n >= limit_lines or size >= limit_bytes:
+                break
+            fh.write(line + "\n")
+            n += 1
+            size += len(line) + 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("output")
+    size = ap.add_mutually_exclusive_group(required=True)
+    size.add_argument("--mb", type=float, help="approximate output size")
+    size.add_argument("--lines", type=int, help="exact number of lines")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--rate", type=float, help="parcels per second (default: sample's rate)")
+    args = ap.parse_args()
+    n = write_log(args.output, args.mb, args.lines, args.seed, args.rate)
+    print(f"{n:,} lines → {args.output} ({os.path.getsize(args.output) / 1e6:,.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,107 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import datetime
-from hlc_parser import parse_log
+from background import BackgroundParse
+from parse_cache import ParseCache
+import profiling
 
 from views.parcel_search import parcel_search_view
-from views.all_parcels import all_parcels_view
+from views.all_parcels import all_parcels_view, parcel_table_view
+from views.kpis import kpi_view, throughput_view
+from views.anomalies import anomalies_view
+from views.live import LiveResults, live_view, stop_live
+from views.database import database_view
+from views.diagnostics import diagnostics_view
+
+PARTIAL_REFRESH_S = 1              # partial results refresh while a parse runs
+FIRST_WAIT_S = 0.5                 # cache hits / small logs skip the partial view
 
 st.set_page_config(page_title="Vanderlande Parcel Dashboard", layout="wide")
 st.title("📦 Vanderlande Parcel Dashboard")
 
-uploaded = st.file_uploader("Upload raw Log File in .txt format", type="txt")
+diagnostics = st.sidebar.toggle("🩺 Diagnostics", value=profiling.enabled_by_env(),
+                                help="Time the parse and the views of the next upload")
+profiling.activate(None)
+source = st.sidebar.radio("Source", ["Upload file", "Follow live log", "Database"])
+if source == "Follow live log":
+    live_view()
+    st.stop()
+stop_live()
+if source == "Database":
+    database_view()
+    st.stop()
+
+uploaded = st.file_uploader(
+    "Upload raw Log File (.txt, or compressed .gz / .zst / .bz2 / .xz) "
+    "or a parsed lifecycle export (.json / .jsonl)",
+    type=["txt", "log", "gz", "zst", "bz2", "xz", "json", "jsonl"],
+)
 
 if not uploaded:
-    st.info("Upload Raw Log file.")
+    if st.session_state.get("job") is not None:
+        st.session_state.job.cancel()
+        st.session_state.upload_id = None
+    st.info("Upload Raw Log file or lifecycle JSON.")
     st.stop()
 
-text = uploaded.read().decode("utf-8")
-with st.spinner("Parsing log…"):
-    lifecycles = parse_log(text)
-    df = pd.DataFrame(lifecycles)
-
-# ── Metrics ─────────────────────────────────────────────────────
-total = len(df)
-sorted_cnt = (df.lifeCycle.apply(lambda x: x["status"]) == "sorted").sum()
-dereg_cnt  = (df.lifeCycle.apply(lambda x: x["status"]) == "deregistered").sum()
-barcode_err= df.barcodeErr.sum()
-
-def cycle_s(lc):
-    if lc["registeredAt"] and lc["closedAt"]:
-        return (datetime.fromisoformat(lc["closedAt"]) -
-                datetime.fromisoformat(lc["registeredAt"])).total_seconds()
-    return None
-
-cycle_vals = df.lifeCycle.map(cycle_s).dropna()
-avg_cycle = sum(cycle_vals) / len(cycle_vals) if len(cycle_vals) else 0
-
-if total:
-    first_ts = min(datetime.fromisoformat(l["registeredAt"]) for l in df.lifeCycle)
-    last_ts  = max(datetime.fromisoformat(l["closedAt"] or l["registeredAt"]) for l in df.lifeCycle)
-    tph = total / ((last_ts - first_ts).total_seconds()/3600 or 1)
-else:
-    tph = 0
-
-# ── Dashboard Metrics ───────────────────────────────────────────
-c1, c2, c3 = st.columns(3)
-with c1:
-    st.metric("Total Parcels", total)
-    st.metric("% Sorted", f"{sorted_cnt/total*100:.1f}%" if total else "0%")
-with c2:
-    st.metric("% Barcode Err", f"{barcode_err/total*100:.1f}%" if total else "0%")
-    st.metric("% Deregistered", f"{dereg_cnt/total*100:.1f}%" if total else "0%")
-with c3:
-    st.metric("Avg Cycle (s)", f"{avg_cycle:.1f}")
+@st.cache_resource
+def parse_cache():
+    # one per server process; LOG_ANALYZER_CACHE_DIR picks the directory
+    return ParseCache()
+
+# reruns of the same upload reuse the session's parse; a new upload
+# cancels the previous one and is parsed on a background thread (looked
+# up by content hash first), showing partial results until it is done
+upload_id = getattr(uploaded, "file_id", None) or (uploaded.name, uploaded.size)
+new_upload = st.session_state.get("upload_id") != upload_id
+
+# a profile covers one upload: its parse, then every view rerun after it
+if new_upload:
+    st.session_state.profile = profiling.Profile() if diagnostics else None
+profiling.activate(st.session_state.get("profile") if diagnostics else None)
+
+if new_upload:
+    if st.session_state.get("job") is not None:
+        st.session_state.job.cancel()
+    job = BackgroundParse(uploaded, parse_cache()).start()
+    st.session_state.update(upload_id=upload_id, job=job, partial=LiveResults(),
+                            store=None, df=None)
+
+job = st.session_state.job
+job.finished.wait(FIRST_WAIT_S)
+if not job.done:
+    @st.fragment(run_every=PARTIAL_REFRESH_S)
+    def partial():
+        changes = job.snapshot()
+        if changes is None or job.done:
+            st.rerun()                              # full dashboard from the final store
+        results = st.session_state.partial.update(changes)
+        progress = job.progress
+        label = f"Parsing… {job.lines:,} lines"
+        if progress is None:
+            st.caption(label)
+        else:
+            st.progress(progress, text=f"{label} ({progress:.0%})")
+        kpi_view(results.kpis)
+        st.caption(f"{len(results.anomalies):,} anomalies so far")
+        st.divider()
+        parcel_table_view(results.table)
+
+    partial()
+    st.stop()
+
+if job.error is not None:
+    st.error(f"Could not parse {uploaded.name}: {job.error}")
+    st.stop()
+if st.session_state.store is not job.store:
+    with profiling.stage("dataframe"):
+        st.session_state.update(store=job.store, df=job.store.to_dataframe(), partial=None)
+
+store, df = st.session_state.store, st.session_state.df
+
+kpi_view(store.kpis)
+with st.expander("📈 Throughput"):
+    throughput_view(store.kpis)
+with st.expander(f"⚠️ Anomalies ({len(store.anomalies):,})"):
+    anomalies_view(store.anomalies)
 
 st.divider()
 
@@ -60,6 +109,10 @@ st.divider()
 tab1, tab2 = st.tabs(["🔍 Parcel Search", "📦 All Parcels"])
 
 with tab1:
-    parcel_search_view(df)
+    parcel_search_view(df, store)
 with tab2:
     all_parcels_view(df)
+
+if profiling.current() is not None:
+    with st.expander("🩺 Diagnostics"):
+        diagnostics_view(profiling.current())
@@ -0,0 +1,488 @@
+
+"""
+Parser core shared by every raw‑log consumer (hlc_parser, JK.py).
+
+Lines are tokenized once, routed to a parcel record – per PIC generation
+or per host ID – and folded in by the decoders the consumer configured.
+Decoders are registered by message‑type ID in a dispatch table, so a
+line only runs the decoders that care about its type, and a consumer
+that never reads (say) volume data never pays for decoding it.
+"""
+import calendar
+import re
+from datetime import datetime, timedelta, timezone
+
+from parcel_identity import ParcelIdentity
+import profiling
+
+# ── Message‑type mapping ────────────────────────────────────────────
+ID_MAP = {
+    "1":  "ItemRegister",
+    "2":  "ItemPropertiesUpdate",
+    "3":  "ItemInstruction",
+    "5":  "UnverifiedSortReport",
+    "6":  "VerifiedSortReport",
+    "7":  "ItemDeRegister",
+    "98": "WatchdogReply",
+    "99": "WatchdogRequest",
+}
+
+# ── Regex helpers ───────────────────────────────────────────────────
+LOG_TS   = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3})')
+RAW_BODY = re.compile(r'\): (.*?)(?: \[\]$)')
+LOC_PAT  = re.compile(r'\b\d{4}\.\d{4}\.\d{4}\.B\d{2}\b')   # chute/station code
+
+# ── Fast line tokenizer ─────────────────────────────────────────────
+SKIP_TYPES = frozenset(k for k, v in ID_MAP.items() if v.startswith("Watchdog"))
+
+_SEC_CACHE = {}                     # "YYYY-MM-DD HH:MM:SS" → (ISO seconds, epoch s)
+_SEC_CACHE_MAX = 4096
+
+
+def _ts_second(line: str):
+    """
+    Validate the fixed‑layout `YYYY-MM-DD HH:MM:SS,mmm` prefix and return
+    (iso_seconds, epoch_seconds) for it, computed once per distinct second.
+    None if the prefix is malformed.  Log times are naive; epoch values
+    treat them as UTC.
+    """
+    ms = line[20:23]
+    if line[19:20] != "," or len(ms) != 3 or not ms.isdecimal():
+        return None
+
+    sec = line[:19]
+    entry = _SEC_CACHE.get(sec)
+    if entry is None:
+        if not LOG_TS.match(line):
+            return None
+        try:
+            dt = datetime(
+                int(sec[0:4]), int(sec[5:7]), int(sec[8:10]),
+                int(sec[11:13]), int(sec[14:16]), int(sec[17:19]),
+            )
+        except ValueError:
+            return None
+        if len(_SEC_CACHE) >= _SEC_CACHE_MAX:
+            _SEC_CACHE.clear()
+        entry = _SEC_CACHE[sec] = (dt.isoformat(), calendar.timegm(dt.timetuple()))
+    return entry
+
+
+def _ts_iso(line: str):
+    """Timestamp prefix → ISO string, identical to `strptime(...).isoformat()`."""
+    entry = _ts_second(line)
+    if entry is None:
+        return None
+    ms = line[20:23]
+    # isoformat() drops the fraction entirely when it is zero
+    return entry[0] if ms == "000" else f"{entry[0]}.{ms}000"
+
+
+def ts_millis(line: str):
+    """Timestamp prefix → int epoch milliseconds, or None if malformed."""
+    entry = _ts_second(line)
+    if entry is None:
+        return None
+    return entry[1] * 1000 + int(line[20:23])
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MS = timedelta(milliseconds=1)
+
+
+def iso_millis(ts_iso: str) -> int:
+    """ISO timestamp (parser output or an export; naive = UTC) → int epoch ms."""
+    dt = datetime.fromisoformat(ts_iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MS
+
+
+def tokenize(line: str):
+    """
+    One raw log line → (ts_iso, pic, body, parts), or None for lines the
+    parser ignores.  Cheapest rejections run first: trailer / body marker,
+    then the message‑type field (watchdogs), then the PIC, and only then
+    the timestamp.  `body` is the original slice, so callers never need to
+    re‑join `parts`.
+    """
+    if not line.endswith(" []"):
+        return None
+    start = line.find("): ")
+    if start < 0 or start + 3 > len(line) - 3:
+        return None
+    body = line[start + 3:-3].strip()
+
+    head = body.split("|", 5)
+    if len(head) < 5 or head[3] in SKIP_TYPES:
+        return None
+    try:
+        pic = int(head[4])
+    except ValueError:
+        return None
+
+    ts_iso = _ts_iso(line)
+    if ts_iso is None:
+        return None
+
+    parts = head if len(head) < 6 else head[:5] + head[5].split("|")
+    return ts_iso, pic, body, parts
+
+
+REJECT_REASONS = ("no body", "watchdog", "non-int PIC", "no timestamp")
+
+
+def reject_reason(line: str) -> str:
+    """Why `tokenize` dropped `line`: one of REJECT_REASONS, same checks in the same order."""
+    start = line.find("): ") if line.endswith(" []") else -1
+    if start < 0 or start + 3 > len(line) - 3:
+        return "no body"
+    head = line[start + 3:-3].strip().split("|", 5)
+    if len(head) < 5:
+        return "no body"
+    if head[3] in SKIP_TYPES:
+        return "watchdog"
+    try:
+        int(head[4])
+    except ValueError:
+        return "non-int PIC"
+    return "no timestamp"
+
+
+# ── Parcel records ──────────────────────────────────────────────────
+class DictRecords:
+    """
+    Parcel records as dicts made by `new_record()` – the hlc_parser / JK
+    output.  Decoders write records only through these methods, so the
+    same decoders also fill the columns of a ParcelStore, which offers
+    the same methods for its rows.  Values are first‑seen‑wins except
+    status and closedAt; `millis` False: `ts` is the line's ISO time.
+    """
+    millis = False
+
+    def __init__(self, new_record):
+        self.new_record = new_record
+
+    def new(self, pic: int) -> dict:
+        parcel = self.new_record()
+        parcel["pic"] = pic
+        return parcel
+
+    def location_of(self, parcel):
+        return parcel["location"]
+
+    def set_first(self, parcel, field: str, value) -> None:
+        """"hostId" / "location" / "destination", unless already truthy."""
+        parcel[field] = parcel[field] or value
+
+    def set_registered(self, parcel, ts) -> None:
+        parcel["lifeCycle"]["registeredAt"] = parcel["lifeCycle"]["registeredAt"] or ts
+
+    def set_closed(self, parcel, ts) -> None:
+        parcel["lifeCycle"]["closedAt"] = ts
+
+    def status_of(self, parcel) -> str:
+        return parcel["lifeCycle"]["status"]
+
+    def set_status(self, parcel, status: str) -> None:
+        parcel["lifeCycle"]["status"] = status
+
+    def add_barcode(self, parcel, bc: str) -> None:
+        if bc not in parcel["barcodes"]:
+            parcel["barcodes"].append(bc)
+
+    def set_scanned(self, parcel, ok: bool) -> None:
+        """A barcode scan's status; a failed scan flags a barcode error."""
+        if not ok:
+            parcel["barcodeErr"] = True
+
+    def add_event(self, parcel, ts, msg: str, body: str) -> None:
+        parcel["events"].append({"ts": ts, "type": msg, "raw": body})
+
+
+# ── Decoders ────────────────────────────────────────────────────────
+ANY_TYPE = "*"                      # register for every line, known type or not
+
+
+class Decoder:
+    """
+    Folds lines of the message types in `types` into a parcel record,
+    through `records` (set by the Parser the decoder is given to).
+    `apply` runs per line; a decoder that defers work (`batched`) does it
+    in `finish`, which gets every record once the input is exhausted.
+    `start` resets per‑parse state.
+    """
+    types = ()
+    batched = False
+    records = None
+
+    def start(self) -> None:
+        pass
+
+    def apply(self, parcel, ts, msg: str, body: str, parts) -> None:
+        raise NotImplementedError
+
+    def finish(self, parcels) -> None:
+        pass
+
+
+class LocationFallback(Decoder):
+    """First chute/station code anywhere in the body, until a field sets one."""
+    types = (ANY_TYPE,)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        if not self.records.location_of(parcel):
+            loc_m = LOC_PAT.search(body)
+            if loc_m:
+                self.records.set_first(parcel, "location", loc_m.group(0))
+
+
+class Registered(Decoder):
+    types = ("1",)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        self.records.set_registered(parcel, ts)
+
+
+class Instruction(Decoder):
+    """…| PIC | HOSTID | LOCATION | DESTINATION |…  (hostId only if asked for)"""
+    types = ("3",)
+
+    def __init__(self, host_id: bool = True):
+        self.host_id = host_id
+
+    def apply(self, parcel, ts, msg, body, parts):
+        set_first = self.records.set_first
+        if len(parts) >= 7:
+            if self.host_id:
+                set_first(parcel, "hostId", parts[5])
+            set_first(parcel, "location", parts[6])
+        if len(parts) >= 8:
+            set_first(parcel, "destination", parts[7])
+
+
+class PropertiesLocation(Decoder):
+    """ItemPropertiesUpdate field 6 = location."""
+    types = ("2",)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        if len(parts) >= 7:
+            self.records.set_first(parcel, "location", parts[6])
+
+
+class Barcodes(Decoder):
+    """
+    Every barcode an ItemPropertiesUpdate carries: field 8 without its
+    zero padding and the third `;` field of field 9; a field‑9 status
+    other than "6" is a failed scan (a barcode error).
+    """
+    types = ("2",)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        records = self.records
+        if len(parts) >= 9:
+            bc = parts[8].lstrip("0")
+            if bc:
+                records.add_barcode(parcel, bc)
+        if len(parts) >= 10:
+            semis = parts[9].split(";")
+            if len(semis) >= 3 and semis[2]:
+                records.add_barcode(parcel, semis[2])
+            records.set_scanned(parcel, semis[0] == "6")
+
+
+class ScannedProperties(Decoder):
+    """
+    Scanner barcodes (`0]C…` only, `@`‑joined), the barcode error flag
+    and, with `volume`, the dimension readings of field 12 into
+    `volume_data` – decoded in batches at the end of the parse (see
+    item_properties), so records only see them once input is exhausted.
+    It writes dict records (JK's) directly, so it needs no Parser.
+    """
+    types = ("2",)
+    batched = True
+
+    def __init__(self, volume: bool = True):
+        self.volume = volume
+
+    def start(self):
+        # pandas / pyarrow only load for consumers that use this decoder
+        from item_properties import PropertiesBatch
+        self.batch = PropertiesBatch(volume=self.volume)
+        self.refs = {}                              # id → record, keeps ids stable
+
+    def apply(self, parcel, ts, msg, body, parts):
+        self.refs[id(parcel)] = parcel
+        self.batch.add(id(parcel), parts)
+
+    def finish(self, parcels):
+        from item_properties import VOLUME_FIELDS
+        volume, barcode_err, barcodes = self.batch.per_key()
+        refs = self.refs
+        if self.volume:
+            # the last valid reading of each dimension wins
+            for key, values in zip(volume.index.tolist(), volume.to_numpy().tolist()):
+                refs[key]["volume_data"].update(
+                    (name, v) for name, v in zip(VOLUME_FIELDS, values) if v == v)  # skip NaN
+        for key, barcode in barcodes:
+            refs[key]["barcodes"].append(barcode)
+        for key in barcode_err.tolist():
+            refs[key]["barcodeErr"] = True
+        self.start()                                # drop the references
+
+
+class Sorted(Decoder):
+    types = ("6",)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        self.records.set_status(parcel, "sorted")
+
+
+class Deregistered(Decoder):
+    """Closes the parcel; a sorted one stays sorted."""
+    types = ("7",)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        if self.records.status_of(parcel) != "sorted":
+            self.records.set_status(parcel, "deregistered")
+        self.records.set_closed(parcel, ts)
+
+
+class Events(Decoder):
+    """Raw event list: ts, type name and the message body of every line."""
+    types = (ANY_TYPE,)
+
+    def apply(self, parcel, ts, msg, body, parts):
+        self.records.add_event(parcel, ts, msg, body)
+
+
+# ── Core loop ───────────────────────────────────────────────────────
+class Parser:
+    """
+    One configured parser: `decoders` (run in list order within a line),
+    `records` that they write to – a DictRecords, or a `new_record()`
+    factory for one, or a ParcelStore – and the key records are grouped
+    by: "pic" (one record per PIC generation, see parcel_identity) or
+    "hostId" (dict records only: one per host ID; lines without one are
+    skipped, and the record's pic / hostId follow the latest line).
+    Decoder instances belong to the one Parser they were given to.
+    """
+
+    def __init__(self, decoders, records, key: str = "pic"):
+        if key not in ("pic", "hostId"):
+            raise ValueError(f"unknown parcel key {key!r}")
+        if callable(records):
+            records = DictRecords(records)
+        self.decoders, self.records, self.key = list(decoders), records, key
+        for decoder in self.decoders:
+            decoder.records = records
+        # type ID → bound `apply` of every decoder for it, in order
+        self.dispatch = {
+            type_id: tuple(d.apply for d in self.decoders
+                           if ANY_TYPE in d.types or type_id in d.types)
+            for type_id in {t for d in self.decoders for t in d.types if t != ANY_TYPE}
+        }
+        self.default = tuple(d.apply for d in self.decoders if ANY_TYPE in d.types)
+
+    def apply(self, parcel, ts, msg: str, body: str, parts) -> None:
+        """Fold one tokenized line into `parcel`."""
+        for apply in self.dispatch.get(parts[3], self.default):
+            apply(parcel, ts, msg, body, parts)
+
+    def parse(self, lines, evict: bool = False):
+        """
+        Raw lines → iterator of parcel records.  With `evict=True` (PIC
+        key only) a record is yielded, and forgotten, as soon as its
+        generation has ended; otherwise all are yielded at the end in
+        first‑seen order.
+        """
+        batched = [d for d in self.decoders if d.batched]
+        if evict and (batched or self.key != "pic"):
+            raise ValueError("evict needs the PIC key and no batched decoders")
+        for decoder in self.decoders:
+            decoder.start()
+        parcels = self._by_pic(lines, evict) if self.key == "pic" else self._by_host(lines)
+        if not batched:
+            return parcels
+        parcels = list(parcels)
+        for decoder in batched:
+            decoder.finish(parcels)
+        return iter(parcels)
+
+    def feeder(self, identity):
+        """
+        Line handler for the PIC key: `feed(line)` routes a raw line to
+        its record through `identity` (a ParcelIdentity whose `new` makes
+        records) and folds it in → (pic, msg, epoch ms), or None if the
+        line was skipped.  For callers that push lines one at a time.
+        """
+        dispatch, default = self.dispatch, self.default
+        millis = self.records.millis
+
+        def feed(line):
+            tok = tokenize(line)
+            if tok is None:
+                return None
+            ts_iso, pic, body, parts = tok
+            msg = ID_MAP.get(parts[3], f"Type{parts[3]}")
+
+            # tokenize() just validated the prefix, so its second is usually
+            # cached; another parser may have cleared the cache since
+            entry = _SEC_CACHE.get(line[:19]) or _ts_second(line)
+            ts = entry[1] * 1000 + int(line[20:23])
+            parcel = identity.resolve(pic, msg, ts)
+            at = ts if millis else ts_iso
+            for apply in dispatch.get(parts[3], default):
+                apply(parcel, at, msg, body, parts)
+            return pic, msg, ts
+
+        return feed
+
+    def _by_pic(self, lines, evict: bool):
+        parcels, done = [], []
+        new_record = self.records.new
+
+        def new(pic):
+            parcel = new_record(pic)
+            if not evict:
+                parcels.append(parcel)
+            return parcel
+
+        identity = ParcelIdentity(new, done.append if evict else None)
+        feed = profiling.instrument(self.feeder(identity))
+        for line in lines:
+            feed(line)
+            if done:
+                yield from done
+                done.clear()
+
+        identity.retire_all()
+        yield from done if evict else parcels
+
+    def _by_host(self, lines):
+        parcels = {}
+        dispatch, default = self.dispatch, self.default
+
+        def feed(line):
+            tok = tokenize(line)
+            if tok is None:
+                return None
+            ts_iso, pic, body, parts = tok
+            msg = ID_MAP.get(parts[3], f"Type{parts[3]}")
+            host_id = parts[5].strip() if len(parts) >= 6 else ""
+            if not host_id:
+                return pic, msg
+
+            parcel = parcels.get(host_id)
+            if parcel is None:
+                parcel = parcels[host_id] = self.records.new(pic)
+            parcel["pic"] = pic
+            parcel["hostId"] = host_id
+            for apply in dispatch.get(parts[3], default):
+                apply(parcel, ts_iso, msg, body, parts)
+            return pic, msg
+
+        feed = profiling.instrument(feed)
+        for line in lines:
+            feed(line)
+        return iter(parcels.values())
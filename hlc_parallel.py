@@ -0,0 +1,182 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from hlc_parser import (CHUNK_SIZE, _apply, _new_parcel, _parse_lines, iso_millis,
+                        iter_lines, merge_parcel)
+from log_io import detect_compression
+from parcel_identity import ParcelIdentity
+
+# ── Tunables ────────────────────────────────────────────────────────
+MIN_RANGE = 8 << 20             # don't bother splitting below 8 MiB per worker
+
+
+# ── Byte‑range helpers ──────────────────────────────────────────────
+class _ByteRange:
+    """Read‑only view of bytes [start, end) of a file, for iter_lines()."""
+
+    def __init__(self, fh, start: int, end: int):
+        fh.seek(start)
+        self.fh, self.left = fh, end - start
+
+    def read(self, n: int = -1) -> bytes:
+        if self.left <= 0:
+            return b""
+        n = self.left if n < 0 else min(n, self.left)
+        data = self.fh.read(n)
+        self.left -= len(data)
+        return data
+
+
+def split_ranges(path, parts: int):
+    """
+    Cut a file into ≤ `parts` byte ranges [(start, end), …] whose borders
+    all fall on line starts, so no line is shared between two ranges.
+    """
+    size = os.path.getsize(path)
+    if parts <= 1 or size == 0:
+        return [(0, size)]
+
+    cuts = [0]
+    with open(path, "rb") as fh:
+        for i in range(1, parts):
+            fh.seek(max(size * i // parts, cuts[-1]))
+            fh.readline()                           # skip to next line start
+            pos = fh.tell()
+            if pos >= size:
+                break
+            if pos > cuts[-1]:
+                cuts.append(pos)
+    cuts.append(size)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+# ── Worker ──────────────────────────────────────────────────────────
+def _parse_range(args):
+    path, start, end, chunk_size = args
+    with open(path, "rb") as fh:
+        return list(_parse_lines(iter_lines(_ByteRange(fh, start, end), chunk_size)))
+
+
+# ── Merging per‑range results ───────────────────────────────────────
+def _closed_ms(parcel):
+    closed = parcel["lifeCycle"]["closedAt"]
+    return None if closed is None else iso_millis(closed)
+
+
+def _registered(parcel) -> bool:
+    return any(ev["type"] == "ItemRegister" for ev in parcel["events"])
+
+
+def _starts_new(identity, prev, parcel) -> bool:
+    """Would a sequential pass have begun a new generation at `parcel`'s first line?"""
+    first = parcel["events"][0]
+    ts, closed = iso_millis(first["ts"]), _closed_ms(prev)
+    if closed is not None and closed < ts - identity.straggler_ms:
+        return True                                         # straggler window expired
+    return identity.ends(closed is not None, _registered(prev),
+                         iso_millis(prev["events"][-1]["ts"]), first["type"], ts)
+
+
+def _needs_replay(identity, prev, parcel) -> bool:
+    # a worker that started mid‑way did not know `prev` was registered or
+    # deregistered, so it may have kept lines that a sequential pass
+    # would have split off
+    closed = _closed_ms(prev)
+    ended = closed is not None or _registered(prev)
+    return any((ended and ev["type"] == "ItemRegister")
+               or (closed is not None and iso_millis(ev["ts"]) > closed + identity.straggler_ms)
+               for ev in parcel["events"][1:])
+
+
+def _replay(prev, generations, new):
+    """Re‑run the events of `generations` on top of `prev` → active generation."""
+    identity = ParcelIdentity(new)
+    pic = prev["pic"]
+    identity.adopt(pic, prev, iso_millis(prev["events"][-1]["ts"]), _closed_ms(prev),
+                   _registered(prev))
+    for parcel in generations:
+        for ev in parcel["events"]:
+            target = identity.resolve(pic, ev["type"], iso_millis(ev["ts"]))
+            _apply(target, ev["ts"], ev["type"], ev["raw"], ev["raw"].split("|"))
+    return identity.active[pic].handle
+
+
+def fold_partial(active: dict, partial, identity=None) -> list:
+    """
+    Fold one range's parcels (in file order) onto `active`, the current
+    generation of every PIC seen so far, which is updated in place →
+    the generations `partial` started.  A range's first generation of a
+    PIC either continues the PIC's current generation or starts a new
+    one, by the same rules ParcelIdentity applies line by line.
+    """
+    identity = identity or ParcelIdentity(None)
+    added = []
+
+    def new(pic):
+        parcel = _new_parcel()
+        parcel["pic"] = pic
+        added.append(parcel)
+        return parcel
+
+    by_pic, replayed = {}, set()
+    for parcel in partial:
+        by_pic.setdefault(parcel["pic"], []).append(parcel)
+    for parcel in partial:
+        pic = parcel["pic"]
+        prev = active.get(pic)
+        if pic in replayed:
+            continue
+        if by_pic[pic][0] is not parcel or prev is None or _starts_new(identity, prev, parcel):
+            added.append(parcel)
+            active[pic] = parcel
+        elif _needs_replay(identity, prev, parcel):
+            active[pic] = _replay(prev, by_pic[pic], new)
+            replayed.add(pic)
+        else:
+            merge_parcel(prev, parcel)
+    return added
+
+
+def merge_partials(partials):
+    """Fold per‑range parcel lists (in file order) into one list of PIC generations."""
+    merged, active = [], {}                     # all generations; pic → current one
+    identity = ParcelIdentity(None)
+    for partial in partials:
+        merged.extend(fold_partial(active, partial, identity))
+    return merged
+
+
+def generation_order(parcels) -> list:
+    """Parcels sorted by (PIC, first event time): an order that does not
+    depend on how the log was split."""
+    return sorted(parcels, key=lambda p: (p["pic"], p["events"][0]["ts"] if p["events"] else ""))
+
+
+# ── Public entry point ──────────────────────────────────────────────
+def parse_file_parallel(path, workers: int = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Parse a log file on a process pool → list[dict], the same parcels as
+    `parse_log(open(path).read())`.
+
+    Each worker parses one line‑aligned byte range into partial PIC
+    generations; the partials are folded with `merge_partials` in file
+    order, which is the log's timestamp order, so first‑value‑wins fields,
+    the status rule and barcode order match the sequential pass exactly.
+    Generations rebuilt by a replay across a range border are listed at
+    the border rather than at their first line, so compare results in
+    `generation_order`.
+    """
+    workers = workers or os.cpu_count() or 1
+    if detect_compression(path):
+        # compressed streams can't be entered mid‑file: one sequential pass
+        return list(_parse_lines(iter_lines(path, chunk_size)))
+
+    size = os.path.getsize(path)
+    ranges = split_ranges(path, min(workers, max(1, size // MIN_RANGE)))
+
+    if len(ranges) == 1:
+        return _parse_range((path, 0, size, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        jobs = [(path, start, end, chunk_size) for start, end in ranges]
+        return merge_partials(pool.map(_parse_range, jobs))  # keeps range order
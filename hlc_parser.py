@@ -1,34 +1,62 @@
+from hlc_core import (  # noqa: F401 – tokenizer names re‑exported, they used to live here
+    ID_MAP, LOC_PAT, LOG_TS, RAW_BODY, Barcodes, Deregistered, Events, Instruction,
+    LocationFallback, Parser, PropertiesLocation, Registered, Sorted, iso_millis, tokenize,
+    ts_millis,
+)
+import profiling
+from log_io import open_log
 
-import re
-from collections import defaultdict
-from datetime import datetime
-
-# ── Message‑type mapping ────────────────────────────────────────────
-ID_MAP = {
-    "1":  "ItemRegister",
-    "2":  "ItemPropertiesUpdate",
-    "3":  "ItemInstruction",
-    "5":  "UnverifiedSortReport",
-    "6":  "VerifiedSortReport",
-    "7":  "ItemDeRegister",
-    "98": "WatchdogReply",
-    "99": "WatchdogRequest",
-}
-
-# ── Regex helpers ───────────────────────────────────────────────────
-LOG_TS   = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3})')
-RAW_BODY = re.compile(r'\): (.*?)(?: \[\]$)')
-LOC_PAT  = re.compile(r'\b\d{4}\.\d{4}\.\d{4}\.B\d{2}\b')   # chute/station code
-
-# ── Main parser ─────────────────────────────────────────────────────
-def parse_log(text: str):
+
+# ── Streaming input ─────────────────────────────────────────────────
+CHUNK_SIZE = 1 << 20                                        # 1 MiB reads
+
+
+def iter_lines(source, chunk_size: int = CHUNK_SIZE, offsets: bool = False):
     """
-    Parse entire raw log text → list[dict] (one dict per PIC).
-    Dict schema:
-        pic, hostId, barcodes[], location, destination,
-        lifeCycle{registeredAt, closedAt, status}, barcodeErr, events[].
+    Yield decoded text lines from a binary file object or a path.
+    The source is read in `chunk_size` blocks; a line split across two
+    blocks is carried over as bytes, so memory stays bounded by the
+    chunk size plus the longest line.  gzip / zstd / bz2 / xz input is
+    decompressed on the fly (see log_io.open_log).  With `offsets=True`
+    each item is (byte_offset_of_line, line) instead; offsets count
+    decompressed bytes.
     """
-    parcels = defaultdict(lambda: {
+    with open_log(source) as fh:
+        profile = profiling.current()
+        if profile is None:
+            yield from _iter_lines(fh, chunk_size, offsets)
+        else:
+            yield from profile.iter_lines(fh, lambda f: _line_chunks(f, chunk_size, offsets))
+
+
+def _iter_lines(source, chunk_size: int, offsets: bool):
+    for lines in _line_chunks(source, chunk_size, offsets):
+        yield from lines
+
+
+def _line_chunks(source, chunk_size: int, offsets: bool):
+    """The lines of each `chunk_size` read, one list per read."""
+    carry, pos = b"", 0                                     # pos = offset of carry
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        pieces = (carry + chunk).split(b"\n")
+        carry = pieces.pop()                                # incomplete last line
+        lines = []
+        for piece in pieces:
+            for line in piece.decode("utf-8", errors="replace").splitlines():
+                lines.append((pos, line) if offsets else line)
+            pos += len(piece) + 1
+        yield lines
+    if carry:
+        yield [(pos, line) if offsets else line
+               for line in carry.decode("utf-8", errors="replace").splitlines()]
+
+
+# ── Parcel records ──────────────────────────────────────────────────
+def _new_parcel():
+    return {
         "pic": None,
         "hostId": None,
         "barcodes": [],           # list of every barcode seen
@@ -37,84 +65,79 @@ def parse_log(text: str):
         "lifeCycle": {"registeredAt": None, "closedAt": None, "status": "open"},
         "barcodeErr": False,
         "events": []
-    })
-
-    for line in text.splitlines():
-        # timestamp & body extraction
-        ts_m, body_m = LOG_TS.search(line), RAW_BODY.search(line)
-        if not (ts_m and body_m):
-            continue
-
-        ts_iso = datetime.strptime(
-            f"{ts_m.group(1)}.{ts_m.group(2)}", "%Y-%m-%d %H:%M:%S.%f"
-        ).isoformat()
-
-        parts = body_m.group(1).strip().split("|")
-        if len(parts) < 5 or ID_MAP.get(parts[3], "").startswith("Watchdog"):
-            continue
-
-        # PIC must be int
-        try:
-            pic = int(parts[4])
-        except ValueError:
-            continue
-
-        parcel = parcels[pic]
-        parcel["pic"] = pic
-        msg = ID_MAP.get(parts[3], f"Type{parts[3]}")
-
-        # universal location fallback
-        if not parcel["location"]:
-            loc_m = LOC_PAT.search("|".join(parts))
-            if loc_m:
-                parcel["location"] = loc_m.group(0)
-
-        # ── message‑specific handling ─────────────────────────────
-        if msg == "ItemRegister":
-            parcel["lifeCycle"]["registeredAt"] = (
-                parcel["lifeCycle"]["registeredAt"] or ts_iso
-            )
-
-        elif msg == "ItemInstruction":
-            # …| PIC | HOSTID | LOCATION | DESTINATION |…
-            if len(parts) >= 7:
-                parcel["hostId"]   = parcel["hostId"]   or parts[5]
-                parcel["location"] = parcel["location"] or parts[6]
-            if len(parts) >= 8:
-                parcel["destination"] = parcel["destination"] or parts[7]
-
-        elif msg == "ItemPropertiesUpdate":
-            # layout sample: |…| field6=location | field8=longBarcode | field9=status;BCode;Loc
-            if len(parts) >= 7:
-                parcel["location"] = parcel["location"] or parts[6]
-
-            # primary barcode (field8)
-            if len(parts) >= 9:
-                bc = parts[8].lstrip("0")
-                if bc and bc not in parcel["barcodes"]:
-                    parcel["barcodes"].append(bc)
-
-            # secondary barcode in semicolon block (field9)
-            if len(parts) >= 10:
-                semis = parts[9].split(";")
-                if len(semis) >= 3:
-                    bc2 = semis[2]
-                    if bc2 and bc2 not in parcel["barcodes"]:
-                        parcel["barcodes"].append(bc2)
-                # status flag
-                if semis and semis[0] != "6":
-                    parcel["barcodeErr"] = True
-
-        elif msg == "VerifiedSortReport":
-            parcel["lifeCycle"]["status"] = "sorted"
-
-        elif msg == "ItemDeRegister":
-            if parcel["lifeCycle"]["status"] != "sorted":
-                parcel["lifeCycle"]["status"] = "deregistered"
-            parcel["lifeCycle"]["closedAt"] = ts_iso
-
-        # store raw event
-        parcel["events"].append({"ts": ts_iso, "type": msg, "raw": "|".join(parts)})
-
-    # defaultdict → list[dict]
-    return list(parcels.values())
+    }
+
+
+def decoders():
+    """The dashboard parser's configuration of hlc_core: no volume data."""
+    return [LocationFallback(), Registered(), Instruction(host_id=True), PropertiesLocation(),
+            Barcodes(), Sorted(), Deregistered(), Events()]
+
+
+_PARSER = Parser(decoders(), _new_parcel, key="pic")      # stateless decoders only
+
+
+def _apply(parcel: dict, ts_iso: str, msg: str, body: str, parts) -> None:
+    """Fold one tokenized line into its parcel record."""
+    _PARSER.apply(parcel, ts_iso, msg, body, parts)
+
+
+def _parse_lines(lines, evict: bool = False):
+    """
+    Core loop shared by every entry point.  Each parcel record is one PIC
+    generation (see parcel_identity): a recycled PIC gets a fresh record
+    instead of piling onto the old one.
+    With `evict=True` a parcel is yielded (and forgotten) once it has
+    ended – deregistered and past the straggler window, or its PIC
+    re‑registered – so only open and just‑closed parcels are held in
+    memory.  With `evict=False` all parcels are kept and yielded at the
+    end in first‑seen order.
+    """
+    return _PARSER.parse(lines, evict)
+
+
+def merge_parcel(into: dict, later: dict) -> dict:
+    """
+    Fold `later` (a partial parcel parsed from a later slice of the same
+    log) into `into`, giving exactly what one sequential pass would have
+    produced: first truthy value wins for hostId / location / destination /
+    registeredAt, the last closedAt wins, sorted beats deregistered beats
+    open, and barcodes keep first‑seen order.
+    """
+    lc, later_lc = into["lifeCycle"], later["lifeCycle"]
+    pairs = [(into, later, k) for k in ("hostId", "location", "destination")]
+    for dst, src, key in pairs + [(lc, later_lc, "registeredAt")]:
+        # `x = x or value` keeps a falsy "" until a truthy value shows up
+        if not dst[key] and src[key] is not None:
+            dst[key] = src[key]
+    lc["closedAt"] = later_lc["closedAt"] or lc["closedAt"]
+    if "sorted" in (lc["status"], later_lc["status"]):
+        lc["status"] = "sorted"
+    elif "deregistered" in (lc["status"], later_lc["status"]):
+        lc["status"] = "deregistered"
+
+    for bc in later["barcodes"]:
+        if bc not in into["barcodes"]:
+            into["barcodes"].append(bc)
+    into["barcodeErr"] = into["barcodeErr"] or later["barcodeErr"]
+    into["events"].extend(later["events"])
+    return into
+
+
+# ── Public entry points ─────────────────────────────────────────────
+def parse_stream(source, evict: bool = True, chunk_size: int = CHUNK_SIZE):
+    """
+    Stream a binary file object or path → iterator of parcel dicts.
+    Peak memory follows the number of open parcels, not the file size.
+    """
+    return _parse_lines(iter_lines(source, chunk_size), evict=evict)
+
+
+def parse_log(text: str):
+    """
+    Parse entire raw log text → list[dict] (one dict per PIC generation).
+    Dict schema:
+        pic, hostId, barcodes[], location, destination,
+        lifeCycle{registeredAt, closedAt, status}, barcodeErr, events[].
+    """
+    return list(_parse_lines(text.splitlines()))
@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from functools import partial
+
+from hlc_parser import CHUNK_SIZE, iter_lines
+from parcel_store import ParcelStore
+
+# ── Tunables ────────────────────────────────────────────────────────
+POLL_S = 0.5                         # idle wait before re‑checking the file
+OPEN_TIMEOUT_S = 2 * 3600            # log time an open parcel may stay silent
+# the only directory whose logs the dashboard may follow; unset = live mode off
+LIVE_DIR = os.environ.get("LOG_ANALYZER_LIVE_DIR", "")
+
+
+def live_path(name: str, root: str = LIVE_DIR) -> str:
+    """
+    `name` (relative to `root`) → absolute path of a log to follow.
+    Raises ValueError for anything that resolves outside `root`:
+    absolute paths, "..", symlinks pointing elsewhere.
+    """
+    if not root:
+        raise ValueError("no live log directory configured (LOG_ANALYZER_LIVE_DIR)")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, name))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{name!r} is not a file in {root}")
+    return path
+
+
+# ── Following a growing file ────────────────────────────────────────
+class FollowReader:
+    """
+    File‑like `read()` over a log that is still being written.
+
+    Blocks (polling) at end of file until new bytes arrive, and reopens
+    the path when it is rotated (new inode) or truncated.  A newline is
+    injected at every switch so a half‑written last line never glues onto
+    the next file.  Returns b"" only once `stop` is set.  Offsets seen by
+    `iter_lines` are positions in this continuous stream, not in one file.
+    `on_idle`, if given, is called at every poll that found nothing new.
+    """
+
+    def __init__(self, path, stop: threading.Event, poll_s: float = POLL_S,
+                 from_start: bool = True, on_idle=None):
+        self.path, self.stop, self.poll_s = path, stop, poll_s
+        self.on_idle = on_idle
+        self.fh, self.inode = None, None
+        self.from_start = from_start
+        self.rotations = 0
+        self._last = b"\n"
+
+    def _open(self) -> bool:
+        try:
+            self.fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        self.inode = os.fstat(self.fh.fileno()).st_ino
+        if not self.from_start:
+            self.fh.seek(0, os.SEEK_END)
+            self.from_start = True                  # only skip history once
+        return True
+
+    def _switched(self) -> bool:
+        """True if the path now points at a new or shorter file."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False                            # mid‑rotation; keep old handle
+        if st.st_ino != self.inode:
+            self.fh.close()
+            self.fh = None
+            return True
+        if st.st_size < self.fh.tell():
+            self.fh.seek(0)
+            return True
+        return False
+
+    def read(self, n: int = CHUNK_SIZE) -> bytes:
+        while not self.stop.is_set():
+            if self.fh is None and not self._open():
+                self.stop.wait(self.poll_s)
+                continue
+            data = self.fh.read(n)
+            if data:
+                self._last = data[-1:]
+                return data
+            if self._switched():
+                self.rotations += 1
+                if self._last != b"\n":
+                    self._last = b"\n"
+                    return b"\n"
+                continue
+            if self.on_idle is not None:
+                self.on_idle()
+            self.stop.wait(self.poll_s)
+        if self.fh is not None:
+            self.fh.close()
+        return b""
+
+
+# ── Incremental parser ──────────────────────────────────────────────
+class LiveParser:
+    """
+    ParcelStore fed line by line with bounded open‑parcel state.
+
+    A parcel leaves the open table on ItemDeRegister, or once it has been
+    silent for `open_timeout_s` of log time; its row stays in the store
+    as a compact closed parcel and KPIs are already up to date.  Open
+    parcels sit in an LRU ordered by last event, so expiry only ever looks
+    at the oldest entries – constant work per line however long the shift.
+
+    While the log is quiet, `idle` lets log time run on with the wall
+    clock so stuck parcels are still reported; open parcels only expire
+    on real lines, a writer pausing must not split them.
+    """
+
+    def __init__(self, open_timeout_s: float = OPEN_TIMEOUT_S):
+        self.store = ParcelStore()
+        self.timeout_ms = int(open_timeout_s * 1000)
+        self.last_seen = OrderedDict()              # pic → last event ms, oldest first
+        self.expired = 0
+        self.lines = 0
+        self.last_ts, self.last_wall = None, 0.0   # newest parcel line: log ms, monotonic s
+
+    def feed(self, offset: int, line: str) -> None:
+        self.lines += 1
+        res = self.store.feed(offset, line)
+        if res is None:
+            return
+        pic, msg, ts = res
+        self.last_ts, self.last_wall = ts, time.monotonic()
+
+        if self.store.identity.is_closed(pic):
+            # deregistered: late reports still reach the row (see
+            # parcel_identity), but it no longer counts as open
+            self.last_seen.pop(pic, None)
+        else:
+            self.last_seen[pic] = ts
+            self.last_seen.move_to_end(pic)
+
+        cutoff = ts - self.timeout_ms
+        while self.last_seen:
+            old_pic, seen = next(iter(self.last_seen.items()))
+            if seen >= cutoff:
+                break
+            self.last_seen.popitem(last=False)
+            self.store.close(old_pic)
+            self.expired += 1
+
+    def idle(self, wall: float = None) -> None:
+        """No new line by monotonic time `wall` (default: now)."""
+        if self.last_ts is None:
+            return
+        wall = time.monotonic() if wall is None else wall
+        self.store.anomalies.advance(self.last_ts + int((wall - self.last_wall) * 1000))
+
+    @property
+    def open_count(self) -> int:
+        return len(self.last_seen)
+
+
+# ── Background follower ─────────────────────────────────────────────
+def _follow(reader, parser, lock) -> None:
+    # holds no reference to its LiveTail, so dropping the tail stops it
+    for offset, line in iter_lines(reader, offsets=True):
+        with lock:
+            parser.feed(offset, line)
+
+
+def _idle(parser, lock) -> None:
+    with lock:
+        parser.idle()
+
+
+class LiveTail:
+    """
+    Follows `path` on a daemon thread, feeding a LiveParser.  One tail
+    belongs to one reader (a dashboard session): `snapshot` hands over
+    only what changed since the previous call.  The thread ends on
+    `stop`, or once the tail itself is garbage collected.
+    """
+
+    def __init__(self, path, open_timeout_s: float = OPEN_TIMEOUT_S,
+                 from_start: bool = True, poll_s: float = POLL_S):
+        self.path = path
+        self.open_timeout_s = open_timeout_s
+        self.parser = LiveParser(open_timeout_s)
+        self.parser.store.track_changes()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.reader = FollowReader(path, self.stop_event, poll_s, from_start,
+                                   on_idle=partial(_idle, self.parser, self.lock))
+        self.started = time.time()
+        self._thread = threading.Thread(target=_follow, args=(self.reader, self.parser, self.lock),
+                                        name=f"tail:{path}", daemon=True)
+        weakref.finalize(self, self.stop_event.set)
+
+    def start(self) -> "LiveTail":
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        self.stop_event.set()
+        if wait and self._thread.is_alive():
+            self._thread.join()
+
+    @property
+    def lines(self) -> int:
+        return self.parser.lines
+
+    def snapshot(self):
+        """
+        (changed rows, Kpis copy, new anomalies) since the previous call,
+        taken under the lock – see ParcelStore.changes.
+        """
+        with self.lock:
+            return self.parser.store.changes()
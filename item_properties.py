@@ -0,0 +1,172 @@
+"""
+Batch decoding of ItemPropertiesUpdate fields.
+
+The dimension and barcode fields of a properties update are packed
+strings (`;`‑separated readings, `@`‑joined barcodes).  Instead of
+splitting and float()‑ing them line by line, the raw fields of thousands
+of lines are collected and decoded together with Arrow compute kernels
+into typed columns: NaN for a missing or unparsable number, barcodes as
+one long (line, barcode) table in log order.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# ── Layout ──────────────────────────────────────────────────────────
+# parts[12] is "status;?;length;width;height;box volume;real volume;…"
+VOLUME_FIELDS = {"length": 2, "width": 3, "height": 4, "box_volume": 5, "real_volume": 6}
+BARCODE_PREFIX = "0]C"                  # only scanner reads with this prefix count
+BATCH_LINES = 8192                      # properties updates decoded per batch
+# what float() and an Arrow cast both read: ASCII decimals, inf and nan
+NUMBER = r"^[+-]?((\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|(?i:inf|infinity|nan))$"
+
+
+def _column(parts_list, i: int) -> list:
+    return [parts[i] if len(parts) > i else None for parts in parts_list]
+
+
+def _numbers(strings) -> np.ndarray:
+    """
+    String array → float64, NaN where the value is null or not a NUMBER.
+    Whether a value is read never depends on the rest of the batch.
+    """
+    strings = pc.utf8_trim_whitespace(strings)
+    try:
+        values = pc.cast(strings, pa.float64())
+    except pa.ArrowInvalid:                     # some junk: null it out first, same rule
+        valid = pc.match_substring_regex(strings, NUMBER)
+        values = pc.cast(pc.if_else(valid, strings, None), pa.float64())
+    return values.to_numpy(zero_copy_only=False)
+
+
+def _split_fields(strings, sep: str, count: int):
+    """(rows with at least `count` `sep`‑fields, their first `count` fields as lists)."""
+    lists = pc.split_pattern(strings, sep, max_splits=count)
+    rows = np.flatnonzero(pc.fill_null(pc.greater_equal(pc.list_value_length(lists), count),
+                                       False).to_numpy(zero_copy_only=False))
+    return rows, lists.take(pa.array(rows))
+
+
+def _barcodes(lines: np.ndarray, fields):
+    """`@`‑joined barcode fields of `lines` → (line, barcode) of the valid ones."""
+    pieces = pc.split_pattern(fields, "@")
+    flat = pc.list_flatten(pieces)
+    owner = lines[pc.list_parent_indices(pieces).to_numpy()]
+    keep = pc.starts_with(flat, BARCODE_PREFIX).to_numpy(zero_copy_only=False)
+    return owner[keep], flat.filter(pa.array(keep)).to_numpy(zero_copy_only=False)
+
+
+def decode_properties(p8: list, p9: list, p12: list = None):
+    """
+    Raw parts[8], parts[9] and parts[12] of n properties updates (None
+    where the line is too short) → (fields, barcodes):
+
+      fields    DataFrame of n rows: the VOLUME_FIELDS as float64 (only
+                if `p12` is given) and barcode_err (bool, True if the
+                scan result is not "6")
+      barcodes  DataFrame of (line, barcode), in log order – parts[8]
+                before the third `;` field of parts[9]
+    """
+    n = len(p9)
+    fields = pd.DataFrame(index=pd.RangeIndex(n))
+    if p12 is not None:
+        rows, volume = _split_fields(pa.array(p12, pa.string()), ";",
+                                     max(VOLUME_FIELDS.values()) + 1)
+        for name, pos in VOLUME_FIELDS.items():
+            column = np.full(n, np.nan)
+            if len(rows):
+                column[rows] = _numbers(pc.list_element(volume, pos))
+            fields[name] = column
+
+    a9 = pa.array(p9, pa.string())
+    status = pc.list_element(pc.split_pattern(a9, ";", max_splits=1), 0)
+    fields["barcode_err"] = pc.fill_null(pc.not_equal(status, "6"), False) \
+                              .to_numpy(zero_copy_only=False)
+
+    a8 = pa.array(p8, pa.string())
+    rows8 = np.flatnonzero(pc.is_valid(a8).to_numpy(zero_copy_only=False))
+    rows9, semis = _split_fields(a9, ";", 3)
+    line8, code8 = _barcodes(rows8, a8.take(pa.array(rows8)))
+    line9, code9 = (_barcodes(rows9, pc.list_element(semis, 2)) if len(rows9)
+                    else (rows9, np.empty(0, dtype=object)))
+    line = np.concatenate([line8, line9])
+    order = np.argsort(line, kind="stable")              # per line: parts[8] first
+    barcodes = pd.DataFrame({"line": line[order],
+                             "barcode": np.concatenate([code8, code9])[order]})
+    return fields, barcodes
+
+
+# ── Collector ───────────────────────────────────────────────────────
+class PropertiesBatch:
+    """
+    Properties updates of a whole parse, each tagged with the caller's
+    key (the parcel it belongs to).  The split fields (`parts`) are held
+    for at most `size` lines, then decoded into typed columns; `per_key`
+    folds everything into one value per parcel at the end.  With
+    `volume=False` the dimension field is never decoded.
+    """
+
+    def __init__(self, size: int = BATCH_LINES, volume: bool = True):
+        self.size, self.volume = size, volume
+        self.keys, self.parts = [], []
+        self._keys, self._fields, self._barcodes = [], [], []
+        self._lines = 0                                 # lines decoded so far
+
+    def __len__(self):
+        return self._lines + len(self.keys)
+
+    def add(self, key, parts) -> None:
+        self.keys.append(key)
+        self.parts.append(parts)
+        if len(self.keys) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Decode the lines held so far."""
+        if not self.keys:
+            return
+        fields, barcodes = decode_properties(_column(self.parts, 8), _column(self.parts, 9),
+                                             _column(self.parts, 12) if self.volume else None)
+        barcodes["line"] += self._lines
+        self._keys.extend(self.keys)
+        self._fields.append(fields)
+        self._barcodes.append(barcodes)
+        self._lines += len(self.keys)
+        self.keys, self.parts = [], []
+
+    def per_key(self):
+        """
+        → (volume, barcode_err, barcodes):
+
+          volume       DataFrame indexed by key: the last valid reading
+                       of each VOLUME_FIELDS column, keys without any
+                       (or every key, with `volume=False`) left out
+          barcode_err  keys with at least one failed scan
+          barcodes     (key, barcode) for the first sighting of each
+                       distinct barcode of a key, in log order
+        """
+        self.flush()
+        codes, keys = pd.factorize(np.array(self._keys, dtype=object))
+        keys = np.asarray(keys, dtype=object)
+        fields = pd.concat(self._fields, ignore_index=True) if self._fields else \
+            pd.DataFrame({name: np.empty(0) for name in VOLUME_FIELDS}
+                         | {"barcode_err": np.empty(0, bool)})
+
+        if self.volume:
+            last = fields[list(VOLUME_FIELDS)].groupby(codes, sort=True).last()
+            last = last.dropna(how="all")
+        else:
+            last = pd.DataFrame(columns=list(VOLUME_FIELDS), index=pd.Index([], dtype=np.intp))
+        volume = last.set_axis(pd.Index(keys[last.index.to_numpy()], dtype=object))
+        barcode_err = pd.Index(keys[np.unique(codes[fields["barcode_err"].to_numpy(dtype=bool)])],
+                               dtype=object)
+
+        found = pd.concat(self._barcodes, ignore_index=True) if self._barcodes else \
+            pd.DataFrame({"line": np.empty(0, np.int64), "barcode": np.empty(0, object)})
+        found = pd.DataFrame({"key": codes[found["line"].to_numpy()],
+                              "barcode": found["barcode"].to_numpy(dtype=object)})
+        first = found[~found.duplicated()]
+        barcodes = zip(keys[first["key"].to_numpy()].tolist(),
+                       first["barcode"].to_numpy(dtype=object).tolist())
+        return volume, barcode_err, barcodes
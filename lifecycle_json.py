@@ -0,0 +1,125 @@
+"""
+Streaming reader for parsed parcel lifecycles saved as JSON.
+
+Reads both layouts the tools write – one JSON array of parcels (JK.py,
+13-May-2025-800P-1.json, indented or not) and JSON Lines (batch.py) –
+one parcel object at a time, so memory is bounded by the largest
+parcel, never the whole file.  A projection drops unneeded keys (such
+as the bulky `events[].parsed`) as soon as each parcel is decoded, and
+`load_store` writes straight into a ParcelStore for the dashboard.
+"""
+import codecs
+import json
+from hlc_parser import CHUNK_SIZE, iso_millis
+from log_io import open_log
+from parcel_store import NAT, NO_OFFSET, OPEN, STATUSES, ParcelStore
+
+# ── Projections ─────────────────────────────────────────────────────
+LIFECYCLE_FIELDS = ("pic", "hostId", "barcodes", "location", "destination",
+                    "lifeCycle", "barcodeErr")
+EVENT_FIELDS = ("ts", "type", "direction", "raw")   # all ParcelStore keeps per event
+MAX_RECORD_BYTES = 64 << 20                     # one parcel larger than this = broken file
+
+_WS = " \t\r\n"
+_STATUS_CODES = {s: i for i, s in enumerate(STATUSES)}
+
+
+# ── Format detection ────────────────────────────────────────────────
+def is_lifecycle_json(source) -> bool:
+    """True if `source` (path or seekable binary file) holds JSON, not a raw log."""
+    with open_log(source, threaded=False) as fh:
+        head = fh.read(64)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return head.lstrip(_WS.encode() + codecs.BOM_UTF8)[:1] in (b"[", b"{")
+
+
+# ── Streaming reader ────────────────────────────────────────────────
+def iter_records(source, fields=None, event_fields=None, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield parcel dicts from a JSON array or JSON Lines path / binary file
+    object (compressed input is fine).  `fields` limits the top‑level keys
+    kept and `event_fields` the keys kept in each event; None keeps all.
+    Parcel location / destination missing at top level are filled from
+    the events' `parsed` data before the projection is applied.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    with open_log(source) as fh:
+        buf, pos, eof = "", 0, False
+        while True:
+            # skip whitespace and the array's own punctuation
+            while pos < len(buf) and (buf[pos] in _WS or buf[pos] in "[,]"):
+                pos += 1
+            if pos < len(buf):
+                try:
+                    rec, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof or len(buf) - pos > MAX_RECORD_BYTES:
+                        raise
+                    rec = None                  # parcel runs past the buffer
+                if rec is not None:
+                    yield _project(rec, fields, event_fields)
+                    continue
+            elif eof:
+                return
+
+            chunk = fh.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + text.decode(chunk, final=eof)
+            pos = 0
+
+
+def _project(rec: dict, fields, event_fields) -> dict:
+    if not rec.get("location") or not rec.get("destination"):
+        _fill_from_events(rec)
+    if fields is not None:
+        rec = {k: rec[k] for k in fields if k in rec}
+    if event_fields is not None and "events" in rec:
+        rec["events"] = [{k: ev[k] for k in event_fields if k in ev}
+                         for ev in rec["events"]]
+    return rec
+
+
+def _fill_from_events(rec: dict) -> None:
+    # exports such as 13-May-2025-800P-1.json only carry these per event
+    for ev in rec.get("events") or ():
+        parsed = ev.get("parsed") or {}
+        if not rec.get("location") and parsed.get("location"):
+            rec["location"] = parsed["location"]
+        if not rec.get("destination") and parsed.get("destinations"):
+            rec["destination"] = str(parsed["destinations"][0])
+
+
+# ── ParcelStore loader ──────────────────────────────────────────────
+def _millis(value) -> int:
+    return iso_millis(value) if value else NAT
+
+
+def load_store(source, events: bool = True, chunk_size: int = CHUNK_SIZE) -> ParcelStore:
+    """
+    Lifecycle JSON → ParcelStore (KPIs, index and DataFrame included).
+    With `events=False` only the lifecycle fields are kept, which is
+    enough for the KPIs and the parcel tables but leaves search without
+    an event log.  Events have no raw log line (offset NO_OFFSET); their
+    `direction` and `raw` from the file are kept for parcel search.
+    """
+    fields = LIFECYCLE_FIELDS + (("events",) if events else ())
+    store = ParcelStore(source)
+    for rec in iter_records(source, fields, EVENT_FIELDS, chunk_size):
+        life = rec.get("lifeCycle") or {}
+        store.add_parcel(
+            int(rec["pic"]),
+            host_id=rec.get("hostId"),
+            barcodes=rec.get("barcodes") or (),
+            location=rec.get("location"),
+            destination=rec.get("destination"),
+            status=_STATUS_CODES.get(life.get("status"), OPEN),
+            registered_at=_millis(life.get("registeredAt")),
+            closed_at=_millis(life.get("closedAt")),
+            barcode_err=bool(rec.get("barcodeErr")),
+            events=[(ev.get("type"), _millis(ev.get("ts")), NO_OFFSET,
+                     ev.get("direction"), ev.get("raw"))
+                    for ev in rec.get("events") or ()],
+        )
+    return store
@@ -0,0 +1,286 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import queue
+import threading
+
+try:                                        # optional: pip install zstandard
+    import zstandard
+except ImportError:
+    zstandard = None
+
+READ_SIZE = 1 << 20
+READ_AHEAD = 4                              # decompressed chunks buffered ahead
+
+# ── Format detection ────────────────────────────────────────────────
+MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+]
+
+
+def sniff(head: bytes):
+    """Compression name for the first bytes of a file, None if plain."""
+    for magic, name in MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def detect_compression(path):
+    with open(path, "rb") as fh:
+        return sniff(fh.read(8))
+
+
+def _peek(fh, n: int = 8) -> bytes:
+    if hasattr(fh, "peek"):
+        return fh.peek(n)[:n]
+    pos = fh.tell()
+    head = fh.read(n)
+    fh.seek(pos)
+    return head
+
+
+def _decompressor(fh, kind: str):
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=fh, mode="rb")
+    if kind == "bz2":
+        return bz2.BZ2File(fh, mode="rb")
+    if kind == "xz":
+        return lzma.LZMAFile(fh, mode="rb")
+    if zstandard is None:
+        raise RuntimeError("zstd‑compressed log: install the 'zstandard' package")
+    return zstandard.ZstdDecompressor().stream_reader(fh, read_size=READ_SIZE, closefd=False)
+
+
+# ── Read‑ahead thread ───────────────────────────────────────────────
+class ThreadedReader:
+    """
+    Pulls chunks from `raw` on a background thread, up to `depth` ahead,
+    so decompression (which releases the GIL) overlaps with parsing.
+    `read()` returns whole chunks in order and b"" at the end.
+    """
+
+    def __init__(self, raw, chunk_size: int = READ_SIZE, depth: int = READ_AHEAD):
+        self.raw, self.chunk_size = raw, chunk_size
+        self._queue = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._eof = False
+        self._thread = threading.Thread(target=self._pump, name="log-read-ahead", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _pump(self) -> None:
+        try:
+            while True:
+                chunk = self.raw.read(self.chunk_size)
+                if not self._put(chunk) or not chunk:
+                    return
+        except BaseException as exc:        # surfaced on the reading side
+            self._put(exc)
+
+    def read(self, n: int = -1) -> bytes:
+        if self._eof:
+            return b""
+        item = self._queue.get()
+        if isinstance(item, BaseException):
+            self._eof = True
+            raise item
+        if not item:
+            self._eof = True
+        return item
+
+    def close(self) -> None:
+        # let the pump notice the stop flag before the stream goes away
+        self._stop.set()
+        self._thread.join()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Public entry point ──────────────────────────────────────────────
+class _Borrowed:
+    """Context wrapper that leaves a caller's plain file object open."""
+
+    def __init__(self, fh):
+        self.fh = fh
+
+    def __enter__(self):
+        return self.fh
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _ReadAhead:
+    """
+    A caller's file object that can neither peek nor seek (a pipe, a
+    followed log), with its first `n` bytes read ahead for sniffing;
+    `read` hands them out before the rest.  Unlike io.BufferedReader it
+    never waits for more bytes than the stream has ready.
+    """
+
+    def __init__(self, fh, n: int = 8):
+        self.fh = fh
+        self.head = b""
+        while len(self.head) < n:
+            chunk = fh.read(n - len(self.head))
+            if not chunk:
+                break
+            self.head += chunk
+
+    def peek(self, n: int = 1) -> bytes:
+        return self.head
+
+    def read(self, n: int = -1) -> bytes:
+        head = self.head
+        if not head:
+            return self.fh.read(n)
+        if n is None or n < 0:
+            self.head = b""
+            return head + self.fh.read()
+        self.head = head[n:]
+        return head[:n]                     # a short read; the caller reads on
+
+
+def open_log(source, threaded: bool = True):
+    """
+    Binary, decompressed read stream for a path or file object; use it as a
+    context manager.  gzip / zstd / bz2 / xz are recognised by magic bytes
+    and decompressed on the fly (on a read‑ahead thread unless `threaded`
+    is False); plain input is returned as is.  A caller's file object is
+    never closed.
+    """
+    owned = isinstance(source, (str, os.PathLike))
+    fh = open(source, "rb") if owned else source
+    if not owned and not (hasattr(fh, "peek") or getattr(fh, "seekable", lambda: False)()):
+        fh = _ReadAhead(fh)                 # sniff without losing the first bytes
+
+    kind = sniff(_peek(fh))
+    if kind is None:
+        return fh if owned else _Borrowed(fh)
+
+    stream = _decompressor(fh, kind)
+    if owned:
+        # closing the decompressor must also close the file we opened
+        stream = _ClosingPair(stream, fh)
+    return ThreadedReader(stream) if threaded else stream
+
+
+class _ClosingPair:
+    def __init__(self, stream, fh):
+        self.stream, self.fh = stream, fh
+
+    def read(self, n: int = -1) -> bytes:
+        return self.stream.read(n)
+
+    def close(self) -> None:
+        self.stream.close()
+        self.fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Random access by offset ─────────────────────────────────────────
+class LogView:
+    """
+    Reads single log lines back by the byte offsets `iter_lines` recorded.
+    Plain files are memory‑mapped, so only the pages holding the wanted
+    lines are touched; in‑memory uploads are seeked in place; compressed
+    logs (offsets count decompressed bytes) are streamed once up to the
+    last offset asked for.  A caller's file object is left open.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._owned = isinstance(source, (str, os.PathLike))
+        self._fh = open(source, "rb") if self._owned else source
+        self._map = None
+        pos = self._fh.tell()
+        self._fh.seek(0)                            # offsets count from the start
+        self.compressed = sniff(_peek(self._fh)) is not None
+        self._fh.seek(pos)
+        if not self.compressed:
+            try:
+                self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                pass                                # no descriptor, or empty file
+
+    def lines(self, offsets) -> dict:
+        """{offset: line text} for the given offsets."""
+        wanted = sorted(set(offsets))
+        if self.compressed:
+            raw = self._scan(wanted)
+        elif self._map is not None:
+            raw = {off: self._map[off:self._line_end(off)] for off in wanted}
+        else:
+            pos = self._fh.tell()
+            raw = {}
+            for off in wanted:
+                self._fh.seek(off)
+                raw[off] = self._fh.readline()
+            self._fh.seek(pos)
+        # same decoding as iter_lines: the first line of the "\n" piece
+        return {off: (b.decode("utf-8", errors="replace").splitlines() or [""])[0]
+                for off, b in raw.items()}
+
+    def _line_end(self, off: int) -> int:
+        end = self._map.find(b"\n", off)
+        return len(self._map) if end < 0 else end
+
+    def _scan(self, wanted) -> dict:
+        out, it = {}, iter(wanted)
+        want = next(it, None)
+        start = self._fh.tell()
+        self._fh.seek(0)
+        with open_log(self._fh, threaded=False) as fh:
+            pos, carry = 0, b""                     # file offset of carry
+            while want is not None:
+                chunk = fh.read(READ_SIZE)
+                data = carry + chunk
+                while want is not None and want - pos < len(data):
+                    end = data.find(b"\n", want - pos)
+                    if end < 0 and chunk:
+                        break                       # line continues in the next chunk
+                    out[want] = data[want - pos:end if end >= 0 else len(data)]
+                    want = next(it, None)
+                if not chunk:
+                    break
+                keep = len(data) if want is None else min(want - pos, len(data))
+                carry, pos = data[keep:], pos + keep
+        self._fh.seek(start)
+        return out
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        if self._owned:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
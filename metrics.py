@@ -0,0 +1,250 @@
+import math
+from collections import Counter
+
+import pandas as pd
+
+MINUTE_MS = 60_000
+
+
+# ── Quantile sketch ─────────────────────────────────────────────────
+class QuantileSketch:
+    """
+    Log‑bucketed histogram (DDSketch style): any quantile is returned with
+    relative error ≤ `alpha`, two sketches merge by adding bucket counts,
+    and a value can be removed again – which the running KPIs need when a
+    parcel's closedAt is overwritten.  Memory grows with log(range), not
+    with the number of values.
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.pos = Counter()                # bucket index → count, values > 0
+        self.neg = Counter()                # same for −value, values < 0
+        self.zero = 0
+        self.count = 0
+
+    def _bucket(self, x: float) -> int:
+        return math.ceil(math.log(x) / self._log_gamma)
+
+    def _value(self, k: int) -> float:
+        return 2 * self.gamma ** k / (self.gamma + 1)
+
+    def add(self, x: float, n: int = 1) -> None:
+        if x > 0:
+            self.pos[self._bucket(x)] += n
+        elif x < 0:
+            self.neg[self._bucket(-x)] += n
+        else:
+            self.zero += n
+        self.count += n
+
+    def remove(self, x: float) -> None:
+        self.add(x, -1)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.pos.update(other.pos)
+        self.neg.update(other.neg)
+        self.zero += other.zero
+        self.count += other.count
+
+    def quantile(self, q: float):
+        """Approximate q‑quantile (0 ≤ q ≤ 1), None when empty."""
+        if self.count <= 0:
+            return None
+        rank, seen = q * (self.count - 1), 0
+        for k in sorted(self.neg, reverse=True):
+            seen += self.neg[k]
+            if seen > rank:
+                return -self._value(k)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for k in sorted(self.pos):
+            seen += self.pos[k]
+            if seen > rank:
+                return self._value(k)
+        return self._value(max(self.pos)) if self.pos else 0.0
+
+    def histogram(self) -> pd.DataFrame:
+        """Positive buckets as (lower, upper, count) rows, ascending."""
+        rows = [(self.gamma ** (k - 1), self.gamma ** k, n)
+                for k, n in sorted(self.pos.items()) if n]
+        return pd.DataFrame(rows, columns=["lower", "upper", "count"])
+
+    def to_dict(self) -> dict:
+        return {"alpha": self.alpha, "zero": self.zero,
+                "pos": [[k, n] for k, n in self.pos.items() if n],
+                "neg": [[k, n] for k, n in self.neg.items() if n]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        s = cls(d["alpha"])
+        s.pos.update(dict(map(tuple, d["pos"])))
+        s.neg.update(dict(map(tuple, d["neg"])))
+        s.zero = d["zero"]
+        s.count = s.zero + sum(s.pos.values()) + sum(s.neg.values())
+        return s
+
+
+# ── Time buckets ────────────────────────────────────────────────────
+class Throughput:
+    """
+    Parcel counts per minute, broken down by location and destination:
+    `registered` at ItemRegister time, `closed` at ItemDeRegister time.
+    Hourly figures are rolled up from the minutes on read.
+    """
+
+    def __init__(self):
+        self.registered = Counter()         # (minute, location) → n
+        self.closed = Counter()             # (minute, location, destination) → n
+
+    def on_registered(self, ts: int, location) -> None:
+        self.registered[(ts // MINUTE_MS, location)] += 1
+
+    def on_closed(self, ts: int, location, destination) -> None:
+        self.closed[(ts // MINUTE_MS, location, destination)] += 1
+
+    def merge(self, other: "Throughput") -> None:
+        self.registered.update(other.registered)
+        self.closed.update(other.closed)
+
+    def frame(self, kind: str = "closed", freq: str = "min", by: str = None) -> pd.DataFrame:
+        """
+        Long table: time, [by], count.  `kind` is "registered" or "closed",
+        `freq` "min" or "h", `by` None, "location" or "destination".
+        """
+        cols = ["minute", "location"] + (["destination"] if kind == "closed" else [])
+        counts = getattr(self, kind)
+        df = pd.DataFrame([k + (n,) for k, n in counts.items()], columns=cols + ["count"])
+        df["time"] = pd.to_datetime(df["minute"] * MINUTE_MS, unit="ms").dt.floor(freq)
+        keys = ["time"] + ([by] if by else [])
+        return (df.groupby(keys, dropna=False, observed=True)["count"].sum()
+                  .reset_index().sort_values("time", kind="stable"))
+
+    def to_dict(self) -> dict:
+        return {"registered": [list(k) + [n] for k, n in self.registered.items()],
+                "closed": [list(k) + [n] for k, n in self.closed.items()]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Throughput":
+        t = cls()
+        t.registered.update({tuple(r[:-1]): r[-1] for r in d["registered"]})
+        t.closed.update({tuple(r[:-1]): r[-1] for r in d["closed"]})
+        return t
+
+
+# ── Running KPIs ────────────────────────────────────────────────────
+class Kpis:
+    """
+    Dashboard aggregates kept up to date while parsing.  ParcelStore
+    reports every state change of a parcel row here, so reading a metric
+    never scans parcels and each update is O(1).  `merge` combines the
+    aggregates of disjoint parcel sets (other files, days or workers).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status = [0, 0, 0]          # indexed like parcel_store.STATUSES
+        self.barcode_err = 0
+        self.cycle_sum_ms = 0               # Σ closedAt − registeredAt
+        self.cycle_n = 0
+        self.first_ts = None                # earliest registeredAt, epoch ms
+        self.last_ts = None                 # latest closedAt / registeredAt
+        self.cycle_sketch = QuantileSketch()    # cycle time, seconds
+        self.throughput = Throughput()
+
+    # ── updates (called by ParcelStore) ─────────────────────────────
+    def on_new(self, status: int) -> None:
+        self.total += 1
+        self.by_status[status] += 1
+
+    def on_status(self, old: int, new: int) -> None:
+        self.by_status[old] -= 1
+        self.by_status[new] += 1
+
+    def on_barcode_err(self) -> None:
+        self.barcode_err += 1
+
+    def on_times(self, reg_old, closed_old, reg_new, closed_new) -> None:
+        """registeredAt / closedAt of one row changed (None = unknown)."""
+        if reg_old is not None and closed_old is not None:
+            self.cycle_sum_ms -= closed_old - reg_old
+            self.cycle_n -= 1
+            self.cycle_sketch.remove((closed_old - reg_old) / 1000)
+        if reg_new is not None and closed_new is not None:
+            self.cycle_sum_ms += closed_new - reg_new
+            self.cycle_n += 1
+            self.cycle_sketch.add((closed_new - reg_new) / 1000)
+        if reg_new is not None and (self.first_ts is None or reg_new < self.first_ts):
+            self.first_ts = reg_new
+        latest = closed_new if closed_new is not None else reg_new
+        if latest is not None and (self.last_ts is None or latest > self.last_ts):
+            self.last_ts = latest
+
+    def on_registered(self, ts: int, location) -> None:
+        self.throughput.on_registered(ts, location)
+
+    def on_closed(self, ts: int, location, destination) -> None:
+        self.throughput.on_closed(ts, location, destination)
+
+    # ── derived values ──────────────────────────────────────────────
+    @property
+    def sorted(self) -> int:
+        return self.by_status[1]
+
+    @property
+    def deregistered(self) -> int:
+        return self.by_status[2]
+
+    @property
+    def avg_cycle_s(self) -> float:
+        return self.cycle_sum_ms / self.cycle_n / 1000 if self.cycle_n else 0
+
+    def cycle_quantile(self, q: float):
+        """Approximate cycle‑time quantile in seconds (1 % relative error)."""
+        return self.cycle_sketch.quantile(q)
+
+    @property
+    def tph(self) -> float:
+        if not self.total or self.first_ts is None:
+            return 0
+        return self.total / (((self.last_ts - self.first_ts) / 3_600_000) or 1)
+
+    # ── combining / persistence ─────────────────────────────────────
+    def merge(self, other: "Kpis") -> "Kpis":
+        self.total += other.total
+        self.by_status = [a + b for a, b in zip(self.by_status, other.by_status)]
+        self.barcode_err += other.barcode_err
+        self.cycle_sum_ms += other.cycle_sum_ms
+        self.cycle_n += other.cycle_n
+        firsts = [t for t in (self.first_ts, other.first_ts) if t is not None]
+        lasts = [t for t in (self.last_ts, other.last_ts) if t is not None]
+        self.first_ts = min(firsts) if firsts else None
+        self.last_ts = max(lasts) if lasts else None
+        self.cycle_sketch.merge(other.cycle_sketch)
+        self.throughput.merge(other.throughput)
+        return self
+
+    def copy(self, throughput: bool = True) -> "Kpis":
+        """Independent copy; `throughput=False` leaves the time buckets,
+        which grow with the log's time span, empty."""
+        return Kpis.from_dict(self.to_dict(throughput))
+
+    def to_dict(self, throughput: bool = True) -> dict:
+        d = {k: v for k, v in self.__dict__.items()
+             if k not in ("cycle_sketch", "throughput")}
+        d["by_status"] = list(self.by_status)
+        d["cycle_sketch"] = self.cycle_sketch.to_dict()
+        d["throughput"] = (self.throughput if throughput else Throughput()).to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Kpis":
+        k = cls()
+        k.__dict__.update({n: v for n, v in d.items() if n not in ("cycle_sketch", "throughput")})
+        k.by_status = list(d["by_status"])
+        k.cycle_sketch = QuantileSketch.from_dict(d["cycle_sketch"])
+        k.throughput = Throughput.from_dict(d["throughput"])
+        return k
@@ -0,0 +1,418 @@
+"""
+Embedded SQLite database of parsed logs, for questions across many days.
+
+    python parcel_db.py ingest logs/2025-05-*/ archive/*.txt.gz -j 8
+    python parcel_db.py files
+
+Each source file (raw log or lifecycle JSON) is parsed into a
+ParcelStore and bulk‑inserted in one transaction: its parcels, their
+barcodes and events and its anomaly records.  Ingestion is idempotent per
+content: a file whose content hash (see parse_cache.content_key – it
+includes PARSER_VERSION) is already stored, under its own path or any
+other (a copied or renamed archive), is skipped; a path whose content
+changed – a log that grew, or a parser upgrade – is replaced.
+
+Files are stored independently, so replacing one never touches another.
+Unlike batch.py, parcels are therefore not joined across files: a parcel
+whose lines span a rotation is one row per file, and counts once per
+file in the summaries.
+Times are epoch milliseconds.  The dashboard's Database source queries
+this instead of holding parcels in memory.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from lifecycle_json import is_lifecycle_json, load_store
+from parcel_store import NAT, STATUSES, build_store
+from parse_cache import content_key
+
+# ── Configuration ───────────────────────────────────────────────────
+DB_PATH = os.environ.get("LOG_ANALYZER_DB") or os.path.join(
+    os.path.expanduser("~"), ".local", "share", "log_analyzer", "parcels.db"
+)
+DAY_MS = 86_400_000
+GROUPS = ("destination", "location")        # summary break‑downs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    content_key TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    parcels     INTEGER NOT NULL,
+    events      INTEGER NOT NULL,
+    first_ts    INTEGER,
+    last_ts     INTEGER
+);
+CREATE TABLE IF NOT EXISTS parcels (
+    id            INTEGER PRIMARY KEY,
+    file_id       INTEGER NOT NULL,
+    pic           INTEGER NOT NULL,
+    host_id       TEXT,
+    location      TEXT,
+    destination   TEXT,
+    status        TEXT NOT NULL,
+    registered_at INTEGER,
+    closed_at     INTEGER,
+    barcode_err   INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS barcodes (
+    parcel_id INTEGER NOT NULL,
+    barcode   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    parcel_id INTEGER NOT NULL,
+    type      TEXT NOT NULL,
+    ts        INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS anomalies (
+    file_id  INTEGER NOT NULL,
+    kind     TEXT NOT NULL,
+    ts       INTEGER NOT NULL,
+    location TEXT,
+    pic      INTEGER,
+    host_id  TEXT,
+    value    REAL,
+    expected REAL,
+    detail   TEXT
+);
+CREATE INDEX IF NOT EXISTS files_content       ON files (content_key);
+CREATE INDEX IF NOT EXISTS parcels_file        ON parcels (file_id);
+CREATE INDEX IF NOT EXISTS parcels_host        ON parcels (host_id);
+CREATE INDEX IF NOT EXISTS parcels_pic         ON parcels (pic);
+CREATE INDEX IF NOT EXISTS parcels_registered  ON parcels (registered_at);
+CREATE INDEX IF NOT EXISTS parcels_location    ON parcels (location, registered_at);
+CREATE INDEX IF NOT EXISTS parcels_destination ON parcels (destination, registered_at);
+CREATE INDEX IF NOT EXISTS barcodes_barcode    ON barcodes (barcode);
+CREATE INDEX IF NOT EXISTS barcodes_parcel     ON barcodes (parcel_id);
+CREATE INDEX IF NOT EXISTS events_parcel       ON events (parcel_id);
+CREATE INDEX IF NOT EXISTS events_ts           ON events (ts);
+CREATE INDEX IF NOT EXISTS anomalies_ts        ON anomalies (ts);
+"""
+
+
+# ── Store → rows ────────────────────────────────────────────────────
+def _ms(values: np.ndarray) -> list:
+    return [None if v == NAT else v for v in values.tolist()]
+
+
+def _labels(codes, levels) -> list:
+    values = np.array(list(levels.values) + [None], dtype=object)
+    return values[np.frombuffer(codes, dtype=np.int32)].tolist()     # -1 → None
+
+
+def store_rows(store) -> dict:
+    """
+    ParcelStore → plain column lists per table, parcel ids relative to
+    the store's rows (0 …), ready to be shifted and inserted.
+    """
+    n = len(store)
+
+    def col(arr, dtype):
+        return np.frombuffer(arr, dtype=dtype) if len(arr) else np.empty(0, dtype)
+
+    parcels = {
+        "pic":           col(store.pic, np.int64).tolist(),
+        "host_id":       list(store.host_id),
+        "location":      _labels(store.location, store.locations) if n else [],
+        "destination":   _labels(store.destination, store.destinations) if n else [],
+        "status":        np.array(STATUSES, dtype=object)[col(store.status, np.int8)].tolist(),
+        "registered_at": _ms(col(store.registered_at, np.int64)),
+        "closed_at":     _ms(col(store.closed_at, np.int64)),
+        "barcode_err":   col(store.barcode_err, np.int8).tolist(),
+    }
+    barcodes = [(row, bc) for row, lst in enumerate(store.barcodes) if lst for bc in lst]
+    events = {
+        "row":  col(store.ev_row, np.int32).tolist(),
+        "type": np.array(store.types.values, dtype=object)[col(store.ev_type, np.int16)].tolist()
+                if len(store.ev_type) else [],
+        "ts":   col(store.ev_ts, np.int64).tolist(),
+    }
+    anomalies = [(r["kind"], r["ts"], r["location"], r["pic"], r["hostId"], r["value"],
+                  r["expected"], r["detail"]) for r in store.anomalies.records]
+    return {"parcels": parcels, "barcodes": barcodes, "events": events, "anomalies": anomalies}
+
+
+def parse_rows(path: str) -> dict:
+    """One file → store_rows() of its parse (a process pool worker)."""
+    store = (load_store if is_lifecycle_json(path) else build_store)(path)
+    return store_rows(store)
+
+
+# ── Database ────────────────────────────────────────────────────────
+class ParcelDB:
+    """
+    One SQLite database file.  The connection is shared between threads
+    (dashboard sessions) behind a lock; every method is one short
+    statement or one transaction.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── ingestion ───────────────────────────────────────────────────
+    def stored_key(self, path: str):
+        """content_key the file at `path` was ingested with, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT content_key FROM files WHERE path = ?",
+                                    (os.path.abspath(path),)).fetchone()
+        return row[0] if row else None
+
+    def stored_path(self, key: str):
+        """Path a file with content `key` was ingested from, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT path FROM files WHERE content_key = ?",
+                                    (key,)).fetchone()
+        return row[0] if row else None
+
+    def remove(self, path: str) -> None:
+        """Drop everything stored for `path`."""
+        with self.lock, self.conn:
+            self._delete(os.path.abspath(path))
+
+    def _pending(self, paths, keys: dict) -> list:
+        # paths whose content is stored nowhere yet, first path per content;
+        # a path whose new content is stored elsewhere loses its old rows
+        todo, seen = [], set()
+        for path in paths:
+            key = keys[path]
+            if key in seen or self.stored_path(key) is not None:
+                if self.stored_key(path) not in (None, key):
+                    self.remove(path)
+                continue
+            seen.add(key)
+            todo.append(path)
+        return todo
+
+    def insert(self, path: str, key: str, rows: dict) -> int:
+        """
+        Replace whatever was stored for `path` with `rows` (see store_rows)
+        in one transaction → number of parcels inserted.
+        """
+        path = os.path.abspath(path)
+        p, e = rows["parcels"], rows["events"]
+        times = [t for t in p["registered_at"] + p["closed_at"] if t is not None]
+        with self.lock, self.conn:
+            self._delete(path)
+            cur = self.conn.execute(
+                "INSERT INTO files (path, content_key, ingested_at, parcels, events, first_ts, "
+                "last_ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, key, datetime.now().isoformat(timespec="seconds"), len(p["pic"]),
+                 len(e["ts"]), min(times, default=None), max(times, default=None)))
+            file_id = cur.lastrowid
+            base = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM parcels").fetchone()[0]
+
+            n = len(p["pic"])
+            self.conn.executemany(
+                "INSERT INTO parcels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(range(base, base + n), [file_id] * n, p["pic"], p["host_id"], p["location"],
+                    p["destination"], p["status"], p["registered_at"], p["closed_at"],
+                    p["barcode_err"]))
+            self.conn.executemany("INSERT INTO barcodes VALUES (?, ?)",
+                                  ((base + row, bc) for row, bc in rows["barcodes"]))
+            self.conn.executemany("INSERT INTO events VALUES (?, ?, ?)",
+                                  zip([base + r for r in e["row"]], e["type"], e["ts"]))
+            self.conn.executemany("INSERT INTO anomalies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  ((file_id,) + a for a in rows["anomalies"]))
+        return n
+
+    def _delete(self, path: str) -> None:
+        row = self.conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        file_id = row[0]
+        for table in ("barcodes", "events"):
+            self.conn.execute(f"DELETE FROM {table} WHERE parcel_id IN "
+                              "(SELECT id FROM parcels WHERE file_id = ?)", (file_id,))
+        for table in ("parcels", "anomalies"):
+            self.conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def ingest(self, path: str) -> int:
+        """Parse and store one file unless its content is stored already → parcels inserted."""
+        key = content_key(path)
+        if not self._pending([path], {path: key}):
+            return 0
+        return self.insert(path, key, parse_rows(path))
+
+    def ingest_many(self, paths, workers: int = None, out=sys.stderr) -> dict:
+        """
+        Ingest every file of `paths` whose content is not stored yet,
+        parsing on a process pool and inserting in path order → totals.
+        """
+        keys = {path: content_key(path) for path in paths}
+        todo = self._pending(paths, keys)
+        totals = {"files": len(paths), "skipped": len(paths) - len(todo), "parcels": 0}
+        tic = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, rows in zip(todo, pool.map(parse_rows, todo)):
+                t = time.perf_counter()
+                n = self.insert(path, keys[path], rows)
+                totals["parcels"] += n
+                print(f"{os.path.basename(path):<40} {n:>9,} parcels "
+                      f"{len(rows['events']['ts']):>11,} events  "
+                      f"inserted in {time.perf_counter() - t:.2f}s", file=out)
+        totals["seconds"] = time.perf_counter() - tic
+        return totals
+
+    # ── queries ─────────────────────────────────────────────────────
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        with self.lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def files(self) -> pd.DataFrame:
+        return self.query("SELECT * FROM files ORDER BY first_ts")
+
+    def levels(self, column: str) -> list:
+        """Distinct non‑null values of a parcel column, for filter lists."""
+        if column not in GROUPS + ("status",):
+            raise ValueError(f"no levels for {column!r}")
+        with self.lock:
+            rows = self.conn.execute(f"SELECT DISTINCT {column} FROM parcels "
+                                     f"WHERE {column} IS NOT NULL ORDER BY 1").fetchall()
+        return [r[0] for r in rows]
+
+    def span(self):
+        """(first, last) registeredAt in the database, epoch ms; (None, None) if empty."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT MIN(registered_at), MAX(registered_at) FROM parcels").fetchone()
+
+    @staticmethod
+    def _where(start, end, location=None, destination=None, status=None):
+        clauses, params = ["registered_at >= ?", "registered_at < ?"], [start, end]
+        for name, value in (("location", location), ("destination", destination),
+                            ("status", status)):
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def count(self, start: int, end: int, **filters) -> int:
+        where, params = self._where(start, end, **filters)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM parcels WHERE {where}",
+                                     params).fetchone()[0]
+
+    def parcels(self, start: int, end: int, limit: int = 100, offset: int = 0,
+                **filters) -> pd.DataFrame:
+        """Parcels registered in [start, end) ms, in registration order, one page."""
+        where, params = self._where(start, end, **filters)
+        return self._frame(self.query(
+            f"SELECT * FROM parcels WHERE {where} ORDER BY registered_at, id LIMIT ? OFFSET ?",
+            params + [limit, offset]))
+
+    def find(self, kind: str, value, limit: int = 100) -> pd.DataFrame:
+        """Parcels by exact "hostId", "barcode" or "pic" – an index lookup each."""
+        if kind == "barcode":
+            sql = ("SELECT p.* FROM barcodes b JOIN parcels p ON p.id = b.parcel_id "
+                   "WHERE b.barcode = ? ORDER BY p.registered_at LIMIT ?")
+        elif kind in ("hostId", "pic"):
+            column = "host_id" if kind == "hostId" else "pic"
+            sql = f"SELECT * FROM parcels WHERE {column} = ? ORDER BY registered_at LIMIT ?"
+        else:
+            raise ValueError(f"unknown search kind {kind!r}")
+        return self._frame(self.query(sql, (value, limit)))
+
+    def _frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Parcel rows with their barcodes attached and ms turned into datetimes."""
+        if len(df):
+            ids = df["id"].tolist()
+            marks = ",".join("?" * len(ids))
+            codes = self.query(f"SELECT parcel_id, barcode FROM barcodes "
+                               f"WHERE parcel_id IN ({marks}) ORDER BY rowid", ids)
+            lists = codes.groupby("parcel_id")["barcode"].agg(list)
+            df["barcodes"] = [lists.get(i, []) for i in ids]
+        else:
+            df["barcodes"] = pd.Series(dtype=object)
+        for name in ("registered_at", "closed_at"):
+            df[name] = pd.to_datetime(df[name], unit="ms")
+        df["barcode_err"] = df["barcode_err"].astype(bool)
+        return df
+
+    def events(self, parcel_id: int) -> pd.DataFrame:
+        df = self.query("SELECT type, ts FROM events WHERE parcel_id = ? ORDER BY rowid",
+                        (parcel_id,))
+        df["ts"] = pd.to_datetime(df["ts"], unit="ms")
+        return df
+
+    def summary(self, start: int, end: int, by: str = "destination",
+                bucket_ms: int = DAY_MS) -> pd.DataFrame:
+        """
+        Per time bucket and `by` value: parcels, sorted, deregistered,
+        barcode errors and mean cycle time (s) of the closed ones.
+        """
+        if by not in GROUPS:
+            raise ValueError(f"cannot group by {by!r}")
+        df = self.query(
+            f"SELECT registered_at / ? * ? AS bucket, {by}, COUNT(*) AS parcels, "
+            "SUM(status = 'sorted') AS sorted, SUM(status = 'deregistered') AS deregistered, "
+            "SUM(barcode_err) AS barcode_err, "
+            "AVG(closed_at - registered_at) / 1000.0 AS avg_cycle_s "
+            f"FROM parcels WHERE registered_at >= ? AND registered_at < ? "
+            f"GROUP BY bucket, {by} ORDER BY bucket, {by}",
+            (bucket_ms, bucket_ms, start, end))
+        df["bucket"] = pd.to_datetime(df["bucket"], unit="ms")
+        return df
+
+    def anomalies(self, start: int, end: int) -> pd.DataFrame:
+        df = self.query("SELECT kind, ts, location, pic, host_id, value, expected, detail "
+                        "FROM anomalies WHERE ts >= ? AND ts < ? ORDER BY ts", (start, end))
+        df["ts"] = pd.to_datetime(df["ts"], unit="ms")
+        return df
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+def main(argv=None):
+    from batch import LOG_PATTERNS, expand_inputs
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", default=DB_PATH, help=f"database file (default {DB_PATH})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    ing = sub.add_parser("ingest", help="parse and store log / lifecycle JSON files")
+    ing.add_argument("inputs", nargs="+", help="files, globs or directories")
+    ing.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                     help="parallel parser processes (default: all cores)")
+    sub.add_parser("files", help="list the ingested files")
+    args = ap.parse_args(argv)
+
+    with ParcelDB(args.db) as db:
+        if args.command == "files":
+            print(db.files().to_string(index=False))
+            return
+        patterns = LOG_PATTERNS + tuple(f"*.{ext}" for ext in ("json", "jsonl"))
+        paths = expand_inputs(args.inputs, patterns)
+        if not paths:
+            ap.error("no input files found")
+        t = db.ingest_many(paths, args.workers)
+        print(f"{t['files']} files ({t['skipped']} unchanged), {t['parcels']:,} parcels "
+              f"in {t['seconds']:.1f}s → {args.db}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+# ── Tunables ────────────────────────────────────────────────────────
+STRAGGLER_S = 300               # late reports after ItemDeRegister still belong to it
+REUSE_GAP_S = 2 * 3600          # ItemRegister after this much silence = recycled PIC
+_NEVER = float("inf")
+
+
+class _Generation:
+    __slots__ = ("handle", "last", "closed", "registered")
+
+    def __init__(self, handle, last: int):
+        self.handle, self.last = handle, last
+        self.closed = self.registered = False
+
+
+class ParcelIdentity:
+    """
+    Maps each parcel line to its PIC *generation*: the PLC recycles PICs,
+    so one PIC stands for many physical parcels over a long log.
+
+    The active generation of a PIC ends, and the next line for it starts
+    a new one, when
+      * an ItemRegister arrives after the generation's ItemDeRegister,
+      * an ItemRegister arrives for a generation that was already
+        registered – the PLC reused the PIC without deregistering it,
+      * it was deregistered more than `straggler_s` of log time ago (late
+        sort reports inside that window are still attached to it), or
+      * an ItemRegister arrives after `reuse_gap_s` of silence, e.g. the
+        log started after the generation's own ItemRegister.
+
+    `active` is a plain PIC → generation dict, so routing a line is O(1);
+    deregistered generations wait in close order, so expiry only ever
+    looks at the oldest.  `new(pic)` creates the caller's record (a parcel
+    dict, a store row …) for a generation; `on_retire(handle)`, if given,
+    receives each one that ended – the caller's closed‑generation archive.
+    Host IDs and barcodes are recorded on whatever record a line resolves
+    to, so they always belong to the right generation.
+    """
+
+    def __init__(self, new, on_retire=None, straggler_s: float = STRAGGLER_S,
+                 reuse_gap_s: float = REUSE_GAP_S):
+        self.new, self.on_retire = new, on_retire
+        self.straggler_ms = int(straggler_s * 1000)
+        self.reuse_gap_ms = int(reuse_gap_s * 1000)
+        self.active = {}                    # pic → _Generation
+        self.closing = OrderedDict()        # pic → ItemDeRegister ms, oldest first
+        self._oldest = _NEVER               # first value in `closing`
+
+    def resolve(self, pic: int, msg: str, ts: int):
+        """Record for the generation this line (type `msg`, epoch ms `ts`) belongs to."""
+        if self._oldest < ts - self.straggler_ms:
+            self.expire(ts)
+        gen = self.active.get(pic)
+        if gen is not None and self.ends(gen.closed, gen.registered, gen.last, msg, ts):
+            self.retire(pic)
+            gen = None
+        if gen is None:
+            gen = self.active[pic] = _Generation(self.new(pic), ts)
+        gen.last = ts
+        if msg == "ItemRegister":
+            gen.registered = True
+        elif msg == "ItemDeRegister":
+            gen.closed = True
+            self.closing[pic] = ts
+            self.closing.move_to_end(pic)
+            self._oldest = next(iter(self.closing.values()))
+        return gen.handle
+
+    def ends(self, closed: bool, registered: bool, last: int, msg: str, ts: int) -> bool:
+        """True if a `msg` line at `ts` starts a new generation after this one."""
+        if msg != "ItemRegister":
+            return False
+        return closed or registered or ts - last > self.reuse_gap_ms
+
+    def expire(self, ts: int) -> None:
+        """Retire deregistered generations whose straggler window has passed."""
+        cutoff = ts - self.straggler_ms
+        while self._oldest < cutoff:
+            self.retire(next(iter(self.closing)))
+
+    def is_closed(self, pic: int) -> bool:
+        """True if the active generation of `pic` has been deregistered."""
+        gen = self.active.get(pic)
+        return gen is not None and gen.closed
+
+    def adopt(self, pic: int, handle, last: int, closed_at=None,
+              registered: bool = False) -> None:
+        """Make an existing record the active generation of `pic`."""
+        gen = self.active[pic] = _Generation(handle, last)
+        gen.registered = registered
+        if closed_at is not None:
+            gen.closed = True
+            self.closing[pic] = closed_at
+            self._oldest = next(iter(self.closing.values()))
+
+    def retire(self, pic: int) -> None:
+        """End the active generation of `pic`; its next line starts a new one."""
+        gen = self.active.pop(pic, None)
+        if self.closing.pop(pic, None) is not None:
+            self._oldest = next(iter(self.closing.values()), _NEVER)
+        if gen is not None and self.on_retire is not None:
+            self.on_retire(gen.handle)
+
+    def retire_all(self) -> None:
+        for pic in list(self.active):
+            self.retire(pic)
@@ -0,0 +1,116 @@
+import numpy as np
+import pyarrow as pa
+
+# ── Index kinds ─────────────────────────────────────────────────────
+KINDS = ("pic", "hostId", "barcode")
+SUFFIX_KINDS = ("barcode",)                 # also searchable by trailing digits
+_KEY_TYPES = {"pic": np.int64, "hostId": object, "barcode": object}
+_MAX_CHAR = "\U0010ffff"                    # sorts after every real character
+
+
+class ParcelIndex:
+    """
+    Inverted indexes key → parcel rows for PIC, host ID and barcode.
+
+    Keys are appended while parsing and folded into sorted key / row
+    arrays on the first query, so exact, prefix and (for barcodes) suffix
+    lookups are a pair of binary searches – O(log n), no scan over rows.
+    """
+
+    def __init__(self):
+        self._pending = {k: ([], []) for k in KINDS}          # keys, rows
+        self._keys = {k: np.empty(0, dtype=_KEY_TYPES[k]) for k in KINDS}
+        self._rows = {k: np.empty(0, dtype=np.int32) for k in KINDS}
+        self._rev_keys = {k: np.empty(0, dtype=object) for k in SUFFIX_KINDS}
+        self._rev_rows = {k: np.empty(0, dtype=np.int32) for k in SUFFIX_KINDS}
+
+    # ── building ────────────────────────────────────────────────────
+    def add(self, kind: str, key, row: int) -> None:
+        keys, rows = self._pending[kind]
+        keys.append(key)
+        rows.append(row)
+
+    def _flush(self, kind: str) -> None:
+        keys, rows = self._pending[kind]
+        if not keys:
+            return
+        new_keys = np.array(keys, dtype=_KEY_TYPES[kind])
+        new_rows = np.array(rows, dtype=np.int32)
+        self._pending[kind] = ([], [])
+
+        self._keys[kind], self._rows[kind] = _merge(
+            self._keys[kind], self._rows[kind], new_keys, new_rows
+        )
+        if kind in SUFFIX_KINDS:
+            rev = np.array([k[::-1] for k in new_keys], dtype=object)
+            self._rev_keys[kind], self._rev_rows[kind] = _merge(
+                self._rev_keys[kind], self._rev_rows[kind], rev, new_rows
+            )
+
+    # ── queries ─────────────────────────────────────────────────────
+    def lookup(self, kind: str, key) -> np.ndarray:
+        """Rows whose `kind` equals `key`, ascending."""
+        self._flush(kind)
+        keys = self._keys[kind]
+        lo = np.searchsorted(keys, key, side="left")
+        hi = np.searchsorted(keys, key, side="right")
+        return np.unique(self._rows[kind][lo:hi])
+
+    def prefix(self, kind: str, prefix: str) -> np.ndarray:
+        """Rows whose string `kind` starts with `prefix`, ascending."""
+        self._flush(kind)
+        return _range(self._keys[kind], self._rows[kind], prefix)
+
+    def suffix(self, kind: str, suffix: str) -> np.ndarray:
+        """Rows whose `kind` ends with `suffix` (partial barcode), ascending."""
+        self._flush(kind)
+        return _range(self._rev_keys[kind], self._rev_rows[kind], suffix[::-1])
+
+    # ── persistence ─────────────────────────────────────────────────
+    def to_tables(self) -> dict:
+        """{file stem: Arrow table} for storing next to a cached parse."""
+        tables = {}
+        for kind in KINDS:
+            self._flush(kind)
+            tables[f"index.{kind}"] = pa.table(
+                {"key": pa.array(self._keys[kind]), "row": pa.array(self._rows[kind])}
+            )
+        for kind in SUFFIX_KINDS:
+            tables[f"index.{kind}.rev"] = pa.table(
+                {"key": pa.array(self._rev_keys[kind], type=pa.string()),
+                 "row": pa.array(self._rev_rows[kind])}
+            )
+        return tables
+
+    @classmethod
+    def from_tables(cls, tables: dict) -> "ParcelIndex":
+        index = cls()
+        for kind in KINDS:
+            t = tables[f"index.{kind}"]
+            index._keys[kind] = np.asarray(t.column("key").to_numpy(zero_copy_only=False),
+                                           dtype=_KEY_TYPES[kind])
+            index._rows[kind] = t.column("row").to_numpy().astype(np.int32, copy=False)
+        for kind in SUFFIX_KINDS:
+            t = tables[f"index.{kind}.rev"]
+            index._rev_keys[kind] = np.asarray(t.column("key").to_numpy(zero_copy_only=False),
+                                               dtype=object)
+            index._rev_rows[kind] = t.column("row").to_numpy().astype(np.int32, copy=False)
+        return index
+
+
+# ── Sorted‑array helpers ────────────────────────────────────────────
+def _merge(keys, rows, new_keys, new_rows):
+    # sort only the new batch, then splice it in: O(n + k log k), so a
+    # growing (live) index never re‑sorts what it already has
+    order = np.argsort(new_keys, kind="stable")
+    new_keys, new_rows = new_keys[order], new_rows[order]
+    at = np.searchsorted(keys, new_keys, side="right")
+    return np.insert(keys, at, new_keys), np.insert(rows, at, new_rows)
+
+
+def _range(keys, rows, prefix: str) -> np.ndarray:
+    if not prefix:
+        return np.empty(0, dtype=np.int32)
+    lo = np.searchsorted(keys, prefix, side="left")
+    hi = np.searchsorted(keys, prefix + _MAX_CHAR, side="left")
+    return np.unique(rows[lo:hi])
@@ -0,0 +1,392 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from anomalies import AnomalyDetector
+from hlc_parser import CHUNK_SIZE, ID_MAP, Parser, decoders, iter_lines, tokenize
+from log_io import LogView
+from metrics import Kpis
+from parcel_identity import ParcelIdentity
+from parcel_index import ParcelIndex
+import profiling
+
+# Bump whenever parsing rules or the store layout change – it is part of
+# every parse‑cache key, so stale cached results are never served.
+PARSER_VERSION = 8
+
+# ── Fixed code tables ───────────────────────────────────────────────
+STATUSES = ["open", "sorted", "deregistered"]
+OPEN, SORTED, DEREGISTERED = range(3)
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+NAT = np.iinfo(np.int64).min                 # int64 value that views as NaT
+NO_OFFSET = -1                               # event without a raw log line
+
+
+class Levels:
+    """Append‑only value ↔ int code table backing one categorical column."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value) -> int:
+        """Code for `value`, adding it on first sight; None → -1 (missing)."""
+        if value is None:
+            return -1
+        c = self.codes.get(value)
+        if c is None:
+            c = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def __len__(self):
+        return len(self.values)
+
+
+# ── Columnar store ──────────────────────────────────────────────────
+class ParcelStore:
+    """
+    Parcels as parallel typed columns (one row per PIC generation, see
+    parcel_identity) plus a flat event table.  Events keep the byte
+    offset of their log line instead of a copy of it; `source` is
+    whatever those offsets point into.  Each event links back to the
+    previous event of its row, so one parcel's events are found without
+    scanning the table and its lines are decoded only when asked for.
+
+    Raw lines are decoded by hlc_core with the dashboard parser's
+    decoders; the store is their records (see hlc_core.DictRecords), a
+    parcel is a row number, and timestamps are epoch ms.
+    """
+    millis = True
+
+    def __init__(self, source=None):
+        self.source = source
+
+        # parcel table
+        self.pic          = array("q")
+        self.host_id      = []                   # str | None per row
+        self.barcodes     = []                   # list[str] | None per row
+        self.location     = array("i")           # codes into self.locations
+        self.destination  = array("i")           # codes into self.destinations
+        self.status       = array("b")           # codes into STATUSES
+        self.registered_at = array("q")          # epoch ms, NAT if unknown
+        self.closed_at    = array("q")
+        self.barcode_err  = array("b")
+        self.last_event   = array("i")           # newest event of the row, -1 if none
+
+        # event table
+        self.ev_row    = array("i")              # parcel row
+        self.ev_type   = array("h")              # codes into self.types
+        self.ev_ts     = array("q")              # epoch ms
+        self.ev_offset = array("q")              # byte offset of the log line, or NO_OFFSET
+        self.ev_prev   = array("i")              # previous event of the same row, -1 if first
+        self.ev_text   = {}                      # event → (direction, raw) kept from an import
+
+        self.locations    = Levels()
+        self.destinations = Levels()
+        self.types        = Levels(ID_MAP.values())
+        self.identity = ParcelIdentity(self._new_row)     # pic → active row
+        self.index = ParcelIndex()               # pic / hostId / barcode → rows
+        self.kpis = Kpis()
+        self.anomalies = AnomalyDetector(describe=self._describe)
+        self.touched = None                      # rows fed since changes(), if tracked
+        self._anomalies_seen = 0
+        self._offset = NO_OFFSET                 # of the line being fed
+        self._scan_ok = None                     # its barcode scan status, if any
+        self._feed = Parser(decoders(), self).feeder(self.identity)
+
+    def __len__(self):
+        return len(self.pic)
+
+    # ── building ────────────────────────────────────────────────────
+    def _new_row(self, pic: int) -> int:
+        row = len(self.pic)
+        self.index.add("pic", pic, row)
+        self.pic.append(pic)
+        self.host_id.append(None)
+        self.barcodes.append(None)
+        self.location.append(-1)
+        self.destination.append(-1)
+        self.status.append(OPEN)
+        self.registered_at.append(NAT)
+        self.closed_at.append(NAT)
+        self.barcode_err.append(0)
+        self.last_event.append(-1)
+        self.kpis.on_new(OPEN)
+        return row
+
+    def close(self, pic: int) -> None:
+        """
+        Stop routing `pic` to its current row; the row stays in the table
+        as a closed parcel and the next line for `pic` starts a new one.
+        """
+        self.identity.retire(pic)
+
+    def _set_status(self, row: int, status: int) -> None:
+        if self.status[row] != status:
+            self.kpis.on_status(self.status[row], status)
+            self.status[row] = status
+
+    def _set_times(self, row: int, registered: int, closed: int) -> None:
+        def ms(v):
+            return None if v == NAT else v
+        self.kpis.on_times(ms(self.registered_at[row]), ms(self.closed_at[row]),
+                           ms(registered), ms(closed))
+        self.registered_at[row] = registered
+        self.closed_at[row] = closed
+
+    def _first(self, column, levels, row: int, value):
+        # same as `x = x or value` on the dict parcel, "" kept until a real value
+        if column[row] < 0 or not levels.values[column[row]]:
+            column[row] = levels.code(value)
+
+    def _describe(self, row: int) -> dict:
+        return {"pic": self.pic[row], "hostId": self.host_id[row]}
+
+    @staticmethod
+    def _level(levels, code: int):
+        return levels.values[code] if code >= 0 else None
+
+    def add_barcode(self, row: int, bc: str) -> None:
+        lst = self.barcodes[row]
+        if lst is None:
+            self.barcodes[row] = [bc]
+        elif bc not in lst:
+            lst.append(bc)
+        else:
+            return
+        self.index.add("barcode", bc, row)
+
+    def _add_event(self, row: int, msg: str, ts: int, offset: int) -> None:
+        self.ev_prev.append(self.last_event[row])
+        self.last_event[row] = len(self.ev_row)
+        self.ev_row.append(row)
+        self.ev_type.append(self.types.code(msg))
+        self.ev_ts.append(ts)
+        self.ev_offset.append(offset)
+
+    def feed(self, offset: int, line: str):
+        """
+        Apply one raw log line (found at byte `offset`) to the store.
+        Returns (pic, msg, ts_ms) for a parcel line, None if it was skipped.
+        """
+        self._offset = offset
+        return self._feed(line)
+
+    # ── hlc_core records: the decoders write rows through these ─────
+    new = _new_row
+
+    def location_of(self, row: int):
+        return self._level(self.locations, self.location[row])
+
+    def set_first(self, row: int, field: str, value) -> None:
+        if field == "hostId":
+            if not self.host_id[row]:
+                self.host_id[row] = value
+                if value:
+                    self.index.add("hostId", value, row)
+        elif field == "location":
+            self._first(self.location, self.locations, row, value)
+        else:
+            self._first(self.destination, self.destinations, row, value)
+
+    def set_registered(self, row: int, ts: int) -> None:
+        if self.registered_at[row] == NAT:
+            self._set_times(row, ts, self.closed_at[row])
+            self.kpis.on_registered(ts, self.location_of(row))
+
+    def set_closed(self, row: int, ts: int) -> None:
+        self._set_times(row, self.registered_at[row], ts)
+        self.kpis.on_closed(ts, self.location_of(row),
+                            self._level(self.destinations, self.destination[row]))
+
+    def status_of(self, row: int) -> str:
+        return STATUSES[self.status[row]]
+
+    def set_status(self, row: int, status: str) -> None:
+        self._set_status(row, STATUS_CODES[status])
+
+    def set_scanned(self, row: int, ok: bool) -> None:
+        self._scan_ok = ok
+        if not ok and not self.barcode_err[row]:
+            self.barcode_err[row] = 1
+            self.kpis.on_barcode_err()
+
+    def add_event(self, row: int, ts: int, msg: str, body: str) -> None:
+        # the last decoder of every line: the row is complete for it
+        if self.touched is not None:
+            self.touched.add(row)
+        self.anomalies.feed(row, msg, ts, self.location_of(row), self._scan_ok)
+        self._scan_ok = None
+        self._add_event(row, msg, ts, self._offset)
+
+    def add_parcel(self, pic: int, host_id=None, barcodes=(), location=None,
+                   destination=None, status: int = OPEN, registered_at: int = NAT,
+                   closed_at: int = NAT, barcode_err: bool = False, events=()) -> int:
+        """
+        Append an already assembled parcel (e.g. from a JSON export) as a
+        closed row.  `events` are (type, ts_ms, offset) tuples; use
+        NO_OFFSET when there is no log line to point at, and add the
+        event's direction and raw message as two more items to have
+        `events_for(raw=True)` show them anyway.
+        """
+        row = self._new_row(pic)
+        if host_id:
+            self.host_id[row] = host_id
+            self.index.add("hostId", host_id, row)
+        for bc in barcodes:
+            self.add_barcode(row, bc)
+        self.location[row] = self.locations.code(location)
+        self.destination[row] = self.destinations.code(destination)
+        self._set_status(row, status)
+        self._set_times(row, registered_at, closed_at)
+        if barcode_err:
+            self.barcode_err[row] = 1
+            self.kpis.on_barcode_err()
+        if registered_at != NAT:
+            self.kpis.on_registered(registered_at, location)
+        if closed_at != NAT:
+            self.kpis.on_closed(closed_at, location, destination)
+
+        for msg, ts, offset, *text in events:
+            if any(text):
+                self.ev_text[len(self.ev_row)] = tuple(text)
+            self._add_event(row, msg, ts, offset)
+        return row
+
+    # ── following a growing store ───────────────────────────────────
+    def track_changes(self, on: bool = True) -> None:
+        """Start (or stop) recording the rows each fed line touches, for `changes`."""
+        self.touched = set() if on else None
+        self._anomalies_seen = len(self.anomalies)
+
+    def changes(self):
+        """
+        What a reader needs to catch up since the previous call: (copied
+        DataFrame of the rows fed since then, indexed by row; Kpis copy
+        without throughput buckets; anomalies emitted since then, with the
+        full counts).  Cost follows the changes, not the store size.  The
+        caller holds whatever lock guards feeding.
+        """
+        rows = np.fromiter(self.touched, dtype=np.intp, count=len(self.touched))
+        rows.sort()
+        self.touched.clear()
+        anomalies = self.anomalies.since(self._anomalies_seen)
+        self._anomalies_seen = len(self.anomalies)
+        return self.to_dataframe(rows=rows), self.kpis.copy(throughput=False), anomalies
+
+    # ── pandas views ────────────────────────────────────────────────
+    def to_dataframe(self, copy: bool = False, rows=None) -> pd.DataFrame:
+        """
+        Typed DataFrame over the columns; numeric and code arrays are
+        wrapped, not copied.  A wrapped buffer pins the underlying arrays,
+        so pass `copy=True` for a snapshot of a store that keeps growing.
+        With `rows` (an array of row positions, which becomes the index)
+        only those rows are taken, always as a copy.
+        """
+        copy = copy or rows is not None
+
+        def col(arr, dtype):
+            if not len(arr):
+                return np.empty(0, dtype)
+            if rows is not None:
+                return np.frombuffer(arr, dtype=dtype)[rows]
+            return np.array(arr, dtype=dtype) if copy else np.frombuffer(arr, dtype=dtype)
+
+        def cat(arr, levels):
+            return pd.Categorical.from_codes(col(arr, np.int32), categories=levels, validate=False)
+
+        def pick(values):
+            return values if rows is None else [values[r] for r in rows]
+
+        return pd.DataFrame({
+            "pic":          col(self.pic, np.int64),
+            "hostId":       pd.Series(pick(self.host_id), index=rows, dtype=object),
+            "barcodes":     pd.Series([list(b or ()) if copy else b or []
+                                       for b in pick(self.barcodes)], index=rows, dtype=object),
+            "location":     cat(self.location, self.locations.values),
+            "destination":  cat(self.destination, self.destinations.values),
+            "status":       pd.Categorical.from_codes(
+                                col(self.status, np.int8), categories=STATUSES, validate=False),
+            "registeredAt": col(self.registered_at, np.int64).view("datetime64[ms]"),
+            "closedAt":     col(self.closed_at, np.int64).view("datetime64[ms]"),
+            "barcodeErr":   col(self.barcode_err, np.int8).view(np.bool_),
+        }, index=rows, copy=False)
+
+    def events_frame(self) -> pd.DataFrame:
+        """Flat event table: row, type, ts, offset."""
+        return pd.DataFrame({
+            "row":    np.frombuffer(self.ev_row, dtype=np.int32),
+            "type":   pd.Categorical.from_codes(
+                          np.frombuffer(self.ev_type, dtype=np.int16),
+                          categories=self.types.values, validate=False),
+            "ts":     np.frombuffer(self.ev_ts, dtype=np.int64).view("datetime64[ms]"),
+            "offset": np.frombuffer(self.ev_offset, dtype=np.int64),
+        }, copy=False)
+
+    def event_ids(self, row: int) -> np.ndarray:
+        """Event positions of one parcel row, in log order – O(its events)."""
+        ids, ev = [], self.last_event[row]
+        while ev >= 0:
+            ids.append(ev)
+            ev = self.ev_prev[ev]
+        return np.array(ids[::-1], dtype=np.intp)
+
+    def events_for(self, row: int, raw: bool = False) -> pd.DataFrame:
+        """
+        Events of one parcel row, in log order.  With `raw` their log
+        lines are read back from `source` and decoded into "direction"
+        and "raw" (the message body).  Imported events without a line
+        use the text kept by `add_parcel`, else both are None.
+        """
+        ids = self.event_ids(row)
+
+        def col(arr, dtype):
+            return np.frombuffer(arr, dtype=dtype)[ids] if len(ids) else np.empty(0, dtype)
+
+        offsets = col(self.ev_offset, np.int64)
+        ev = pd.DataFrame({
+            "row":    np.full(len(ids), row, dtype=np.int32),
+            "type":   pd.Categorical.from_codes(col(self.ev_type, np.int16),
+                                                categories=self.types.values, validate=False),
+            "ts":     col(self.ev_ts, np.int64).view("datetime64[ms]"),
+            "offset": offsets,
+        })
+        if raw:
+            ev["direction"], ev["raw"] = self._decode(offsets.tolist(), ids.tolist())
+        return ev
+
+    def _decode(self, offsets: list, ids: list):
+        # offsets → ([direction], [message body]) from the source's lines,
+        # or from ev_text for imported events without one
+        lines = {}
+        wanted = [o for o in offsets if o != NO_OFFSET]
+        if wanted and self.source is not None:
+            with LogView(self.source) as view:
+                lines = view.lines(wanted)
+        direction, raw = [], []
+        for off, ev in zip(offsets, ids):
+            tok = tokenize(lines[off]) if off in lines else None
+            if tok is None:
+                d, r = self.ev_text.get(ev, (None, None))
+                direction.append(d)
+                raw.append(r)
+                continue
+            parts = tok[3]
+            direction.append("PLC→HOST" if parts[0].startswith("PLC") else "HOST→PLC")
+            raw.append(tok[2])
+        return direction, raw
+
+
+# ── Entry point ─────────────────────────────────────────────────────
+def build_store(source, chunk_size: int = CHUNK_SIZE) -> ParcelStore:
+    """Stream a binary file object or path into a ParcelStore."""
+    store = ParcelStore(source)
+    feed = profiling.instrument(store.feed)
+    for offset, line in iter_lines(source, chunk_size, offsets=True):
+        feed(offset, line)
+    store.anomalies.finish()
+    return store
@@ -0,0 +1,241 @@
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+
+from anomalies import AnomalyDetector
+from hlc_parser import CHUNK_SIZE
+from lifecycle_json import is_lifecycle_json, load_store
+from metrics import Kpis
+from parcel_index import ParcelIndex
+from parcel_store import PARSER_VERSION, Levels, ParcelStore, build_store
+import profiling
+
+# ── Configuration ───────────────────────────────────────────────────
+CACHE_DIR = os.environ.get("LOG_ANALYZER_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "log_analyzer"
+)
+CACHE_MAX_BYTES  = int(os.environ.get("LOG_ANALYZER_CACHE_MAX_BYTES", 4 << 30))
+MEMORY_MAX_BYTES = int(os.environ.get("LOG_ANALYZER_MEMORY_MAX_BYTES", 1 << 30))
+STALE_TMP_S = 3600                          # abandoned half‑written entries
+ENTRY_MODE = 0o755                          # readable by the other users of a shared dir
+
+# ParcelStore array attributes and their typecodes, in file column order
+PARCEL_ARRAYS = [
+    ("pic", "q"), ("location", "i"), ("destination", "i"), ("status", "b"),
+    ("registered_at", "q"), ("closed_at", "q"), ("barcode_err", "b"), ("last_event", "i"),
+]
+EVENT_ARRAYS = [("ev_row", "i"), ("ev_type", "h"), ("ev_ts", "q"), ("ev_offset", "q"),
+                ("ev_prev", "i")]
+LEVELS = ["locations", "destinations", "types"]
+
+
+# ── Keys ────────────────────────────────────────────────────────────
+def content_key(source, chunk_size: int = CHUNK_SIZE) -> str:
+    """Hash of the file content plus PARSER_VERSION; rewinds file objects."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{PARSER_VERSION}:".encode())
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            return content_key(fh, chunk_size)
+    source.seek(0)
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        h.update(chunk)
+    source.seek(0)
+    return h.hexdigest()
+
+
+# ── Arrow (de)serialisation ─────────────────────────────────────────
+def store_to_tables(store: ParcelStore) -> dict:
+    """ParcelStore → {file stem: Arrow table}; code tables in metadata."""
+    def arr(values):
+        return pa.array(np.frombuffer(values, dtype=values.typecode) if len(values)
+                        else np.empty(0, dtype=values.typecode))
+
+    parcels = {name: arr(getattr(store, name)) for name, _ in PARCEL_ARRAYS}
+    parcels["host_id"]  = pa.array(store.host_id, type=pa.string())
+    parcels["barcodes"] = pa.array(store.barcodes, type=pa.list_(pa.string()))
+    meta = {"levels": json.dumps({k: getattr(store, k).values for k in LEVELS}),
+            "kpis": json.dumps(store.kpis.to_dict()),
+            "anomalies": json.dumps(store.anomalies.to_dict())}
+
+    events = {name: arr(getattr(store, name)) for name, _ in EVENT_ARRAYS}
+    text = store.ev_text
+    tables = {"parcels": pa.table(parcels, metadata=meta), "events": pa.table(events),
+              "event_text": pa.table({
+                  "event":     pa.array(list(text), type=pa.int64()),
+                  "direction": pa.array([d for d, _ in text.values()], type=pa.string()),
+                  "raw":       pa.array([r for _, r in text.values()], type=pa.string()),
+              })}
+    tables.update(store.index.to_tables())
+    return tables
+
+
+def tables_to_store(tables: dict, source=None) -> ParcelStore:
+    """Inverse of `store_to_tables`."""
+    parcels, events = tables["parcels"], tables["events"]
+    store = ParcelStore(source)
+    for table, spec in ((parcels, PARCEL_ARRAYS), (events, EVENT_ARRAYS)):
+        for name, code in spec:
+            col = table.column(name).to_numpy()
+            setattr(store, name, array(code, col.tobytes()))
+    store.host_id  = parcels.column("host_id").to_pylist()
+    store.barcodes = parcels.column("barcodes").to_pylist()
+    text = tables["event_text"]
+    store.ev_text = dict(zip(text.column("event").to_pylist(),
+                             zip(text.column("direction").to_pylist(),
+                                 text.column("raw").to_pylist())))
+
+    levels = json.loads(parcels.schema.metadata[b"levels"])
+    for name in LEVELS:
+        setattr(store, name, Levels(levels[name]))
+    store.index = ParcelIndex.from_tables(tables)
+    store.kpis = Kpis.from_dict(json.loads(parcels.schema.metadata[b"kpis"]))
+    store.anomalies = AnomalyDetector.from_dict(json.loads(parcels.schema.metadata[b"anomalies"]))
+    return store
+
+
+def _write_table(path: str, table: pa.Table) -> None:
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path: str) -> pa.Table:
+    with pa.memory_map(path, "r") as src:
+        return pa.ipc.open_file(src).read_all()
+
+
+# ── Cache ───────────────────────────────────────────────────────────
+class ParseCache:
+    """
+    Two‑level cache of parsed logs: an in‑process LRU of ParcelStores and
+    an on‑disk LRU of Arrow IPC entries, each bounded by total bytes.
+    Entries are written to a temp dir and renamed into place, so several
+    dashboard processes (or users) can share one directory safely; an
+    entry that cannot be read is a miss.  The memory tier is shared by
+    every session of a process, so it is locked and hands out copies.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR,
+                 max_bytes: int = CACHE_MAX_BYTES,
+                 memory_bytes: int = MEMORY_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()        # key → (store, nbytes)
+        self._lock = threading.Lock()       # guards _memory
+        os.makedirs(directory, exist_ok=True)
+
+    # ── memory tier ────────────────────────────────────────────────
+    def _remember(self, key: str, store: ParcelStore, nbytes: int) -> None:
+        with self._lock:
+            self._memory[key] = (store, nbytes)
+            self._memory.move_to_end(key)
+            total = sum(n for _, n in self._memory.values())
+            while total > self.memory_bytes and len(self._memory) > 1:
+                _, (_, n) = self._memory.popitem(last=False)
+                total -= n
+
+    def _recall(self, key: str, source=None):
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is None:
+                return None
+            self._memory.move_to_end(key)
+        # the cached store is shared: the caller's gets its own `source`
+        store = copy.copy(hit[0])
+        if source is not None:
+            store.source = source
+        return store
+
+    # ── disk tier ──────────────────────────────────────────────────
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str, source=None):
+        """Cached ParcelStore for `key`, or None."""
+        hit = self._recall(key, source)
+        if hit is not None:
+            return hit
+
+        entry = self._entry(key)
+        try:
+            tables = {
+                name[:-len(".arrow")]: _read_table(os.path.join(entry, name))
+                for name in os.listdir(entry) if name.endswith(".arrow")
+            }
+            store = tables_to_store(tables, source)
+        except (OSError, KeyError, pa.ArrowInvalid):
+            return None                             # missing, evicted meanwhile or unreadable
+        try:
+            os.utime(entry)                         # LRU touch
+        except OSError:
+            pass                                    # entry owned by another user
+
+        self._remember(key, store, sum(t.nbytes for t in tables.values()))
+        return store
+
+    def put(self, key: str, store: ParcelStore) -> None:
+        tables = store_to_tables(store)
+        self._remember(key, store, sum(t.nbytes for t in tables.values()))
+
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for name, table in tables.items():
+                _write_table(os.path.join(tmp, f"{name}.arrow"), table)
+            os.chmod(tmp, ENTRY_MODE)               # mkdtemp makes it owner‑only
+            os.rename(tmp, self._entry(key))
+        except OSError:
+            pass                                    # another writer won the race
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def load_or_build(self, source):
+        """
+        ParcelStore for `source` – a raw log or a lifecycle JSON export –
+        parsing and caching it on a miss.
+        """
+        with profiling.stage("cache.lookup"):
+            key = content_key(source)
+            store = self.get(key, source)
+        if store is None:
+            with profiling.stage("parse"):
+                store = (load_store if is_lifecycle_json(source) else build_store)(source)
+            with profiling.stage("cache.store"):
+                self.put(key, store)
+        return store
+
+    def evict(self) -> None:
+        """Drop least‑recently‑used disk entries until under `max_bytes`."""
+        entries, now = [], time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+                size = sum(
+                    os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+                )
+            except OSError:
+                continue
+            if name.startswith(".tmp-"):
+                if now - mtime > STALE_TMP_S:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            entries.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,258 @@
+"""
+Opt‑in instrumentation of the parser and the dashboard.
+
+    with Profile() as prof:
+        store = build_store("big.txt")
+    prof.to_json("report.json")
+
+    python profiling.py big.txt -o report.json
+
+While a Profile is active (per thread, so dashboard sessions never mix)
+the line loops count every line by message type and every rejected line
+by reason, and time one line in `sample_every` in detail: tokenizing,
+timestamp parsing and the handling of its message type.  Those stage
+totals are extrapolated from the samples, which keeps the cost near a
+counter increment per line.  Chunk reads, chunk decoding and the
+dashboard steps wrapped in `stage()` are timed in full.  In the
+dashboard the sidebar's Diagnostics switch (default: the
+LOG_ANALYZER_PROFILE environment variable) turns it on.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+try:
+    import resource
+except ImportError:                             # Windows
+    resource = None
+
+ENV = "LOG_ANALYZER_PROFILE"
+SAMPLE_EVERY = 64                               # lines per detailed (timed) line
+
+_ACTIVE = ContextVar("log_analyzer_profile", default=None)
+
+
+# ── Activation ──────────────────────────────────────────────────────
+def current():
+    """The Profile active in this thread, or None."""
+    return _ACTIVE.get()
+
+
+def activate(profile) -> None:
+    """Make `profile` (or None: nothing) the active one for this thread."""
+    _ACTIVE.set(profile)
+
+
+def enabled_by_env() -> bool:
+    return os.environ.get(ENV, "") not in ("", "0")
+
+
+def stage(name: str):
+    """Context manager timing `name` on the active Profile; a no‑op without one."""
+    profile = _ACTIVE.get()
+    return nullcontext() if profile is None else _Stage(profile, name)
+
+
+def instrument(feed):
+    """`feed` wrapped for the active Profile (see Profile.instrument), else as is."""
+    profile = _ACTIVE.get()
+    return feed if profile is None else profile.instrument(feed)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024    # bytes vs KiB
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "tic")
+
+    def __init__(self, profile, name: str):
+        self.profile, self.name = profile, name
+
+    def __enter__(self):
+        self.tic = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, time.perf_counter() - self.tic)
+
+
+class _TimedReader:
+    """read() of a binary stream, with the time spent in it added to "read"."""
+
+    def __init__(self, fh, profile):
+        self.fh, self.profile = fh, profile
+
+    def read(self, n: int = -1) -> bytes:
+        tic = time.perf_counter()
+        data = self.fh.read(n)
+        self.profile.add("read", time.perf_counter() - tic)
+        return data
+
+
+# ── Profile ─────────────────────────────────────────────────────────
+class Profile:
+    """Counters and timings of one parse plus the dashboard steps after it."""
+
+    def __init__(self, sample_every: int = SAMPLE_EVERY):
+        self.sample_every = sample_every
+        self.stages = {}                        # name → [seconds, calls, last seconds]
+        self.lines = 0                          # lines seen by instrumented loops
+        self.types = Counter()                  # message type → lines
+        self.rejected = Counter()               # reject reason → lines
+        self.sampled = 0
+        self.sample_s = Counter()               # "tokenize" / "timestamp" → sampled seconds
+        self.handle_s = Counter()               # message type → sampled handling seconds
+        self.handle_n = Counter()               # message type → sampled lines
+        self.started = time.time()
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_ACTIVE.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        _ACTIVE.reset(self._tokens.pop())
+
+    def stage(self, name: str):
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = [0.0, 0, 0.0]
+        entry[0] += seconds
+        entry[1] += 1
+        entry[2] = seconds
+
+    # ── hooks for the line loops ────────────────────────────────────
+    def iter_lines(self, fh, chunks):
+        """
+        Lines of `chunks(reader)` – a per‑chunk line‑list generator over
+        the binary stream `fh` – with read and decode time recorded.
+        """
+        read = self.stages.setdefault("read", [0.0, 0, 0.0])
+        it = chunks(_TimedReader(fh, self))
+        while True:
+            tic, read_s = time.perf_counter(), read[0]
+            lines = next(it, None)
+            if lines is None:
+                break
+            self.add("decode", time.perf_counter() - tic - (read[0] - read_s))
+            yield from lines
+
+    def instrument(self, feed):
+        """
+        Wrap a line handler `feed(…, line)` that returns None for a
+        skipped line and (pic, message type, …) otherwise.
+        """
+        from hlc_core import _ts_iso, reject_reason, tokenize
+
+        every, types, rejected = self.sample_every, self.types, self.rejected
+        perf = time.perf_counter
+
+        def timed(args):
+            line = args[-1]
+            t0 = perf()
+            accepted = tokenize(line) is not None
+            t1 = perf()
+            if accepted:
+                _ts_iso(line)
+            t2 = perf()
+            res = feed(*args)
+            t3 = perf()
+            self.sampled += 1
+            if accepted:
+                self.sample_s["tokenize"] += (t1 - t0) - (t2 - t1)
+                self.sample_s["timestamp"] += t2 - t1
+            else:
+                self.sample_s["tokenize"] += t1 - t0
+            if res is not None:
+                # feed tokenized the line again; what is left is the handling
+                self.handle_s[res[1]] += max(0.0, (t3 - t2) - (t1 - t0))
+                self.handle_n[res[1]] += 1
+            return res
+
+        def wrapped(*args):
+            self.lines += 1
+            res = feed(*args) if self.lines % every else timed(args)
+            if res is None:
+                rejected[reject_reason(args[-1])] += 1
+            else:
+                types[res[1]] += 1
+            return res
+
+        return wrapped
+
+    # ── report ──────────────────────────────────────────────────────
+    def report(self) -> dict:
+        scale = self.lines / self.sampled if self.sampled else 0.0
+        stages = {name: {"seconds": round(s, 6), "calls": n, "last_seconds": round(last, 6)}
+                  for name, (s, n, last) in self.stages.items()}
+        for name in ("tokenize", "timestamp"):
+            if self.sampled:
+                stages[name] = {"seconds": round(self.sample_s[name] * scale, 6),
+                                "estimated": True}
+        types = {}
+        for msg, n in self.types.most_common():
+            sampled = self.handle_n[msg]
+            est = self.handle_s[msg] / sampled * n if sampled else None
+            types[msg] = {"lines": n, "handle_seconds": None if est is None else round(est, 6),
+                          "estimated": True}
+        if types:
+            stages["handle"] = {"seconds": round(sum(t["handle_seconds"] or 0
+                                                     for t in types.values()), 6),
+                                "estimated": True}
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "lines": self.lines,
+            "accepted_lines": sum(self.types.values()),
+            "rejected_lines": sum(self.rejected.values()),
+            "sample_every": self.sample_every,
+            "sampled_lines": self.sampled,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+            "message_types": types,
+            "rejected": dict(self.rejected.most_common()),
+        }
+
+    def to_json(self, path=None) -> str:
+        text = json.dumps(self.report(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        return text
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+def main():
+    # run as a script this module is __main__; the parser sees `profiling`
+    from parcel_store import build_store
+    from profiling import Profile, stage
+
+    ap = argparse.ArgumentParser(description="Profile parsing one log into the dashboard store.")
+    ap.add_argument("log")
+    ap.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    ap.add_argument("--sample-every", type=int, default=SAMPLE_EVERY)
+    args = ap.parse_args()
+
+    with Profile(args.sample_every) as prof:
+        with stage("parse"):
+            store = build_store(args.log)
+        with stage("dataframe"):
+            store.to_dataframe()
+    text = prof.to_json(args.output)
+    if not args.output:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Shared fixtures: the bundled lifecycle export replayed as a raw HLC log.
+"""
+import bz2
+import gzip
+import json
+import lzma
+import os
+import sys
+from datetime import datetime
+
+import pytest
+import zstandard
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE = os.path.join(ROOT, "13-May-2025-800P-1.json")
+PREFIX = " INFO  [pool-1-thread-2] c.v.h.HlcTrace (HlcConnection.java:211): "
+WATCHDOG = "HOST-0001|PLC-1001|{iso}|99|0"
+NOISE = " DEBUG [main] c.v.h.HlcConnection (HlcConnection.java:88): heartbeat ok"
+
+COMPRESSORS = {                     # extension → bytes compressor
+    "gz":  gzip.compress,
+    "bz2": bz2.compress,
+    "xz":  lzma.compress,
+    "zst": lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+def _stamp(t: datetime) -> str:
+    return t.strftime("%Y-%m-%d %H:%M:%S") + f",{t.microsecond // 1000:03d}"
+
+
+@pytest.fixture(scope="session")
+def sample_parcels():
+    with open(SAMPLE, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@pytest.fixture(scope="session")
+def sample_log(sample_parcels, tmp_path_factory):
+    """Every event of the sample as a log line, in timestamp order, with
+    a watchdog and an unrelated line after every 20 parcel lines."""
+    events = sorted(((datetime.fromisoformat(e["ts"]), e["raw"])
+                     for p in sample_parcels for e in p["events"]), key=lambda e: e[0])
+    path = tmp_path_factory.mktemp("sample") / "sample.txt"
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for i, (t, raw) in enumerate(events, 1):
+            fh.write(_stamp(t) + PREFIX + raw + " []\n")
+            if i % 20 == 0:
+                fh.write(_stamp(t) + PREFIX + WATCHDOG.format(iso=t.isoformat()) + " []\n")
+                fh.write(_stamp(t) + NOISE + "\n")
+    return str(path)
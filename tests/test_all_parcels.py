@@ -0,0 +1,83 @@
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parcel_store import build_store
+from views.all_parcels import COLUMNS, FILTERS, MISSING, ParcelTable
+
+
+@pytest.fixture(scope="module")
+def sample_df(sample_log):
+    df = build_store(sample_log).to_dataframe()
+    holes = df.copy()                                   # some of everything unknown
+    for col in ("location", "destination", "hostId", "registeredAt", "barcodes"):
+        holes.loc[holes.index[3::17], col] = None
+    return {"sample": df, "holes": holes}
+
+
+def _plain(df):
+    """The table as the view built it before ParcelTable: display strings, "—" for missing."""
+    return pd.DataFrame({
+        "Time":        df["registeredAt"].dt.strftime("%H:%M:%S"),
+        "status":      df["status"].astype(object),
+        "HOSTID":      df["hostId"],
+        "BARCODES":    df["barcodes"].apply(lambda lst: ", ".join(lst) if lst else MISSING),
+        "LOCATION":    df["location"].astype(object),
+        "DESTINATION": df["destination"].astype(object),
+    }).fillna(MISSING).astype(object)
+
+
+def _selections(table, rnd):
+    options = {name: table.options(name) for name in FILTERS}
+    yield from ({"status": s, "LOCATION": loc, "DESTINATION": "All"}
+                for s, loc in itertools.product(options["status"], options["LOCATION"]))
+    yield from ({"status": "All", "LOCATION": "All", "DESTINATION": d}
+                for d in options["DESTINATION"])
+    for _ in range(200):
+        yield {name: rnd.choice(opts) for name, opts in options.items()}
+
+
+@pytest.mark.parametrize("case", ["sample", "holes"])
+def test_filters_match_a_pandas_filter(sample_df, case):
+    df = sample_df[case]
+    table, plain = ParcelTable(df), _plain(df)
+    assert len(table) == len(df)
+    for name in FILTERS:
+        assert table.options(name) == ["All"] + sorted(plain[name].unique())
+    for sel in _selections(table, random.Random(1)):
+        expected = plain
+        for name, choice in sel.items():
+            if choice != "All":
+                expected = expected[expected[name] == choice]
+        rows = table.rows(sel)
+        np.testing.assert_array_equal(rows, expected.index.to_numpy(), err_msg=str(sel))
+        pd.testing.assert_frame_equal(table.page(rows[:50]), expected.iloc[:50][COLUMNS],
+                                      check_dtype=False)
+
+
+def test_pages_cover_the_result(sample_df):
+    df = sample_df["holes"]
+    table, plain = ParcelTable(df), _plain(df)
+    rows = table.rows({name: "All" for name in FILTERS})
+    size = 100
+    pages = [table.page(rows[start:start + size]) for start in range(0, len(rows), size)]
+    assert all(len(p) == size for p in pages[:-1]) and 0 < len(pages[-1]) <= size
+    pd.testing.assert_frame_equal(pd.concat(pages), plain[COLUMNS], check_dtype=False)
+    assert table.page(rows[:0]).empty
+
+
+def test_updates_match_a_full_build(sample_df):
+    df = sample_df["holes"]
+    table = ParcelTable()
+    table.update(df.iloc[:0])
+    for lo, hi in [(0, 300), (200, 500), (450, len(df)), (10, 20)]:    # overlapping rewrites
+        table.update(df.iloc[lo:hi])
+    full = ParcelTable(df)
+    assert len(table) == len(full)
+    every = {name: "All" for name in FILTERS}
+    pd.testing.assert_frame_equal(table.page(table.rows(every)), full.page(full.rows(every)))
+    for name in FILTERS:
+        assert table.options(name) == full.options(name)
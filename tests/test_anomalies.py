@@ -0,0 +1,141 @@
+from anomalies import (SORT_GAP_MIN_EXCESS_S, SPIKE_MIN_SCANS, SPIKE_WARMUP, STUCK_AFTER_S,
+                       WARMUP, AnomalyDetector)
+from parcel_store import ParcelStore
+
+PREFIX = " INFO  [pool-1-thread-2] c.v.h.HlcTrace (HlcConnection.java:211): "
+T0 = 1_747_122_400_000                              # 2025-05-13 07:46:40 UTC, epoch ms
+STUCK_MS = STUCK_AFTER_S * 1000
+
+
+def _line(s: int, body: str) -> str:
+    m, s = divmod(7 * 3600 + 46 * 60 + 40 + s, 60)
+    h, m = divmod(m, 60)
+    return f"2025-05-13 {h:02d}:{m:02d}:{s:02d},000{PREFIX}{body} []"
+
+
+def register(s, pic):
+    return _line(s, f"PLC-1001|HOST-0001|2025-05-13T07:47:21.000Z|1|{pic}||"
+                    "1001.0023.0001.B71|INF08|2")
+
+
+def deregister(s, pic):
+    return _line(s, f"PLC-1001|HOST-0001|2025-05-13T07:51:19.000Z|7|{pic}|{9000 + pic}|"
+                    "1001.0035.0001.B71|Before_Scanner|1||1001.0017.0001.B71|2")
+
+
+def sort_report(s, pic):
+    return _line(s, f"PLC-1001|HOST-0001|2025-05-13T07:49:20.000Z|6|{pic}|{9000 + pic}|"
+                    "1001.0045.0040.B71|999||16|16;1|1001.0023.0001.B71|2")
+
+
+def _store(lines):
+    store = ParcelStore()
+    for i, line in enumerate(lines):
+        store.feed(i, line)
+    return store
+
+
+def _stuck(det):
+    return [r for r in det.records if r["kind"] == "stuck"]
+
+
+# ── stuck ───────────────────────────────────────────────────────────
+def test_stuck_reports_only_parcels_left_in_flight():
+    store = _store([register(0, 1), register(10, 2), register(20, 3), register(30, 4),
+                    deregister(40, 2), sort_report(50, 3),
+                    register(STUCK_AFTER_S + 25, 5)])   # past 1's deadline, not yet 4's
+    stuck = _stuck(store.anomalies)
+    assert [r["pic"] for r in stuck] == [1]
+    assert stuck[0]["ts"] == T0 + (STUCK_AFTER_S + 25) * 1000
+    assert stuck[0]["value"] == STUCK_AFTER_S + 25
+    assert stuck[0]["location"] == "1001.0023.0001.B71"
+
+    store.feed(99, register(STUCK_AFTER_S + 31, 6))
+    assert [r["pic"] for r in _stuck(store.anomalies)] == [1, 4]
+
+
+def test_stuck_is_reported_without_a_new_line():
+    det = AnomalyDetector()
+    det.feed(1, "ItemRegister", T0, "A")
+    det.feed(2, "ItemRegister", T0 + 1000, "A")
+    det.advance(T0 + STUCK_MS)                          # exactly at the limit: not yet
+    assert not det.records
+    det.advance(T0 + STUCK_MS + 1)
+    assert [r["key"] for r in det.records] == [1]
+    det.advance(T0 + STUCK_MS + 1)                      # reported once
+    det.advance(T0 + 2 * STUCK_MS)
+    assert [r["key"] for r in det.records] == [1, 2]
+    assert not det.in_flight
+
+
+# ── slow sort ───────────────────────────────────────────────────────
+def _sort(det, key, sent_ms, gap_s, location="A"):
+    det.feed(key, "ItemInstruction", sent_ms, location)
+    det.feed(key, "VerifiedSortReport", sent_ms + int(gap_s * 1000), location)
+
+
+def test_slow_sort_after_warmup_only():
+    det = AnomalyDetector()
+    for k in range(WARMUP - 1):
+        _sort(det, k, T0 + k * 10_000, 2 + k % 3 * 0.1)
+    _sort(det, WARMUP, T0 + 300_000, 40)                # last warm-up gap: learnt, not judged
+    assert not det.records
+
+    det = AnomalyDetector()
+    for k in range(WARMUP):
+        _sort(det, k, T0 + k * 10_000, 2 + k % 3 * 0.1)
+    _sort(det, 100, T0 + 400_000, 3)                    # usual
+    _sort(det, 101, T0 + 410_000, 40)                   # slow
+    _sort(det, 102, T0 + 460_000, 40, location="B")     # other location, still warming up
+    slow = [r for r in det.records if r["kind"] == "slow_sort"]
+    assert [(r["key"], r["location"], r["value"]) for r in slow] == [(101, "A", 40)]
+    assert slow[0]["expected"] < 40 - SORT_GAP_MIN_EXCESS_S
+
+
+def test_slow_outlier_does_not_raise_the_baseline():
+    det = AnomalyDetector()
+    for k in range(WARMUP):
+        _sort(det, k, T0 + k * 10_000, 2)
+    for k in range(WARMUP, WARMUP + 5):
+        _sort(det, k, T0 + k * 10_000, 500)
+    assert det.counts["slow_sort"] == 5
+    assert det.gaps["A"].mean < 2 + SORT_GAP_MIN_EXCESS_S + 1
+
+
+def test_sort_without_instruction_or_after_expiry_is_no_gap():
+    det = AnomalyDetector()
+    det.feed(1, "VerifiedSortReport", T0, "A")          # no instruction seen
+    det.feed(2, "ItemInstruction", T0, "A")
+    det.advance(T0 + STUCK_MS + 1)                      # pending instruction dropped
+    det.feed(2, "VerifiedSortReport", T0 + STUCK_MS + 2, "A")
+    assert "A" not in det.gaps and not det.records
+
+
+# ── barcode error spike ─────────────────────────────────────────────
+def _window(det, w, location, scans, errors, window_ms=300_000):
+    start = T0 - T0 % window_ms + w * window_ms
+    for i in range(scans):
+        det.feed(i, "ItemPropertiesUpdate", start + i, location, scan_ok=i >= errors)
+
+
+def test_spike_against_the_location_baseline():
+    det = AnomalyDetector()
+    for w in range(SPIKE_WARMUP):
+        _window(det, w, "A", 20, 1)
+        _window(det, w, "B", 20, 10)                    # B is always bad: no spike
+    _window(det, SPIKE_WARMUP, "A", 20, 8)
+    _window(det, SPIKE_WARMUP, "B", 20, 10)
+    assert not det.records                              # window still open
+    det.finish()
+    spikes = [r for r in det.records if r["kind"] == "barcode_err_spike"]
+    assert [(r["location"], r["value"]) for r in spikes] == [("A", 0.4)]
+    assert spikes[0]["ts"] % 300_000 == 0 and abs(spikes[0]["expected"] - 0.05) < 1e-9
+
+
+def test_spike_needs_enough_scans():
+    det = AnomalyDetector()
+    for w in range(SPIKE_WARMUP):
+        _window(det, w, "A", 20, 0)
+    _window(det, SPIKE_WARMUP, "A", SPIKE_MIN_SCANS - 1, SPIKE_MIN_SCANS - 1)
+    det.finish()
+    assert not det.records
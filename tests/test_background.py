@@ -0,0 +1,40 @@
+import io
+import time
+
+import background
+from background import BackgroundParse
+from parcel_store import build_store
+from parse_cache import ParseCache, content_key
+from views.live import LiveResults
+
+
+def test_partial_results_then_final_store(sample_log, monkeypatch):
+    monkeypatch.setattr(background, "BATCH_LINES", 500)
+    job = BackgroundParse(sample_log).start()
+    results = LiveResults()
+    while (changes := job.snapshot()) is not None:
+        results.update(changes)
+    assert job.finished.wait(10)
+    assert job.error is None
+
+    # the last batch may land after the last snapshot: the dashboard then
+    # switches to the finished store
+    expected = build_store(sample_log)
+    assert len(results.table) <= len(expected)
+    assert job.store.to_dataframe().equals(expected.to_dataframe())
+    assert job.store.touched is None                # nothing left tracking the rows
+
+
+def test_cancel_does_not_wait(sample_log, tmp_path, monkeypatch):
+    monkeypatch.setattr(background, "BATCH_LINES", 100)
+    data = open(sample_log, "rb").read()
+    cache = ParseCache(str(tmp_path))
+    job = BackgroundParse(io.BytesIO(data), cache).start()
+    while job.lines == 0 and not job.done:
+        time.sleep(0.001)
+    tic = time.perf_counter()
+    job.cancel()
+    assert time.perf_counter() - tic < 0.05
+    assert job.finished.wait(10)
+    assert job.error is None
+    assert cache.get(content_key(io.BytesIO(data))) is None     # a cancelled parse is not cached
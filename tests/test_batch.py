@@ -0,0 +1,77 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import batch
+
+
+def _key(parcel):
+    return parcel["pic"], parcel["events"][0]["ts"]
+
+
+def _run(paths, tmp_path):
+    out = tmp_path / "out.jsonl"
+    batch.run([str(p) for p in paths], str(out), workers=1)
+    with open(out, encoding="utf-8") as fh:
+        return sorted((json.loads(line) for line in fh), key=_key)
+
+
+@pytest.mark.parametrize("fraction", [0.25, 0.5, 0.8])
+def test_split_files_match_single_pass(sample_log, tmp_path, fraction):
+    with open(sample_log, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    cut = int(len(lines) * fraction)
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("".join(lines[:cut]), encoding="utf-8")
+    b.write_text("".join(lines[cut:]), encoding="utf-8")
+
+    single = _run([sample_log], tmp_path)
+    split = _run([b, a], tmp_path)                 # ordered by first timestamp, not name
+    assert len(split) == len(single)
+    assert split == single
+
+
+def test_late_sort_report_joins_deregistered_parcel():
+    # PIC 730 is deregistered at the end of one file; its sort report is in the next
+    ts = "2025-05-13T08:00:00"
+    closed = {"pic": 730, "hostId": "1", "barcodes": [], "location": "", "destination": "",
+              "lifeCycle": {"registeredAt": ts, "closedAt": "2025-05-13T08:01:00",
+                            "status": "deregistered"},
+              "barcodeErr": False,
+              "events": [{"ts": ts, "type": "ItemRegister", "raw": "P|H|x|1|730||L|C|2"},
+                         {"ts": "2025-05-13T08:01:00", "type": "ItemDeRegister",
+                          "raw": "P|H|x|4|730|1"}]}
+    late = {"pic": 730, "hostId": "", "barcodes": [], "location": "", "destination": "",
+            "lifeCycle": {"registeredAt": None, "closedAt": None, "status": "sorted"},
+            "barcodeErr": False,
+            "events": [{"ts": "2025-05-13T08:02:00", "type": "VerifiedSortReport",
+                        "raw": "P|H|x|6|730|1"}]}
+    carry = {}
+    assert batch.correlate(carry, [closed]) == []
+    assert batch.correlate(carry, [late], "2025-05-13T08:02:00") == []
+    assert carry[730] is closed
+    assert [ev["type"] for ev in closed["events"]][-1] == "VerifiedSortReport"
+
+
+def test_in_order_bounds_outstanding_results():
+    outstanding, peak = [0], [0]
+
+    def work(i):
+        return i * i
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            outstanding[0] += 1
+            peak[0] = max(peak[0], outstanding[0])
+            return super().submit(fn, *args)
+
+    with Pool(max_workers=3) as pool:
+        results = []
+        for r in batch.in_order(pool, work, range(20), window=3):
+            outstanding[0] -= 1
+            time.sleep(0.001)                   # the caller is slower than the workers
+            results.append(r)
+    assert results == [i * i for i in range(20)]
+    assert peak[0] <= 4                         # the window plus the one being consumed
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import hlc_core
+from hlc_core import ID_MAP, LOG_TS, RAW_BODY, iso_millis, tokenize, ts_millis
+from hlc_parser import parse_log
+
+PREFIX = ("2025-05-13 07:49:18,{ms} INFO  [pool-1-thread-2] "
+          "c.v.h.HlcTrace (HlcConnection.java:211): ")
+BODY = "PLC-1001|HOST-0001|2025-05-13T07:49:18|1|1234||1001.0023.0001.B71|INF08|2"
+
+
+def legacy(line):
+    """The per-line regex / strptime loop tokenize() replaced."""
+    ts_m, body_m = LOG_TS.search(line), RAW_BODY.search(line)
+    if not (ts_m and body_m):
+        return None
+    ts_iso = datetime.strptime(
+        f"{ts_m.group(1)}.{ts_m.group(2)}", "%Y-%m-%d %H:%M:%S.%f"
+    ).isoformat()
+    parts = body_m.group(1).strip().split("|")
+    if len(parts) < 5 or ID_MAP.get(parts[3], "").startswith("Watchdog"):
+        return None
+    try:
+        pic = int(parts[4])
+    except ValueError:
+        return None
+    return ts_iso, pic, "|".join(parts), parts
+
+
+@pytest.mark.parametrize("line", [
+    PREFIX.format(ms="000") + BODY + " []",                       # isoformat drops ".000000"
+    PREFIX.format(ms="123") + BODY + " []",
+    PREFIX.format(ms="123") + "  " + BODY + "  []",              # padded body
+    PREFIX.format(ms="12x") + BODY + " []",                       # malformed milliseconds
+    "2025-05-13 7:49:18,123" + PREFIX[23:] + BODY + " []",        # malformed time
+    "13-05-2025 07:49:18,123" + PREFIX[23:] + BODY + " []",
+    PREFIX.format(ms="123") + "[]",                               # "): []", no body
+    PREFIX.format(ms="123")[:-1] + "[]",
+    PREFIX.format(ms="123") + "HOST-0001|PLC-1001|2025-05-13T07:49:18|99|0 []",   # watchdog
+    PREFIX.format(ms="123") + "PLC-1001|HOST-0001|2025-05-13T07:49:18|98|0 []",
+    "2025-05-13 07:49:18,123 DEBUG [main] c.v.h.HlcConnection (HlcConnection.java:88): "
+    "heartbeat ok",                                               # not a message line
+    PREFIX.format(ms="123") + "PLC-1001|HOST-0001|x|1|12a4 []",   # non-int PIC
+    PREFIX.format(ms="123") + "PLC-1001|HOST-0001|x|1 []",        # too few fields
+    PREFIX.format(ms="123") + "PLC-1001|HOST-0001|x|4|77|a []",   # unknown type
+    "",
+])
+def test_tokenize_matches_legacy_loop(line):
+    assert tokenize(line) == legacy(line)
+    if tokenize(line) is not None:
+        assert iso_millis(tokenize(line)[0]) == ts_millis(line)
+
+
+def test_impossible_date_is_rejected():
+    # the legacy loop raised on this (strptime ValueError); now it is skipped
+    assert tokenize("2025-02-30 07:49:18,123" + PREFIX[23:] + BODY + " []") is None
+
+
+def test_tokenize_matches_legacy_across_cache_clears(monkeypatch):
+    monkeypatch.setattr(hlc_core, "_SEC_CACHE", {})
+    t0 = datetime(2025, 5, 13, 7, 0, 0)
+    for i in range(3 * hlc_core._SEC_CACHE_MAX):
+        t = t0 + timedelta(milliseconds=i * 1001)
+        line = (t.strftime("%Y-%m-%d %H:%M:%S") + f",{t.microsecond // 1000:03d}"
+                + PREFIX[23:] + BODY + " []")
+        assert tokenize(line) == legacy(line)
+        assert len(hlc_core._SEC_CACHE) <= hlc_core._SEC_CACHE_MAX
+    # a second cached before the last clear is recomputed
+    line = PREFIX.format(ms="000") + BODY + " []"
+    assert tokenize(line) == legacy(line)
+
+
+def test_sample_lines_match_legacy_loop(sample_log):
+    with open(sample_log, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    assert [tokenize(line) for line in lines] == [legacy(line) for line in lines]
+
+
+def test_parse_survives_timestamp_cache_clears(sample_log, monkeypatch):
+    # another parser in the process may clear the shared cache between
+    # tokenize() and the parse loop's timestamp lookup
+    with open(sample_log, encoding="utf-8") as fh:
+        text = fh.read()
+    expected = parse_log(text)
+    tokenize = hlc_core.tokenize
+
+    def tokenize_then_clear(line):
+        tok = tokenize(line)
+        hlc_core._SEC_CACHE.clear()
+        return tok
+
+    monkeypatch.setattr(hlc_core, "tokenize", tokenize_then_clear)
+    assert expected and parse_log(text) == expected
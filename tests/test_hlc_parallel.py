@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+import hlc_parallel
+from hlc_parallel import generation_order, merge_partials, parse_file_parallel
+from hlc_parser import _parse_lines, parse_stream
+
+
+@pytest.fixture(scope="module")
+def sequential(sample_log):
+    return list(parse_stream(sample_log, evict=False))
+
+
+def test_parallel_matches_sequential(sample_log, sequential, monkeypatch):
+    monkeypatch.setattr(hlc_parallel, "MIN_RANGE", 1 << 16)     # split the small sample
+    parallel = parse_file_parallel(sample_log, workers=4)
+    assert len(parallel) == len(sequential)
+    assert generation_order(parallel) == generation_order(sequential)
+
+
+def test_any_split_merges_to_sequential(sample_log, sequential):
+    with open(sample_log, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    rnd = random.Random(3)
+    for _ in range(30):
+        cuts = sorted(rnd.sample(range(1, len(lines)), rnd.randint(1, 6)))
+        ranges = zip([0] + cuts, cuts + [len(lines)])
+        merged = merge_partials(list(_parse_lines(iter(lines[a:b]))) for a, b in ranges)
+        assert generation_order(merged) == generation_order(sequential), cuts
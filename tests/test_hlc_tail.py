@@ -0,0 +1,147 @@
+import gc
+import os
+import threading
+import time
+
+import pytest
+
+from hlc_parser import iter_lines
+from hlc_tail import FollowReader, LiveParser, LiveTail, live_path
+from parcel_store import build_store
+from views.all_parcels import ParcelTable
+from views.live import LiveResults
+
+ALL = {"status": "All", "LOCATION": "All", "DESTINATION": "All"}
+
+
+def _wait(cond, timeout=20.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.02)
+
+
+def test_incremental_snapshots_match_full_parse(sample_log, tmp_path):
+    with open(sample_log, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    path = tmp_path / "live.log"
+    path.write_text("")
+    tail = LiveTail(str(path), open_timeout_s=10 * 3600, poll_s=0.01).start()
+    results = LiveResults()
+    try:
+        step = len(lines) // 7 + 1
+        for i in range(0, len(lines), step):
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.writelines(lines[i:i + step])
+            _wait(lambda: tail.lines == min(i + step, len(lines)))
+            results.update(tail.snapshot())
+            rows, _, anomalies = tail.snapshot()        # nothing new since the last one
+            assert len(rows) == 0 and len(anomalies.records) == 0
+    finally:
+        tail.stop()
+
+    full = build_store(sample_log)
+    expected = ParcelTable(full.to_dataframe())
+    assert len(results.table) == len(expected)
+    assert results.table.page(results.table.rows(ALL)).equals(expected.page(expected.rows(ALL)))
+    assert results.kpis.total == full.kpis.total
+    assert len(results.anomalies) == len(full.anomalies)
+
+
+def test_follow_reader_survives_truncation_and_rotation(tmp_path):
+    path = tmp_path / "live.log"
+    path.write_text("")
+    stop = threading.Event()
+    reader = FollowReader(str(path), stop, poll_s=0.01)
+    seen = []
+
+    def follow():
+        for line in iter_lines(reader):
+            seen.append(line)
+
+    thread = threading.Thread(target=follow, daemon=True)
+    thread.start()
+
+    def append(text, name=path):
+        with open(name, "a", encoding="utf-8") as fh:
+            fh.write(text)
+
+    try:
+        append("a1\na2\n")
+        append("a3\n")
+        _wait(lambda: seen == ["a1", "a2", "a3"])
+
+        append("half")                                  # a line still being written
+        _wait(lambda: reader._last == b"f")
+        path.write_text("")                             # copytruncate
+        _wait(lambda: reader.rotations == 1)
+        append("b1\nb2\n")
+        _wait(lambda: seen[3:] == ["half", "b1", "b2"])
+
+        os.rename(path, tmp_path / "live.log.1")        # rename and recreate
+        append("c1\nc2\n")
+        _wait(lambda: reader.rotations == 2)
+        append("c3\n")
+        _wait(lambda: seen[6:] == ["c1", "c2", "c3"])
+    finally:
+        stop.set()
+        thread.join(5)
+    assert seen == ["a1", "a2", "a3", "half", "b1", "b2", "c1", "c2", "c3"]
+
+
+REGISTER = ("2025-05-13 07:46:40,304 INFO  [pool-1-thread-2] c.v.h.HlcTrace "
+            "(HlcConnection.java:211): PLC-1001|HOST-0001|2025-05-13T07:47:21.000Z|1|460||"
+            "1001.0023.0001.B71|INF08|2 []\n")
+
+
+def test_idle_parser_reports_stuck_parcels():
+    parser = LiveParser()
+    parser.idle()                                       # nothing seen yet
+    parser.feed(0, REGISTER.rstrip("\n"))
+    stuck_s = parser.store.anomalies.stuck_ms / 1000
+    parser.idle(parser.last_wall + stuck_s)
+    assert not parser.store.anomalies.records
+    parser.idle(parser.last_wall + stuck_s + 1)
+    assert [r["pic"] for r in parser.store.anomalies.records] == [460]
+    assert parser.open_count == 1                       # open parcels wait for real lines
+
+
+def test_quiet_live_log_still_reports_stuck_parcels(tmp_path):
+    path = tmp_path / "live.log"
+    path.write_text(REGISTER)
+    tail = LiveTail(str(path), poll_s=0.01)
+    tail.parser.store.anomalies.stuck_ms = 50
+    tail.start()
+    try:
+        found = []
+
+        def stuck():
+            found.extend(tail.snapshot()[2].records)
+            return found
+
+        _wait(stuck)
+    finally:
+        tail.stop()
+    assert [(r["kind"], r["pic"]) for r in found] == [("stuck", 460)]
+
+
+def test_dropped_tail_stops_its_thread(tmp_path):
+    path = tmp_path / "live.log"
+    path.write_text("")
+    tail = LiveTail(str(path), poll_s=0.01).start()
+    thread = tail._thread
+    del tail
+    gc.collect()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_live_path_stays_inside_the_directory(tmp_path):
+    (tmp_path / "hlc.log").write_text("")
+    os.symlink("/etc/hostname", tmp_path / "escape.log")
+    assert live_path("hlc.log", str(tmp_path)) == os.path.realpath(tmp_path / "hlc.log")
+    for name in ("../hlc.log", "/etc/hostname", "escape.log", "."):
+        with pytest.raises(ValueError):
+            live_path(name, str(tmp_path))
+    with pytest.raises(ValueError):
+        live_path("hlc.log", "")
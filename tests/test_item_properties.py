@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+from item_properties import VOLUME_FIELDS, decode_properties
+
+HEAD = "PLC-1001|HOST-0001|2025-05-13T07:49:18|2|77|H1|1001.0041.0091|1001.41.91".split("|")
+
+
+def _parts(p8, p9, readings):
+    dims = ";".join(["6", "0101", *readings, "-831", "mm"])
+    return HEAD + [p8, p9, "124", "0000", dims]
+
+
+def legacy(parts):
+    """Per-line decoding as JK.py did it before item_properties → (volume, err, barcodes)."""
+    volume = {name: math.nan for name in VOLUME_FIELDS}
+    barcodes = []
+
+    def add(field):
+        for pb in (field or "").split("@"):
+            if pb.startswith("0]C"):
+                barcodes.append(pb)
+
+    add(parts[8] if len(parts) >= 9 else None)
+    err = False
+    if len(parts) >= 10:
+        semis = parts[9].split(";")
+        if len(semis) >= 3:
+            add(semis[2])
+        err = semis[0] != "6"
+    if len(parts) >= 13:
+        semis = parts[12].split(";")
+        if len(semis) >= 7:
+            for name, pos in VOLUME_FIELDS.items():
+                try:
+                    volume[name] = float(semis[pos])
+                except ValueError:
+                    pass
+    return volume, err, barcodes
+
+
+CLEAN = [
+    _parts("00000783320250513074918", "6;0101;0]C05900056383516;1100",
+           ["300", "295", "200", "0017700", "16745.5"]),
+    _parts("0]C111@0]C222@x", "5;0101;0]C333", ["1e3", " 2.5 ", "-inf", "inf", "nan"]),
+    _parts("", "6;0101;", ["Infinity", "NaN", "+.5", "5.", "-0"]),
+    HEAD + ["0]C444"],                                          # too short for the rest
+]
+JUNK = [_parts("", "6", ["abc", "1.2.3", "", "12x", "e5"])]
+
+
+def _decoded(lines):
+    fields, barcodes = decode_properties([p[8] if len(p) > 8 else None for p in lines],
+                                         [p[9] if len(p) > 9 else None for p in lines],
+                                         [p[12] if len(p) > 12 else None for p in lines])
+    return fields, barcodes
+
+
+@pytest.mark.parametrize("lines", [CLEAN, CLEAN + JUNK, JUNK + CLEAN],
+                         ids=["clean", "junk-last", "junk-first"])
+def test_decode_properties_matches_per_line_decoder(lines):
+    fields, barcodes = _decoded(lines)
+    for i, parts in enumerate(lines):
+        volume, err, codes = legacy(parts)
+        np.testing.assert_array_equal(fields.loc[i, list(VOLUME_FIELDS)].to_numpy(float),
+                                      np.array(list(volume.values())), err_msg=f"line {i}")
+        assert fields.loc[i, "barcode_err"] == err
+        assert barcodes.loc[barcodes["line"] == i, "barcode"].tolist() == codes
+
+
+def test_inf_and_nan_do_not_depend_on_the_batch():
+    clean, _ = _decoded(CLEAN)
+    mixed, _ = _decoded(CLEAN + JUNK)
+    np.testing.assert_array_equal(clean.to_numpy(float), mixed.iloc[:len(CLEAN)].to_numpy(float))
+    assert np.isinf(clean.loc[1, "box_volume"]) and np.isinf(clean.loc[2, "length"])
@@ -0,0 +1,13 @@
+from lifecycle_json import load_store
+from parse_cache import store_to_tables, tables_to_store
+
+from conftest import SAMPLE
+
+
+def test_load_store_keeps_direction_and_raw(sample_parcels):
+    store = load_store(SAMPLE)
+    expected = sample_parcels[0]["events"]
+    for loaded in (store, tables_to_store(store_to_tables(store))):
+        ev = loaded.events_for(0, raw=True)
+        assert ev["direction"].tolist() == [e["direction"] for e in expected]
+        assert ev["raw"].tolist() == [e["raw"] for e in expected]
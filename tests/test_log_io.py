@@ -0,0 +1,59 @@
+import io
+import os
+import threading
+
+import pytest
+
+from hlc_parser import parse_log, parse_stream
+from log_io import open_log
+
+from conftest import COMPRESSORS
+
+
+def _pipe(data: bytes):
+    # an unbuffered read end: no peek(), not seekable
+    r, w = os.pipe()
+
+    def write():
+        with os.fdopen(w, "wb") as fh:
+            fh.write(data)
+
+    threading.Thread(target=write, daemon=True).start()
+    return os.fdopen(r, "rb", buffering=0)
+
+
+def _source(kind, data, tmp_path):
+    if kind == "path":
+        path = tmp_path / "log"
+        path.write_bytes(data)
+        return str(path)
+    if kind == "bytesio":
+        return io.BytesIO(data)
+    return _pipe(data)
+
+
+@pytest.fixture(scope="module")
+def plain(sample_log):
+    with open(sample_log, "rb") as fh:
+        return fh.read()
+
+
+@pytest.fixture(scope="module")
+def expected(plain):
+    return parse_log(plain.decode("utf-8"))
+
+
+@pytest.mark.parametrize("ext", [None, *COMPRESSORS])
+@pytest.mark.parametrize("kind", ["path", "bytesio", "pipe"])
+def test_parse_stream_decompresses(plain, expected, tmp_path, ext, kind):
+    data = COMPRESSORS[ext](plain) if ext else plain
+    source = _source(kind, data, tmp_path)
+    assert list(parse_stream(source, evict=False)) == expected
+    if kind != "path":
+        assert not source.closed                    # a caller's file object stays open
+
+
+@pytest.mark.parametrize("ext", COMPRESSORS)
+def test_unthreaded_pipe_is_decompressed(plain, ext):
+    with open_log(_pipe(COMPRESSORS[ext](plain)), threaded=False) as fh:
+        assert fh.read() == plain
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+from metrics import MINUTE_MS, QuantileSketch, Throughput
+from parcel_store import build_store
+
+QS = [0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1]
+
+
+def _json(d):
+    return json.loads(json.dumps(d))                    # as parse_cache stores it
+
+
+def _assert_within(sketch, values, alpha):
+    for q in QS:
+        # the sketch answers the value at rank ⌊q·(n−1)⌋, numpy's "lower" method
+        exact = np.quantile(values, q, method="lower")
+        got = sketch.quantile(q)
+        assert abs(got - exact) <= alpha * abs(exact) * (1 + 1e-9), (q, got, exact)
+
+
+@pytest.mark.parametrize("alpha", [0.01, 0.05])
+@pytest.mark.parametrize("dist", ["lognormal", "uniform", "mixed-sign", "few"])
+def test_quantiles_within_relative_error(alpha, dist):
+    rng = np.random.default_rng(3)
+    values = {"lognormal": rng.lognormal(4, 1.5, 20_000),
+              "uniform": rng.uniform(0.001, 1e6, 20_000),
+              "mixed-sign": np.concatenate([rng.normal(0, 50, 5_000), np.zeros(300)]),
+              "few": np.array([7.0, 0.5, 1234.5])}[dist]
+    sketch = QuantileSketch(alpha)
+    for v in values:
+        sketch.add(float(v))
+    assert sketch.count == len(values)
+    _assert_within(sketch, values, alpha)
+
+
+def test_remove_and_merge_keep_the_guarantee():
+    rng = np.random.default_rng(5)
+    values = rng.lognormal(3, 1, 4_000)
+    a, b = QuantileSketch(), QuantileSketch()
+    for v in values[:2_000]:
+        a.add(float(v))
+    for v in values[2_000:]:
+        b.add(float(v))
+    for v in values[:500]:                              # e.g. closedAt overwritten
+        a.remove(float(v))
+    a.merge(b)
+    _assert_within(a, values[500:], a.alpha)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_sketch_round_trip():
+    rng = np.random.default_rng(9)
+    sketch = QuantileSketch(0.02)
+    for v in np.concatenate([rng.normal(0, 100, 3_000), np.zeros(10)]):
+        sketch.add(float(v))
+    for v in (1.0, 2.0):                                # leaves empty buckets behind
+        sketch.add(v)
+        sketch.remove(v)
+    restored = QuantileSketch.from_dict(_json(sketch.to_dict()))
+    assert (restored.alpha, restored.count, restored.zero) == (0.02, sketch.count, sketch.zero)
+    assert +restored.pos == +sketch.pos and +restored.neg == +sketch.neg
+    assert [restored.quantile(q) for q in QS] == [sketch.quantile(q) for q in QS]
+    assert QuantileSketch.from_dict(_json(QuantileSketch().to_dict())).count == 0
+
+
+def test_throughput_round_trip():
+    t = Throughput()
+    t.on_registered(5 * MINUTE_MS + 1, "A")
+    t.on_registered(5 * MINUTE_MS + 2, "A")
+    t.on_registered(65 * MINUTE_MS, None)              # no location known
+    t.on_closed(6 * MINUTE_MS, "A", "D1")
+    t.on_closed(6 * MINUTE_MS, "A", None)
+    restored = Throughput.from_dict(_json(t.to_dict()))
+    assert restored.registered == t.registered and restored.closed == t.closed
+    for kind, by in [("registered", "location"), ("closed", "destination"), ("closed", None)]:
+        for freq in ("min", "h"):
+            assert restored.frame(kind, freq, by).equals(t.frame(kind, freq, by))
+
+
+def test_store_kpis_round_trip(sample_log):
+    kpis = build_store(sample_log).kpis
+    restored = type(kpis).from_dict(_json(kpis.to_dict()))
+    assert restored.throughput.registered == kpis.throughput.registered
+    assert restored.throughput.closed == kpis.throughput.closed
+    assert [restored.cycle_quantile(q) for q in QS] == [kpis.cycle_quantile(q) for q in QS]
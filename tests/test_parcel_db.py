@@ -0,0 +1,67 @@
+import io
+import shutil
+
+import parse_cache
+from parcel_db import ParcelDB
+from parcel_store import build_store
+
+
+def _counts(db):
+    files = db.query("SELECT COUNT(*) AS n FROM files")["n"][0]
+    parcels = db.query("SELECT COUNT(*) AS n FROM parcels")["n"][0]
+    events = db.query("SELECT COUNT(*) AS n FROM events")["n"][0]
+    return files, parcels, events
+
+
+def test_ingest_skips_replaces_and_reingests(sample_log, tmp_path, monkeypatch):
+    log = tmp_path / "a.txt"
+    with open(sample_log, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    half = len(lines) // 2
+    log.write_text("".join(lines[:half]), encoding="utf-8")
+
+    with ParcelDB(str(tmp_path / "p.db")) as db:
+        n = db.ingest(str(log))
+        assert n == len(build_store(str(log))) > 0
+        stored = _counts(db)
+
+        assert db.ingest(str(log)) == 0                         # unchanged: skipped
+        assert _counts(db) == stored
+
+        copy = tmp_path / "copy-of-a.txt"                       # same content, other path
+        shutil.copy(log, copy)
+        assert db.ingest(str(copy)) == 0
+        assert _counts(db) == stored
+
+        log.write_text("".join(lines), encoding="utf-8")        # the log grew: replaced
+        full = build_store(str(log))
+        assert db.ingest(str(log)) == len(full)
+        assert _counts(db) == (1, len(full), len(full.ev_row))
+
+        # the copy now holds content stored nowhere else
+        assert db.ingest(str(copy)) == n
+        assert _counts(db)[0] == 2
+
+        # a copy of the grown log drops the copy's stale rows
+        shutil.copy(log, copy)
+        assert db.ingest(str(copy)) == 0
+        assert _counts(db) == (1, len(full), len(full.ev_row))
+
+        # a parser upgrade changes every content key: re-ingested once
+        monkeypatch.setattr(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + 1)
+        assert db.ingest(str(log)) == len(full)
+        assert db.ingest(str(copy)) == 0
+        assert _counts(db) == (1, len(full), len(full.ev_row))
+
+
+def test_ingest_many_stores_each_content_once(sample_log, tmp_path):
+    paths = []
+    for name in ("a.txt", "b.txt", "c.txt"):
+        shutil.copy(sample_log, tmp_path / name)
+        paths.append(str(tmp_path / name))
+
+    with ParcelDB(str(tmp_path / "p.db")) as db:
+        totals = db.ingest_many(paths, workers=1, out=io.StringIO())
+        assert totals["skipped"] == 2
+        assert _counts(db)[:2] == (1, len(build_store(sample_log)))
+        assert db.ingest_many(paths, workers=1, out=io.StringIO())["parcels"] == 0
@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from hlc_parser import parse_log
+from parcel_identity import ParcelIdentity
+from parcel_store import build_store
+
+
+def _host_ids(parcel):
+    return {e["raw"].split("|")[5] for e in parcel["events"]
+            if e["type"] == "ItemInstruction" and e["raw"].split("|")[5]}
+
+
+def test_reregistered_pic_starts_new_generation():
+    identity = ParcelIdentity(lambda pic: object())
+    first = identity.resolve(7, "ItemRegister", 0)
+    assert identity.resolve(7, "ItemInstruction", 10) is first
+    second = identity.resolve(7, "ItemRegister", 20)        # no ItemDeRegister in between
+    assert second is not first
+    assert identity.resolve(7, "VerifiedSortReport", 30) is second
+
+
+def test_register_after_leading_lines_joins_them():
+    # a log that starts mid‑parcel: the first ItemRegister is not a reuse
+    identity = ParcelIdentity(lambda pic: object())
+    first = identity.resolve(7, "ItemInstruction", 0)
+    assert identity.resolve(7, "ItemRegister", 10) is first
+
+
+def test_recycled_pics_keep_both_host_ids(sample_parcels, sample_log):
+    recycled = {p["pic"]: _host_ids(p) for p in sample_parcels
+                if sum(e["type"] == "ItemRegister" for e in p["events"]) > 1}
+    assert recycled
+
+    with open(sample_log, encoding="utf-8") as fh:
+        parcels = parse_log(fh.read())
+    parsed = defaultdict(list)
+    for p in parcels:
+        parsed[p["pic"]].append(p["hostId"])
+
+    df = build_store(sample_log).to_dataframe()
+    stored = df.groupby("pic")["hostId"].apply(list)
+
+    for pic, hosts in recycled.items():
+        assert len(hosts) == 2
+        assert sorted(parsed[pic]) == sorted(hosts)
+        assert sorted(stored[pic]) == sorted(hosts)
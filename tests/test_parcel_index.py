@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from parcel_index import KINDS, ParcelIndex
+from parcel_store import build_store
+
+BARCODES = ["", "0", "0]C0001", "0]C0001", "0]C00010", "0]C0002", "0]C9", "0]D10001",
+            "10001", "ü01", "zz"]
+
+
+def _build(entries, split=None):
+    """Index over (kind, key, row) entries, flushed in two batches if `split`."""
+    index = ParcelIndex()
+    for i, (kind, key, row) in enumerate(entries):
+        if i == split:
+            for k in KINDS:
+                index.lookup(k, "" if k != "pic" else 0)
+        index.add(kind, key, row)
+    return index
+
+
+def _brute(entries, kind, match):
+    return np.array(sorted({row for k, key, row in entries if k == kind and match(key)}),
+                    dtype=np.int32)
+
+
+def _entries(seed=7):
+    rnd = random.Random(seed)
+    entries = [("barcode", bc, row) for row, bc in enumerate(BARCODES)]
+    entries += [("barcode", rnd.choice(BARCODES), rnd.randrange(40)) for _ in range(60)]
+    entries += [("hostId", f"{rnd.randrange(300):04d}", rnd.randrange(40)) for _ in range(60)]
+    entries += [("pic", rnd.randrange(-2, 1000), row) for row in range(40)]
+    rnd.shuffle(entries)
+    return entries
+
+
+QUERIES = sorted(set(BARCODES + ["0]C", "0]C000", "1", "01", "001", "00", "!", "~", "zzz",
+                                 "\U0010ffff", "000", "00010", "01"]))
+
+
+@pytest.mark.parametrize("split", [None, 50], ids=["one-batch", "two-batches"])
+def test_lookups_match_a_scan(split):
+    entries = _entries()
+    index = _build(entries, split)
+    hosts = sorted({key for kind, key, _ in entries if kind == "hostId"})
+    for q in QUERIES + hosts[:1] + hosts[-1:] + ["0000", "9999"]:
+        for kind in ("barcode", "hostId"):
+            np.testing.assert_array_equal(index.lookup(kind, q),
+                                          _brute(entries, kind, lambda k: k == q))
+            expected = (_brute(entries, kind, lambda k: k.startswith(q)) if q
+                        else np.empty(0, np.int32))     # an empty query matches nothing
+            np.testing.assert_array_equal(index.prefix(kind, q), expected, err_msg=repr(q))
+        expected = (_brute(entries, "barcode", lambda k: k.endswith(q)) if q
+                    else np.empty(0, np.int32))
+        np.testing.assert_array_equal(index.suffix("barcode", q), expected, err_msg=repr(q))
+    pics = sorted({key for kind, key, _ in entries if kind == "pic"})
+    for q in [pics[0] - 1, pics[0], pics[-1], pics[-1] + 1, 500]:
+        np.testing.assert_array_equal(index.lookup("pic", q),
+                                      _brute(entries, "pic", lambda k: k == q))
+
+
+def test_empty_index():
+    index = ParcelIndex()
+    assert len(index.lookup("pic", 1)) == 0
+    assert len(index.prefix("hostId", "1")) == 0 and len(index.suffix("barcode", "1")) == 0
+    restored = ParcelIndex.from_tables(index.to_tables())
+    assert len(restored.lookup("barcode", "")) == 0
+    restored.add("barcode", "0]C1", 3)                  # still growable after a reload
+    assert restored.suffix("barcode", "C1").tolist() == [3]
+
+
+def test_tables_round_trip():
+    entries = _entries(11)
+    index = _build(entries)
+    restored = ParcelIndex.from_tables(index.to_tables())
+    for q in QUERIES:
+        for kind in ("barcode", "hostId"):
+            np.testing.assert_array_equal(restored.lookup(kind, q), index.lookup(kind, q))
+            np.testing.assert_array_equal(restored.prefix(kind, q), index.prefix(kind, q))
+        np.testing.assert_array_equal(restored.suffix("barcode", q), index.suffix("barcode", q))
+    for q in range(-3, 1001):
+        np.testing.assert_array_equal(restored.lookup("pic", q), index.lookup("pic", q))
+
+    restored.add("barcode", "0]C0001", 99)              # merges into the loaded arrays
+    assert 99 in restored.lookup("barcode", "0]C0001")
+    assert 99 in restored.suffix("barcode", "0001") and 99 in restored.prefix("barcode", "0]")
+
+
+def test_store_index_matches_its_table(sample_log):
+    store = build_store(sample_log)
+    df = store.to_dataframe()
+    for pic in df["pic"].drop_duplicates().sample(50, random_state=1):
+        assert store.index.lookup("pic", pic).tolist() == df.index[df["pic"] == pic].tolist()
+    codes = [(row, bc) for row, bcs in zip(df.index, df["barcodes"]) for bc in bcs or ()]
+    for _, bc in codes[::25]:
+        tail = bc[-5:]
+        expected = sorted({row for row, b in codes if b.endswith(tail)})
+        assert store.index.suffix("barcode", tail).tolist() == expected
@@ -0,0 +1,99 @@
+import io
+
+import pandas as pd
+import pytest
+
+from hlc_core import iso_millis
+from hlc_parser import parse_log, parse_stream
+import log_io
+from lifecycle_json import load_store
+from log_io import LogView
+from parcel_store import build_store
+
+from conftest import COMPRESSORS, SAMPLE
+
+
+def _ms(iso):
+    return None if iso is None else iso_millis(iso)
+
+
+def _ts(value):
+    return None if pd.isna(value) else value.value // 1_000_000
+
+
+def test_store_matches_parse_stream(sample_log):
+    store = build_store(sample_log)
+    parcels = list(parse_stream(sample_log, evict=False))
+    df = store.to_dataframe()
+    assert len(df) == len(parcels)
+    for row, (rec, p) in enumerate(zip(df.itertuples(index=False), parcels)):
+        lc = p["lifeCycle"]
+        assert rec.pic == p["pic"]
+        assert rec.hostId == p["hostId"]
+        assert rec.barcodes == p["barcodes"]
+        assert (None if pd.isna(rec.location) else rec.location) == p["location"]
+        assert (None if pd.isna(rec.destination) else rec.destination) == p["destination"]
+        assert rec.status == lc["status"]
+        assert _ts(rec.registeredAt) == _ms(lc["registeredAt"])
+        assert _ts(rec.closedAt) == _ms(lc["closedAt"])
+        assert rec.barcodeErr == p["barcodeErr"]
+        ev = store.events_for(row)
+        assert ev["type"].tolist() == [e["type"] for e in p["events"]]
+        assert [_ts(t) for t in ev["ts"]] == [_ms(e["ts"]) for e in p["events"]]
+
+
+def test_direction_spelled_like_imports(sample_log):
+    raw = build_store(sample_log)
+    imported = load_store(SAMPLE)
+    spelled = set()
+    for store in (raw, imported):
+        for row in range(0, len(store), 25):
+            spelled |= set(store.events_for(row, raw=True)["direction"])
+    assert spelled == {"PLC→HOST", "HOST→PLC"}
+
+
+@pytest.mark.parametrize("variant", ["plain", "crlf", "bytesio", "gz", "zst", "xz-bytesio"])
+def test_events_read_back_like_parse_log(sample_log, tmp_path, variant):
+    with open(sample_log, "rb") as fh:
+        data = fh.read()
+    if variant == "crlf":
+        data = data.replace(b"\n", b"\r\n")
+    expected = parse_log(data.decode("utf-8"))
+    ext = variant.split("-")[0]
+    if ext in COMPRESSORS:
+        data = COMPRESSORS[ext](data)
+    if variant.endswith("bytesio"):
+        source = io.BytesIO(data)
+    else:
+        source = tmp_path / "log"
+        source.write_bytes(data)
+        source = str(source)
+
+    store = build_store(source)
+    assert len(store) == len(expected)
+    rows = sorted({*range(0, len(store), 9), len(store) - 1})    # include the last lines
+    for row in rows:
+        ev = store.events_for(row, raw=True)
+        events = expected[row]["events"]
+        assert ev["raw"].tolist() == [e["raw"] for e in events]
+        assert ev["type"].tolist() == [e["type"] for e in events]
+        assert ev["direction"].tolist() == [
+            "PLC→HOST" if e["raw"].startswith("PLC") else "HOST→PLC" for e in events]
+
+
+@pytest.mark.parametrize("ext", ["gz", "zst"])
+def test_log_view_reads_lines_across_chunks(sample_log, tmp_path, monkeypatch, ext):
+    # small reads put many lines across chunk borders of the decompressed stream
+    monkeypatch.setattr(log_io, "READ_SIZE", 4093)
+    with open(sample_log, "rb") as fh:
+        data = fh.read()
+    line_at, pos = {}, 0
+    for line in data.split(b"\n")[:-1]:
+        line_at[pos] = line.decode("utf-8")
+        pos += len(line) + 1
+    path = tmp_path / f"log.{ext}"
+    path.write_bytes(COMPRESSORS[ext](data))
+    offsets = list(line_at)
+    want = offsets[::7] + [offsets[-1]]
+    with LogView(str(path)) as view:
+        assert view.lines(want) == {off: line_at[off] for off in want}
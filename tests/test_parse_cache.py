@@ -0,0 +1,36 @@
+import io
+import os
+import stat
+
+from parse_cache import ParseCache, content_key
+from parcel_store import build_store
+
+
+def test_entries_are_readable_by_other_users(sample_log, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    key = content_key(sample_log)
+    cache.put(key, build_store(sample_log))
+    mode = os.stat(tmp_path / key).st_mode
+    assert mode & stat.S_IRGRP and mode & stat.S_IXGRP
+    assert mode & stat.S_IROTH and mode & stat.S_IXOTH
+
+    other = ParseCache(str(tmp_path))                   # e.g. another user's dashboard
+    assert len(other.get(key)) == len(build_store(sample_log))
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    (tmp_path / "abc").write_text("not an entry")       # listdir → NotADirectoryError
+    assert ParseCache(str(tmp_path)).get("abc") is None
+
+
+def test_memory_hits_do_not_share_source(sample_log, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    data = open(sample_log, "rb").read()
+    first, second = io.BytesIO(data), io.BytesIO(data)
+    cache.put(content_key(first), build_store(first))
+
+    a = cache.get(content_key(first), first)
+    b = cache.get(content_key(second), second)
+    assert a is not b
+    assert (a.source, b.source) == (first, second)
+    assert a.to_dataframe().equals(b.to_dataframe())
@@ -0,0 +1,32 @@
+"""
+Parser output pinned to files written before the parser core existed:
+JK's is the original JK.py's, byte for byte; hlc_parser's is the
+original's with recycled PICs split into generations (see parcel_identity).
+"""
+import gzip
+import json
+import os
+
+import JK
+import hlc_parser
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def _expected(name):
+    with gzip.open(os.path.join(DATA, name), "rt", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _as_json(parcels):
+    return json.loads(json.dumps(parcels))
+
+
+def test_jk_parse_log_matches_baseline(sample_log):
+    with open(sample_log, encoding="utf-8") as fh:
+        assert _as_json(JK.parse_log(fh.read())) == _expected("jk_parse_log.json.gz")
+
+
+def test_hlc_parse_log_matches_baseline(sample_log):
+    with open(sample_log, encoding="utf-8") as fh:
+        assert _as_json(hlc_parser.parse_log(fh.read())) == _expected("hlc_parse_log.json.gz")
@@ -0,0 +1,81 @@
+import threading
+from collections import Counter
+
+import pytest
+
+import profiling
+from conftest import NOISE
+from hlc_core import ID_MAP
+from parcel_store import build_store
+from profiling import SAMPLE_EVERY, Profile
+
+
+@pytest.fixture(scope="module")
+def expected(sample_parcels):
+    """Line counts of the replayed sample, straight from its events."""
+    types = Counter(ID_MAP[e["raw"].split("|")[3]] for p in sample_parcels for e in p["events"])
+    events = sum(types.values())
+    return {"types": types, "events": events, "extra": events // 20}
+
+
+def test_counts_match_the_sample_log(sample_log, expected):
+    with Profile() as prof:
+        build_store(sample_log)
+    report = prof.report()
+    with open(sample_log, encoding="utf-8") as fh:
+        assert report["lines"] == sum(1 for _ in fh)
+    assert report["accepted_lines"] == expected["events"]
+    assert report["rejected"] == {"watchdog": expected["extra"], "no body": expected["extra"]}
+    assert report["rejected_lines"] == 2 * expected["extra"]
+    assert {msg: t["lines"] for msg, t in report["message_types"].items()} == expected["types"]
+    assert report["sampled_lines"] == report["lines"] // SAMPLE_EVERY
+    assert {"read", "decode", "tokenize", "timestamp", "handle"} <= set(report["stages"])
+
+
+def test_sampled_times_are_extrapolated(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(profiling.time, "perf_counter", lambda: clock[0])
+    cost = {"ItemRegister": 0.01, "ItemInstruction": 0.03}
+
+    def feed(offset, line):
+        if line == NOISE:
+            return None
+        clock[0] += cost[line]                          # the only time that passes
+        return 1, line, 0
+
+    kinds = ["ItemRegister", "ItemInstruction"]
+    lines = [NOISE if i % 4 == 3 else kinds[i // SAMPLE_EVERY % 2] for i in range(1, 641)]
+    prof = Profile()
+    wrapped = prof.instrument(feed)
+    for i, line in enumerate(lines):
+        wrapped(i, line)
+
+    report = prof.report()
+    assert (report["lines"], report["sampled_lines"]) == (640, 640 // SAMPLE_EVERY)
+    n = Counter(line for line in lines if line != NOISE)
+    for msg, t in report["message_types"].items():
+        assert t["lines"] == n[msg]
+        assert t["handle_seconds"] == pytest.approx(cost[msg] * n[msg])
+    assert report["stages"]["handle"]["seconds"] == pytest.approx(
+        sum(cost[msg] * k for msg, k in n.items()))
+    assert report["rejected"] == {"no body": 160}
+
+
+def test_disabled_profiling_is_a_no_op(sample_log):
+    def feed(offset, line):
+        return None
+
+    assert profiling.current() is None
+    assert profiling.instrument(feed) is feed
+    with profiling.stage("anything"):
+        pass
+    with Profile() as prof:
+        assert profiling.current() is prof
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(profiling.current()))
+        thread.start()
+        thread.join()
+        assert seen == [None]                           # other threads are not profiled
+    assert profiling.current() is None and profiling.instrument(feed) is feed
+    build_store(sample_log)                             # after the exit: not recorded
+    assert prof.lines == 0 and not prof.stages and not prof.types
@@ -1,38 +1,125 @@
-import streamlit as st
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+import profiling
+
+PAGE_SIZES = [50, 100, 250, 500]
+COLUMNS = ["Time", "status", "HOSTID", "BARCODES", "LOCATION", "DESTINATION"]
+FILTERS = {"status": "status", "LOCATION": "location", "DESTINATION": "destination"}
+MISSING = "—"
+
+
+def _text_columns(df: pd.DataFrame) -> dict:
+    # display strings of the non‑categorical columns, one object array each
+    hms = pd.Series(np.datetime_as_string(df["registeredAt"].to_numpy(), unit="s"),
+                    index=df.index).str[11:19]
+    barcodes = df["barcodes"].map(lambda lst: ", ".join(lst) if lst else MISSING)
+    return {
+        "Time":     hms.where(df["registeredAt"].notna(), MISSING).to_numpy(object),
+        "HOSTID":   df["hostId"].fillna(MISSING).to_numpy(object),
+        "BARCODES": barcodes.to_numpy(object),
+    }
+
+
+class ParcelTable:
+    """
+    Display columns and filter levels for one parse, built once and kept
+    in the session.  Filters are masks over the categorical codes and
+    only the requested page is turned into display values, so a rerun
+    costs the same for 1 000 parcels as for 1 000 000.  A store that is
+    still growing is followed with `update`, which only converts the
+    rows that changed.
+    """
+
+    def __init__(self, df: pd.DataFrame = None):
+        self.df = df
+        self.n = 0
+        self.text = {name: np.empty(0, object) for name in ("Time", "HOSTID", "BARCODES")}
+        self.codes = {name: np.empty(0, np.int32) for name in FILTERS}
+        self.levels = {name: [] for name in FILTERS}
+        if df is not None:
+            self.update(df)
+
+    def update(self, df: pd.DataFrame) -> "ParcelTable":
+        """
+        Insert or replace the rows of `df`, whose index holds their row
+        positions (ParcelStore.changes).  Category lists only ever grow at
+        the end, like the store's Levels, so existing codes stay valid.
+        """
+        rows = df.index.to_numpy()
+        if not len(rows):
+            return self
+        self._reserve(int(rows.max()) + 1)
+        for name, values in _text_columns(df).items():
+            self.text[name][rows] = values
+        for name, col in FILTERS.items():
+            self.codes[name][rows] = df[col].cat.codes.to_numpy()
+            self.levels[name] = list(df[col].cat.categories)
+        return self
+
+    def _reserve(self, n: int) -> None:
+        cap = len(self.codes["status"])
+        if n > cap:
+            cap = max(n, 2 * cap)
+            for cols, fill, dtype in ((self.text, MISSING, object), (self.codes, -1, np.int32)):
+                for name, old in cols.items():
+                    cols[name] = np.full(cap, fill, dtype)
+                    cols[name][:len(old)] = old
+        self.n = max(self.n, n)
+
+    def __len__(self):
+        return self.n
+
+    def options(self, name: str) -> list:
+        missing = (self.codes[name][:self.n] < 0).any()
+        return ["All"] + sorted(self.levels[name]) + ([MISSING] if missing else [])
+
+    def rows(self, selections: dict) -> np.ndarray:
+        """Row positions passing every filter."""
+        mask = np.ones(self.n, dtype=bool)
+        for name, choice in selections.items():
+            if choice != "All":
+                code = -1 if choice == MISSING else self.levels[name].index(choice)
+                mask &= self.codes[name][:self.n] == code
+        return np.flatnonzero(mask)
+
+    def page(self, rows: np.ndarray) -> pd.DataFrame:
+        cols = {name: self.text[name][rows] for name in self.text}
+        for name in FILTERS:
+            codes = self.codes[name][rows]
+            levels = np.array(self.levels[name] + [MISSING], dtype=object)
+            cols[name] = levels[codes]                  # code -1 → MISSING
+        return pd.DataFrame({name: cols[name] for name in COLUMNS}, index=rows)
+
+
+def parcel_table(df: pd.DataFrame) -> ParcelTable:
+    # one table per parsed DataFrame; a new upload replaces it
+    cached = st.session_state.get("_parcel_table")
+    if cached is None or cached.df is not df:
+        cached = st.session_state["_parcel_table"] = ParcelTable(df)
+    return cached
+
 
 def all_parcels_view(df: pd.DataFrame) -> None:
-    # ── 1. Build the table data ────────────────────────────────────────
-    ts_col = (
-        pd.to_datetime(
-            df.lifeCycle.apply(lambda x: x["registeredAt"]),
-            errors="coerce",
-            format="mixed"
-        ).dt.strftime("%H:%M:%S")
-    )
+    with profiling.stage("all_parcels.table"):
+        table = parcel_table(df)
+    parcel_table_view(table)
 
-    tbl = pd.DataFrame({
-        "Time":        ts_col,
-        "status":        df.lifeCycle.apply(lambda x: x["status"]),
-        "HOSTID":      df["hostId"],
-        "BARCODES":    df["barcodes"].apply(lambda lst: ", ".join(lst) if lst else "—"),
-        "LOCATION":    df["location"],
-        "DESTINATION": df["destination"],
-    }).fillna("—")
 
-    # ── 2. Header‑aligned filter strip ─────────────────────────────────
-    col_objs = st.columns(len(tbl.columns))
+def parcel_table_view(table: ParcelTable) -> None:
+    # ── 1. Header‑aligned filter strip ─────────────────────────────────
+    col_objs = st.columns(len(COLUMNS))
 
     # Store each selection in a dict for later filtering
-    selections = {"status": "All", "LOCATION": "All", "DESTINATION": "All"}
+    selections = {name: "All" for name in FILTERS}
 
-    for name, col in zip(tbl.columns, col_objs):
+    for name, col in zip(COLUMNS, col_objs):
         with col:
             if name in selections:                           # columns to filter
-                options = ["All"] + sorted(tbl[name].unique())
                 selections[name] = st.selectbox(
                     f"{name} filter",                        # label (hidden)
-                    options,
+                    table.options(name),
                     index=0,
                     label_visibility="collapsed",
                     key=f"{name.lower()}_filter"
@@ -40,15 +127,25 @@ def all_parcels_view(df: pd.DataFrame) -> None:
             else:
                 st.markdown("&nbsp;", unsafe_allow_html=True)
 
-    # ── 3. Apply the filters ───────────────────────────────────────────
-    for col_name, choice in selections.items():
-        if choice != "All":
-            tbl = tbl[tbl[col_name] == choice]
+    # ── 2. Apply the filters, pick the page ────────────────────────────
+    with profiling.stage("all_parcels.filter"):
+        rows = table.rows(selections)
+    c1, c2, c3 = st.columns([1, 1, 4])
+    size = c1.selectbox("Rows per page", PAGE_SIZES, index=1, key="parcels_page_size")
+    pages = max(1, -(-len(rows) // size))
+    if st.session_state.get("parcels_page", 1) > pages:      # filters shrank the result
+        st.session_state["parcels_page"] = pages
+    page = c2.number_input("Page", min_value=1, max_value=pages, step=1,
+                           key="parcels_page")
+    start = (page - 1) * size
+    c3.caption(f"{len(rows):,} parcels · page {page} of {pages:,}")
 
-    # ── 4. Show the filtered table ─────────────────────────────────────
-    st.dataframe(tbl, use_container_width=True)
+    # ── 3. Show only the visible page ──────────────────────────────────
+    with profiling.stage("all_parcels.page"):
+        page_df = table.page(rows[start:start + size])
+    st.dataframe(page_df, use_container_width=True)
 
-    # ── 5. (Optional) CSS tweaks: narrower boxes & smaller font ────────
+    # ── 4. (Optional) CSS tweaks: narrower boxes & smaller font ────────
     st.markdown(
         """
         <style>
@@ -0,0 +1,33 @@
+import streamlit as st
+
+from anomalies import KINDS
+
+LABELS = {"stuck": "Stuck parcels", "slow_sort": "Slow sorts",
+          "barcode_err_spike": "Barcode error spikes"}
+
+
+def anomalies_view(detector) -> None:
+    # ── Anomaly records found while parsing (see anomalies.py) ─────────
+    cols = st.columns(len(KINDS))
+    for col, kind in zip(cols, KINDS):
+        col.metric(LABELS[kind], f"{detector.counts[kind]:,}")
+    if not len(detector):
+        st.info("No anomalies detected.")
+        return
+
+    df = detector.frame()
+    kinds = st.multiselect("Show", list(KINDS), default=list(KINDS), key="anomaly_kinds",
+                           format_func=LABELS.get)
+    locations = sorted(df["location"].dropna().unique())
+    location = st.selectbox("Location", ["All"] + locations, key="anomaly_location")
+
+    shown = df[df["kind"].isin(kinds)]
+    if location != "All":
+        shown = shown[shown["location"] == location]
+    if len(df) < len(detector):
+        st.caption(f"Only the newest {len(df):,} of {len(detector):,} records are kept.")
+    st.dataframe(
+        shown.drop(columns="key").sort_values("ts", kind="stable"),
+        use_container_width=True,
+        hide_index=True,
+    )
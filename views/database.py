@@ -0,0 +1,113 @@
+from datetime import datetime, time, timedelta, timezone
+
+import plotly.express as px
+import streamlit as st
+
+from parcel_db import DAY_MS, DB_PATH, GROUPS, ParcelDB
+
+PAGE_SIZE = 100
+BUCKETS = {"day": DAY_MS, "hour": 3_600_000}
+SEARCH_KINDS = {"Host ID": "hostId", "Barcode": "barcode", "PIC": "pic"}
+
+
+@st.cache_resource
+def parcel_db(path: str = DB_PATH) -> ParcelDB:
+    # one connection per server process, shared by every session
+    return ParcelDB(path)
+
+
+def _ms(day, end: bool = False) -> int:
+    # a picked date (UTC, like the stored times) → epoch ms of its start / next start
+    dt = datetime.combine(day, time(), tzinfo=timezone.utc) + timedelta(days=end)
+    return int(dt.timestamp() * 1000)
+
+
+def database_view() -> None:
+    db = parcel_db()
+    first, last = db.span()
+    if first is None:
+        st.info(f"The database {db.path} is empty – ingest logs with "
+                "`python parcel_db.py ingest LOGS…`.")
+        return
+
+    lo = datetime.fromtimestamp(first / 1000, timezone.utc).date()
+    hi = datetime.fromtimestamp(last / 1000, timezone.utc).date()
+    picked = st.date_input("Registered between", (max(lo, hi - timedelta(days=6)), hi),
+                           min_value=lo, max_value=hi, key="db_range")
+    if len(picked) != 2:
+        st.stop()                                   # second date not picked yet
+    start, end = _ms(picked[0]), _ms(picked[1], end=True)
+
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Summary", "📦 Parcels", "🔍 Search", "⚠️ Anomalies"])
+    with tab1:
+        _summary(db, start, end)
+    with tab2:
+        _parcels(db, start, end)
+    with tab3:
+        _search(db)
+    with tab4:
+        st.dataframe(db.anomalies(start, end), use_container_width=True, hide_index=True)
+
+    with st.expander(f"🗄️ {len(db.files())} ingested files"):
+        st.dataframe(db.files(), use_container_width=True, hide_index=True)
+
+
+def _summary(db, start: int, end: int) -> None:
+    c1, c2 = st.columns(2)
+    by = c1.radio("Break down by", GROUPS, horizontal=True, key="db_by")
+    bucket = c2.radio("Per", list(BUCKETS), horizontal=True, key="db_bucket")
+    df = db.summary(start, end, by, BUCKETS[bucket])
+    if df.empty:
+        st.info("No parcels registered in this range.")
+        return
+
+    total = int(df["parcels"].sum())
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Parcels", f"{total:,}")
+    c2.metric("% Sorted", f"{df['sorted'].sum() / total * 100:.1f}%")
+    c3.metric("% Deregistered", f"{df['deregistered'].sum() / total * 100:.1f}%")
+    c4.metric("% Barcode Err", f"{df['barcode_err'].sum() / total * 100:.1f}%")
+
+    df[by] = df[by].fillna("—")
+    st.plotly_chart(px.bar(df, x="bucket", y="parcels", color=by), use_container_width=True)
+    st.plotly_chart(px.line(df.dropna(subset=["avg_cycle_s"]), x="bucket", y="avg_cycle_s",
+                            color=by, markers=True), use_container_width=True)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+
+def _parcels(db, start: int, end: int) -> None:
+    filters = {}
+    cols = st.columns(3)
+    for col, name in zip(cols, ("status",) + GROUPS):
+        choice = col.selectbox(name, ["All"] + db.levels(name), key=f"db_{name}")
+        if choice != "All":
+            filters[name] = choice
+
+    n = db.count(start, end, **filters)
+    pages = max(1, -(-n // PAGE_SIZE))
+    c1, c2 = st.columns([1, 5])
+    page = c1.number_input("Page", min_value=1, max_value=pages, step=1, key="db_page")
+    c2.caption(f"{n:,} parcels · page {min(page, pages)} of {pages:,}")
+    df = db.parcels(start, end, PAGE_SIZE, (min(page, pages) - 1) * PAGE_SIZE, **filters)
+    st.dataframe(df.drop(columns=["id", "file_id"]), use_container_width=True, hide_index=True)
+
+
+def _search(db) -> None:
+    kind = st.radio("Search by", list(SEARCH_KINDS), horizontal=True, key="db_search_kind")
+    value = st.text_input(f"Enter {kind}", key="db_search").strip()
+    if not value:
+        return
+    if kind == "PIC":
+        if not value.isdigit():
+            st.warning("A PIC is a number.")
+            return
+        value = int(value)
+    found = db.find(SEARCH_KINDS[kind], value)
+    if found.empty:
+        st.warning(f"{kind} not found.")
+        return
+    st.dataframe(found.drop(columns=["id", "file_id"]), use_container_width=True,
+                 hide_index=True)
+    for parcel in found.head(5).itertuples():
+        st.caption(f"PIC {parcel.pic} · host {parcel.host_id} · registered {parcel.registered_at}")
+        st.dataframe(db.events(parcel.id), use_container_width=True, hide_index=True)
@@ -0,0 +1,29 @@
+import pandas as pd
+import streamlit as st
+
+
+def diagnostics_view(profile) -> None:
+    # ── Parse / view timings of this session (see profiling.Profile) ──
+    report = profile.report()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Lines", f"{report['lines']:,}")
+    c2.metric("Rejected", f"{report['rejected_lines']:,}")
+    c3.metric("Sampled", f"1 in {report['sample_every']}")
+    peak = report["peak_rss_mb"]
+    c4.metric("Peak RSS", "—" if peak is None else f"{peak:,.0f} MB")
+
+    stages = pd.DataFrame.from_dict(report["stages"], orient="index")
+    stages.index.name = "stage"
+    st.dataframe(stages.sort_values("seconds", ascending=False), use_container_width=True)
+
+    c1, c2 = st.columns(2)
+    types = pd.DataFrame.from_dict(report["message_types"], orient="index")
+    if not types.empty:
+        types.index.name = "message type"
+        c1.dataframe(types.drop(columns="estimated"), use_container_width=True)
+    if report["rejected"]:
+        c2.dataframe(pd.Series(report["rejected"], name="lines").rename_axis("reason"),
+                     use_container_width=True)
+
+    st.download_button("Download report (JSON)", profile.to_json(),
+                       file_name="parse_profile.json", mime="application/json")
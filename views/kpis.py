@@ -0,0 +1,45 @@
+import streamlit as st
+import plotly.express as px
+
+import profiling
+
+
+def _seconds(v) -> str:
+    return "—" if v is None else f"{v:.1f}"
+
+
+def kpi_view(kpis) -> None:
+    # ── Dashboard Metrics (precomputed, see metrics.Kpis) ──────────────
+    total = kpis.total
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        st.metric("Total Parcels", total)
+        st.metric("% Sorted", f"{kpis.sorted/total*100:.1f}%" if total else "0%")
+    with c2:
+        st.metric("% Barcode Err", f"{kpis.barcode_err/total*100:.1f}%" if total else "0%")
+        st.metric("% Deregistered", f"{kpis.deregistered/total*100:.1f}%" if total else "0%")
+    with c3:
+        st.metric("Avg Cycle (s)", f"{kpis.avg_cycle_s:.1f}")
+        st.metric("P50 Cycle (s)", _seconds(kpis.cycle_quantile(0.50)))
+    with c4:
+        st.metric("P95 Cycle (s)", _seconds(kpis.cycle_quantile(0.95)))
+        st.metric("P99 Cycle (s)", _seconds(kpis.cycle_quantile(0.99)))
+
+
+def throughput_view(kpis) -> None:
+    # ── Time‑bucketed throughput from the running aggregates ───────────
+    c1, c2, c3 = st.columns(3)
+    kind = c1.radio("Count", ["closed", "registered"], horizontal=True, key="tp_kind")
+    freq = c2.radio("Bucket", ["min", "h"], horizontal=True, key="tp_freq",
+                    format_func={"min": "per minute", "h": "per hour"}.get)
+    by_options = ["location", "destination"] if kind == "closed" else ["location"]
+    by = c3.selectbox("Break down by", [None] + by_options, key="tp_by",
+                      format_func=lambda x: "—" if x is None else x)
+
+    with profiling.stage("throughput.frame"):
+        tp = kpis.throughput.frame(kind, freq, by)
+    if tp.empty:
+        st.info("No throughput data yet.")
+        return
+    fig = px.bar(tp, x="time", y="count", color=by)
+    st.plotly_chart(fig, use_container_width=True)
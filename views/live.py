@@ -0,0 +1,90 @@
+import streamlit as st
+
+from anomalies import AnomalyDetector
+from hlc_tail import LIVE_DIR, OPEN_TIMEOUT_S, LiveTail, live_path
+from metrics import Kpis
+from views.all_parcels import ParcelTable, parcel_table_view
+from views.anomalies import anomalies_view
+from views.kpis import kpi_view
+
+REFRESH_S = 2
+
+
+class LiveResults:
+    """
+    A session's copy of a store that is still growing, caught up from
+    ParcelStore.changes(): the parcel table is updated in place and new
+    anomaly records are appended, so a refresh costs the lines that
+    arrived since the last one, not the length of the shift.
+    """
+
+    def __init__(self):
+        self.table = ParcelTable()
+        self.kpis = Kpis()
+        self.anomalies = AnomalyDetector()
+
+    def update(self, changes) -> "LiveResults":
+        rows, self.kpis, anomalies = changes
+        self.table.update(rows)
+        self.anomalies.extend(anomalies)
+        return self
+
+
+def stop_live() -> None:
+    """Stop this session's follower, e.g. when it leaves live mode."""
+    live = st.session_state.pop("live", None)
+    if live is not None:
+        live["tail"].stop(wait=False)
+
+
+def _session_tail(path: str, open_timeout_s: float) -> dict:
+    # one follower per session; another path or timeout replaces it
+    live = st.session_state.get("live")
+    if live is None or live["key"] != (path, open_timeout_s):
+        stop_live()
+        live = st.session_state["live"] = {
+            "key": (path, open_timeout_s),
+            "tail": LiveTail(path, open_timeout_s).start(),
+            "results": LiveResults(),
+        }
+    return live
+
+
+def live_view() -> None:
+    if not LIVE_DIR:
+        st.info("Live mode is off. Set LOG_ANALYZER_LIVE_DIR to the directory "
+                "of the logs that may be followed.")
+        return
+    name = st.text_input(f"Log file in {LIVE_DIR} to follow")
+    timeout_min = st.number_input(
+        "Expire open parcels after (minutes of log time)",
+        min_value=1, value=int(OPEN_TIMEOUT_S // 60),
+    )
+    if not name:
+        stop_live()
+        st.info("Enter the name of the HLC log being written.")
+        return
+    try:
+        path = live_path(name)
+    except ValueError as exc:
+        stop_live()
+        st.error(str(exc))
+        return
+
+    live = _session_tail(path, timeout_min * 60)
+    tail, results = live["tail"], live["results"]
+
+    @st.fragment(run_every=REFRESH_S)
+    def refresh():
+        results.update(tail.snapshot())
+        kpi_view(results.kpis)
+        st.caption(
+            f"{tail.lines:,} lines · {tail.parser.open_count:,} open · "
+            f"{tail.parser.expired:,} expired · {tail.reader.rotations} rotations"
+        )
+        with st.expander(f"⚠️ Anomalies ({len(results.anomalies):,})"):
+            anomalies_view(results.anomalies)
+        st.divider()
+        parcel_table_view(results.table)
+
+    refresh()
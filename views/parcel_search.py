@@ -3,23 +3,52 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
-def parcel_search_view(df):
-    search_mode = st.radio("Search by", ["Host ID", "Barcode"], horizontal=True)
+import profiling
+
+MAX_RESULTS = 20                  # parcels rendered for one prefix / partial search
+INDEX_KIND = {"Host ID": "hostId", "Barcode": "barcode", "PIC": "pic"}
+
+
+def find_rows(index, search_mode: str, match: str, search_input: str):
+    """Row positions matching the search, answered from the parcel index."""
+    kind = INDEX_KIND[search_mode]
+    if kind == "pic":
+        return index.lookup(kind, int(search_input)) if search_input.isdigit() else []
+    if match == "Starts with":
+        return index.prefix(kind, search_input)
+    if match == "Ends with":
+        return index.suffix(kind, search_input)
+    return index.lookup(kind, search_input)
+
+
+def parcel_search_view(df, store):
+    search_mode = st.radio("Search by", list(INDEX_KIND), horizontal=True)
+    match = "Exact"
+    if search_mode == "Host ID":
+        match = st.radio("Match", ["Exact", "Starts with"], horizontal=True)
+    elif search_mode == "Barcode":
+        match = st.radio("Match", ["Exact", "Starts with", "Ends with"], horizontal=True)
     search_input = st.text_input(f"Enter {search_mode}")
     if not search_input:
         return
 
     try:
-        if search_mode == "Host ID":
-            result = df[df.hostId == search_input]
-        elif search_mode == "Barcode":
-            result = df[df.barcodes.apply(lambda barcodes: search_input in barcodes)]
-
-        if result.empty:
+        with profiling.stage("parcel_search.find"):
+            rows = find_rows(store.index, search_mode, match, search_input.strip())
+        if len(rows) == 0:
             st.warning(f"{search_mode} not found.")
             return
+        if len(rows) > MAX_RESULTS:
+            st.info(f"{len(rows)} parcels match – showing the first {MAX_RESULTS}.")
+        result = df.iloc[rows[:MAX_RESULTS]]
 
         for idx, parcel in result.iterrows():
+            lifecycle = {
+                "registeredAt": None if pd.isna(parcel.registeredAt) else parcel.registeredAt.isoformat(),
+                "closedAt":     None if pd.isna(parcel.closedAt) else parcel.closedAt.isoformat(),
+                "status":       parcel.status,
+            }
+
             # Calculate Box Volume if dimensions exist
             length = getattr(parcel, "length", None)
             width  = getattr(parcel, "width", None)
@@ -31,37 +60,40 @@ def parcel_search_view(df):
 
             # Combine parcel details into a dictionary
             parcel_summary = {
-                "PIC": parcel.pic,
+                "PIC": int(parcel.pic),
                 "Host ID": parcel.hostId,
                 "Barcodes": parcel.barcodes,
-                "Location": parcel.location,
-                "Destination": parcel.destination,
+                "Location": None if pd.isna(parcel.location) else parcel.location,
+                "Destination": None if pd.isna(parcel.destination) else parcel.destination,
                 "Length (cm)": length if length else "—",
                 "Width (cm)": width if width else "—",
                 "Height (cm)": height if height else "—",
                 "Box Volume (cm³)": round(box_volume, 2) if box_volume else "—",
-                "Lifecycle": parcel.lifeCycle,
-                "Barcode Error": parcel.barcodeErr,
+                "Lifecycle": lifecycle,
+                "Barcode Error": bool(parcel.barcodeErr),
             }
 
             st.subheader("📦 Parcel Information")
             st.json(parcel_summary)
 
-            # ── Event timeline ──
-            ev = pd.DataFrame(parcel.events)
-            ev["ts"] = pd.to_datetime(ev.ts)
-            ev = ev.sort_values("ts")
-            close_time = pd.to_datetime(parcel.lifeCycle.get("closedAt") or datetime.now())
+            # ── Event timeline (log lines read back on demand) ──
+            with profiling.stage("parcel_search.events"):
+                ev = store.events_for(idx, raw=True)
+            ev["type"] = ev["type"].astype(str)
+            ev = ev.sort_values("ts", kind="stable")
+            close_time = parcel.closedAt if not pd.isna(parcel.closedAt) else pd.Timestamp(datetime.now())
             ev["finish"] = ev["ts"].shift(-1).fillna(close_time)
             ev["duration_s"] = (ev["finish"] - ev["ts"]).dt.total_seconds()
             ev["time"] = ev["ts"].dt.strftime("%H:%M:%S")
 
             st.subheader("📋 Event Log")
             st.dataframe(
-                ev[["time", "type", "duration_s"]].rename(columns={
+                ev[["time", "type", "direction", "duration_s", "raw"]].rename(columns={
                     "time": "Time",
                     "type": "Type",
-                    "duration_s": "Duration (s)"
+                    "direction": "Direction",
+                    "duration_s": "Duration (s)",
+                    "raw": "Raw"
                 }),
                 use_container_width=True,
                 hide_index=True,